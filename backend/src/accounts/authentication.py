@@ -0,0 +1,90 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .permissions import remember_admin_scope
+from .tokens import (
+    SCOPE_CLAIM, current_scope_claims, remember_scope_claims, scope_claims, scope_claims_enabled,
+    user_from_claims,
+)
+
+
+class ScopedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user with their MOH profile, station,
+    province and district in one query, and computes the admin scope once
+    for the request. Permissions and views read it through get_admin_scope()
+    without touching the database again.
+
+    Read-only requests to views with `token_claims_auth = True` skip even that
+    query when the token carries current scope claims (see accounts.tokens).
+    """
+    user_relations = ('moh_profile__station__province', 'moh_profile__station__district')
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if self.accepts_token_claims(request):
+            user = self.get_user_from_claims(validated_token)
+            if user is not None:
+                return user, validated_token
+        return self.get_user(validated_token), validated_token
+
+    def accepts_token_claims(self, request):
+        view = request.parser_context.get('view') if request.parser_context else None
+        return (
+            scope_claims_enabled()
+            and request.method in SAFE_METHODS
+            and getattr(view, 'token_claims_auth', False)
+        )
+
+    def get_user_from_claims(self, validated_token):
+        """A user built from the token's scope claims, or None when they are absent or not current."""
+        claims = validated_token.get(SCOPE_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if claims is None or user_id is None or current_scope_claims(user_id) != claims:
+            return None
+        user = user_from_claims(self.user_model, user_id, claims)
+        remember_admin_scope(user)
+        return user
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = (
+                self.user_model.objects
+                .select_related(*self.user_relations)
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        # Claims that still match the database are trusted again on the next requests.
+        claims = validated_token.get(SCOPE_CLAIM)
+        if claims is not None and scope_claims_enabled() and claims == scope_claims(user):
+            remember_scope_claims(user.pk, claims)
+
+        remember_admin_scope(user)
+        return user
@@ -0,0 +1,129 @@
+"""
+Cached refresh token blacklist lookups.
+
+simplejwt checks BlacklistedToken (joined to OutstandingToken) every time a
+refresh token is verified: on each refresh and on logout. Refresh tokens
+issued here are CachedBlacklistRefreshToken, which answers that check from
+two layers before the database:
+
+- this process: jtis known to be blacklisted. Blacklisting is final, so
+  these entries never go stale; they are dropped once the token expires.
+- the TOKEN_BLACKLIST_CACHE cache: both answers, each kept until the token
+  expires. A "not blacklisted" entry is only ever added, never written over
+  a "blacklisted" one, and blacklist() writes its entry once the
+  transaction commits, so a negative entry cannot outlive a committed
+  blacklisting. That only holds if every worker sees the entry: with a
+  per-process backend (LocMemCache, DummyCache), a logout on one worker
+  would not reach the others, so "not blacklisted" is then never cached
+  and is read from the database each time.
+
+Expired rows are removed by the compact_tokens management command.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BlacklistedJtis:
+    """Thread-safe, size-bounded set of blacklisted jtis with their expiry times."""
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._expiry = {}
+
+    def __contains__(self, jti):
+        with self._lock:
+            expires = self._expiry.get(jti)
+        return expires is not None and expires > time.time()
+
+    def add(self, jti, expires):
+        with self._lock:
+            if jti not in self._expiry and len(self._expiry) >= self.max_entries:
+                self._prune()
+            self._expiry[jti] = expires
+
+    def _prune(self):
+        now = time.time()
+        for jti in [jti for jti, expires in self._expiry.items() if expires <= now]:
+            del self._expiry[jti]
+        # Still full: drop the oldest entries; they only cost a cache lookup.
+        while len(self._expiry) >= self.max_entries:
+            del self._expiry[next(iter(self._expiry))]
+
+    def clear(self):
+        with self._lock:
+            self._expiry.clear()
+
+
+blacklisted_jtis = BlacklistedJtis()
+
+
+def blacklist_cache():
+    return caches[getattr(settings, 'TOKEN_BLACKLIST_CACHE', 'default')]
+
+
+def caches_negative_answers(cache):
+    """Whether "not blacklisted" may be cached: only in a cache every worker shares."""
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _cache_key(jti):
+    return f'token-blacklist:{jti}'
+
+
+def _remaining(expires):
+    return max(1, int(expires - time.time()))
+
+
+def is_blacklisted(jti, expires):
+    """Whether the token `jti` (expiring at epoch `expires`) is blacklisted."""
+    if jti in blacklisted_jtis:
+        return True
+
+    cache = blacklist_cache()
+    cached = cache.get(_cache_key(jti))
+    if cached is None:
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if blacklisted:
+            cache.set(_cache_key(jti), 1, timeout=_remaining(expires))
+        elif caches_negative_answers(cache):
+            # add(), not set(): never overwrite an entry written by a blacklisting meanwhile.
+            cache.add(_cache_key(jti), 0, timeout=_remaining(expires))
+    else:
+        blacklisted = bool(cached)
+
+    if blacklisted:
+        blacklisted_jtis.add(jti, expires)
+    return blacklisted
+
+
+def mark_blacklisted(jti, expires):
+    """Records a blacklisting in both layers once the current transaction commits."""
+    def mark():
+        blacklisted_jtis.add(jti, expires)
+        blacklist_cache().set(_cache_key(jti), 1, timeout=_remaining(expires))
+
+    transaction.on_commit(mark)
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        mark_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
@@ -0,0 +1,28 @@
+import django_filters
+from django.contrib.auth import get_user_model
+from rest_framework import filters
+
+from .search import search_users
+
+User = get_user_model()
+
+
+class AdminUserFilter(django_filters.FilterSet):
+    """
+    ?station= / ?district= / ?province= (ids) filter on the user's MOH profile
+    station; they narrow the admin's scope, never widen it.
+    """
+    station = django_filters.NumberFilter(field_name='moh_profile__station')
+    district = django_filters.NumberFilter(field_name='moh_profile__station__district')
+    province = django_filters.NumberFilter(field_name='moh_profile__station__province')
+
+    class Meta:
+        model = User
+        fields = ['station', 'district', 'province', 'user_type', 'is_admin']
+
+
+class UserSearchFilter(filters.SearchFilter):
+    """`?search=` over username, email, names and national ID, backed by the user search index."""
+
+    def filter_queryset(self, request, queryset, view):
+        return search_users(queryset, self.get_search_terms(request))
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted refresh tokens in small batches, "
+        "each in its own short transaction, and report the table sizes before and after. "
+        "Meant to be scheduled (e.g. nightly from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Tokens deleted per transaction (default 1000).")
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between batches, to let other writers in.")
+        parser.add_argument('--grace-hours', type=float, default=0.0,
+                            help="Keep tokens for this long after they expire.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be deleted.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        expired = OutstandingToken.objects.filter(expires_at__lt=cutoff).order_by('id')
+
+        self.report("Before", cutoff)
+        if options['dry_run']:
+            return
+
+        outstanding = blacklisted = batches = 0
+        last_id = 0
+        while True:
+            # Walks the primary key, so every batch is an index range scan.
+            with transaction.atomic():
+                ids = list(expired.filter(id__gt=last_id).values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            last_id = ids[-1]
+            batches += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {outstanding} outstanding and {blacklisted} blacklisted tokens in {batches} batches."
+        ))
+        self.report("After", cutoff)
+
+    def report(self, label, cutoff):
+        outstanding = OutstandingToken.objects.count()
+        expired = OutstandingToken.objects.filter(expires_at__lt=cutoff).count()
+        blacklisted = BlacklistedToken.objects.count()
+        self.stdout.write(
+            f"{label}: {outstanding} outstanding tokens ({expired} expired), {blacklisted} blacklisted tokens."
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:00
+
+from django.db import migrations
+
+from moh_assets_backend.search_index import SearchIndex, SearchSource
+
+
+SEARCH_FIELDS = ['username', 'email', 'first_name', 'last_name', 'national_id']
+
+# SQLite: FTS5 trigram table keyed by user id, kept in sync by triggers on
+# accounts_user. PostgreSQL: trigram GIN indexes on the searched columns.
+SEARCH_INDEX = SearchIndex('accounts_user_search', SEARCH_FIELDS, [
+    SearchSource('accounts_user', columns={field: field for field in SEARCH_FIELDS}),
+])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_user_is_admin"),
+    ]
+
+    operations = [
+        SEARCH_INDEX.migration_operation(),
+    ]
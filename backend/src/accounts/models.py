@@ -56,6 +56,9 @@ class User(AbstractUser):
                     )
 
     def save(self, *args, **kwargs):
+        # Users built from token claims (accounts.tokens) hold only the authorization fields.
+        if getattr(self, 'from_token_claims', False):
+            raise ValueError("A user built from token claims cannot be saved; load it from the database.")
         # Call clean() before saving to enforce validation
         self.clean()
         super().save(*args, **kwargs)
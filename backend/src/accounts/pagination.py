@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class AdminUserCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the admin user directory, walking the unique
+    username index (WHERE username > :position ... LIMIT n).
+
+    Query Parameters:
+    - cursor: Opaque value taken from the `next` / `previous` links.
+    - page_size: Optional page size (max 200).
+    """
+    ordering = ('username',)
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -1,14 +1,30 @@
 # accounts/permissions.py
+from locations.models import location_path, path_prefix_range
+
 
 def get_admin_scope(user):
     """
     Returns a queryset filter dictionary representing the admin scope.
     Only meaningful if user.is_admin=True
+    Users authenticated by ScopedJWTAuthentication carry the scope computed for the request.
     """
+    if hasattr(user, '_admin_scope'):
+        return user._admin_scope
+    return compute_admin_scope(user)
+
+
+def remember_admin_scope(user):
+    """Computes the scope once and memoizes it on this user instance (one per request)."""
+    user._admin_scope = compute_admin_scope(user)
+    return user._admin_scope
+
+
+def compute_admin_scope(user):
     if not user.is_admin or user.user_type != 'MOH':
         return None  # Regular users have no admin scope
 
-    station = getattr(user.moh_profile, 'station', None)
+    profile = getattr(user, 'moh_profile', None)
+    station = getattr(profile, 'station', None)
     if not station:
         return None
 
@@ -24,11 +40,59 @@ def get_admin_scope(user):
     if station.station_type == 'DO':
         return {'station__district': station.district}
 
-    # FC → access only that station
     # FC → access only that station
     return {'station': station}
 
 
+def scope_lookups(admin_scope, station_field):
+    """
+    Re-keys an admin scope onto another model's station relation, e.g. with
+    station_field='current_station':
+    {'station__province': p} -> {'current_station__province': p}
+    {'station': s} -> {'current_station': s}
+
+    station_field=None filters the Station model itself:
+    {'station__province': p} -> {'province': p}, {'station': s} -> {'pk': s.pk}
+    """
+    if station_field is None:
+        lookups = {}
+        for key, value in admin_scope.items():
+            if key == 'station':
+                lookups['pk'] = value.pk
+            elif key.startswith('station__'):
+                lookups[key[len('station__'):]] = value
+        return lookups
+    return {
+        station_field + key[len('station'):]: value
+        for key, value in admin_scope.items()
+        if key == 'station' or key.startswith('station__')
+    }
+
+
+def scope_path_lookups(admin_scope, station_field='current_station', path_field='location_path'):
+    """
+    Like scope_lookups(), for models that carry their station's location_path
+    (see locations.models.location_path): province and district scopes become a
+    range on `path_field`, so no join to the station table is needed.
+    {'station__province': p} -> {'location_path__gte': '<p>/', 'location_path__lt': '<p>0'}
+    {'station__district': d} -> {'location_path__gte': '<p>/<d>/', 'location_path__lt': '<p>/<d>0'}
+    {'station': s} -> {'current_station': s}
+    """
+    lookups = {}
+    for key, value in admin_scope.items():
+        if key == 'station__province':
+            prefix = f"{value.pk}/"
+        elif key == 'station__district':
+            prefix = location_path(value.province_id, value.pk)
+        else:
+            lookups.update(scope_lookups({key: value}, station_field))
+            continue
+        low, high = path_prefix_range(prefix)
+        lookups[f'{path_field}__gte'] = low
+        lookups[f'{path_field}__lt'] = high
+    return lookups
+
+
 from rest_framework import permissions
 
 class IsAssetAdmin(permissions.BasePermission):
@@ -80,3 +144,13 @@ class IsAssetAdmin(permissions.BasePermission):
         # and get_queryset for filtering.
         return True
 
+
+class HasAdminScope(permissions.BasePermission):
+    """
+    Allows any admin with a jurisdiction (HQ, PO, DO or FC), whatever the HTTP method.
+    Used for read-style endpoints that take a POST body, such as batch lookups.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and get_admin_scope(user) is not None)
@@ -0,0 +1,52 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connection
+from django.db.models import Q
+
+from moh_assets_backend.search_index import SearchIndex, SearchSource, fts5_phrase
+
+
+# Fields covered by the search index (see migration 0003_user_search_index).
+SEARCH_FIELDS = ['username', 'email', 'first_name', 'last_name', 'national_id']
+
+# FTS5's trigram tokenizer cannot match terms shorter than this.
+MIN_TRIGRAM_LENGTH = 3
+
+# FTS5 table fed by accounts_user. Logins only touch last_login, so its
+# triggers fire on updates of the searched columns alone.
+SEARCH_INDEX = SearchIndex('accounts_user_search', SEARCH_FIELDS, [
+    SearchSource('accounts_user', columns={field: field for field in SEARCH_FIELDS}),
+])
+
+# post_migrate handler: migrations that rebuild accounts_user on SQLite drop its triggers.
+ensure_search_triggers = SEARCH_INDEX.ensure_triggers
+
+
+def _contains_any(term):
+    return reduce(or_, (Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS))
+
+
+def search_users(queryset, terms):
+    """
+    Filters `queryset` to users matching every term in one of SEARCH_FIELDS.
+
+    - SQLite: MATCH against the FTS5 trigram table; terms shorter than three
+      characters fall back to icontains.
+    - PostgreSQL: icontains, served by the trigram GIN indexes.
+    """
+    if not terms:
+        return queryset
+
+    terms_left = terms
+    if connection.vendor == 'sqlite':
+        indexed = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+        if indexed:
+            queryset = queryset.filter(
+                id__in=SEARCH_INDEX.matching_ids(' AND '.join(fts5_phrase(term) for term in indexed))
+            )
+        terms_left = [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+
+    if terms_left:
+        queryset = queryset.filter(reduce(and_, (_contains_any(term) for term in terms_left)))
+    return queryset
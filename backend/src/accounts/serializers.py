@@ -3,7 +3,11 @@ from rest_framework import serializers
 from .models import User
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from .blacklist import CachedBlacklistRefreshToken
+from .tokens import issue_tokens
+from locations.serializers import StationSerializer
+from moh_assets_backend.fieldsets import SparseFieldsetMixin
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -55,11 +59,7 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
     def create_tokens(self, user):
-        refresh = RefreshToken.for_user(user)
-        return {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token)
-        }
+        return issue_tokens(user)
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -84,13 +84,19 @@ class LogoutSerializer(serializers.Serializer):
 
     def save(self, **kwargs):
         try:
-            token = RefreshToken(self.token)
+            token = CachedBlacklistRefreshToken(self.token)
             token.blacklist()
         except Exception:
             raise serializers.ValidationError("Invalid or expired token")
 
 
 
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    # Checks the blacklist through the process and shared caches first.
+    token_class = CachedBlacklistRefreshToken
+
+
+
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
     new_password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -103,9 +109,12 @@ class ChangePasswordSerializer(serializers.Serializer):
 
 
 
-class AdminUserListSerializer(serializers.ModelSerializer):
+class AdminUserListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'first_name', 'last_name', 'email', 'user_type', 'is_admin')
+        expandable_fields = {
+            'station': (StationSerializer, {'source': 'moh_profile.station'}),
+        }
 
 
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from locations.models import Station
+from locations.signals import stations_imported
+from profiles.models import MOHProfile
+from .tokens import forget_scope_claims, scope_claims_enabled
+
+User = get_user_model()
+
+
+def forget_user_claims(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which no claim depends on.
+    if not scope_claims_enabled() or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    forget_scope_claims([instance.pk if sender is User else instance.user_id])
+
+
+def forget_station_claims(sender, instance, **kwargs):
+    # Station type, province and district are claims; deleting a station
+    # clears its profiles with a bulk update that sends no profile signals.
+    if scope_claims_enabled():
+        forget_scope_claims(MOHProfile.objects.filter(station=instance).values_list('user_id', flat=True))
+
+
+def forget_imported_station_claims(sender, updated=(), **kwargs):
+    if scope_claims_enabled() and updated:
+        forget_scope_claims(MOHProfile.objects.filter(station_id__in=updated).values_list('user_id', flat=True))
+
+
+for _model in (User, MOHProfile):
+    post_save.connect(forget_user_claims, sender=_model, dispatch_uid=f'forget_claims_{_model.__name__}')
+    post_delete.connect(forget_user_claims, sender=_model, dispatch_uid=f'forget_claims_{_model.__name__}_delete')
+post_save.connect(forget_station_claims, sender=Station, dispatch_uid='forget_claims_Station')
+pre_delete.connect(forget_station_claims, sender=Station, dispatch_uid='forget_claims_Station_delete')
+stations_imported.connect(forget_imported_station_claims, dispatch_uid='forget_claims_imported_stations')
@@ -1,3 +1,333 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from moh_assets_backend.caching import response_cache
+from moh_assets_backend.testing import PASSWORD, QueryCountTestCase, ScopedAPITestCase
+
+from locations.models import Province, Station
+from .blacklist import blacklist_cache, blacklisted_jtis
+from .tokens import claims_cache, current_scope_claims
+
+User = get_user_model()
+
+
+class AccountQueryCountTests(QueryCountTestCase):
+    """Account endpoints issue a fixed number of queries however many users exist."""
+
+    def test_admin_user_list(self):
+        self.authenticate('HQ')
+        self.assertQueriesAtEverySize(2, self.grow_users, lambda: self.client.get('/api/accounts/admin/users/'))
+
+    def test_admin_user_list_expanded(self):
+        self.authenticate('HQ')
+        self.assertQueriesAtEverySize(
+            2, self.grow_users,
+            lambda: self.client.get('/api/accounts/admin/users/?fields=id,username&expand=station'),
+        )
+
+    def test_login(self):
+        self.assertQueriesAtEverySize(
+            2, self.grow_users,
+            lambda: self.client.post('/api/accounts/login/', {'username': 'admin_fc', 'password': PASSWORD},
+                                     format='json'),
+        )
+
+    def test_admin_reset_password(self):
+        self.authenticate('HQ')
+        target = self.admins['FC']
+        self.assertQueriesAtEverySize(
+            6, self.grow_users,
+            lambda: self.client.patch(f'/api/accounts/admin/users/{target.pk}/reset-password/',
+                                      {'new_password': 'Another-pass-2'}, format='json'),
+        )
+
+    def test_update_account(self):
+        self.authenticate('FC')
+        self.assertQueriesAtEverySize(
+            2, self.grow_users,
+            lambda: self.client.put('/api/accounts/me/update/', {'first_name': 'Rudo'}, format='json'),
+        )
+
+
+class AdminUserSparseFieldsetTests(ScopedAPITestCase):
+    """The admin user list honours ?fields= and expands a user's station."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('HQ')
+
+    def user_row(self, query):
+        response = self.client.get(f'/api/accounts/admin/users/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return next(row for row in response.data['results'] if row['username'] == 'admin_fc')
+
+    def test_fields_limit_the_keys(self):
+        self.assertEqual(self.user_row('fields=id,username'), {'id': self.admins['FC'].pk, 'username': 'admin_fc'})
+
+    def test_expand_nests_the_station(self):
+        row = self.user_row('fields=username&expand=station')
+        self.assertEqual(set(row), {'username', 'station'})
+        self.assertEqual(row['station']['id'], self.stations['FC'].pk)
+        self.assertEqual(row['station']['station_name'], 'Harare Central Clinic')
+        self.assertEqual(row['station']['district_name'], 'Harare Central')
+
+    def test_unknown_names_are_ignored(self):
+        self.assertEqual(set(self.user_row('fields=username,no_such_field')), {'username'})
+        self.assertEqual(self.user_row('expand=no_such_field'), self.user_row(''))
+
+
+class AdminScopeTests(ScopedAPITestCase):
+    """Admins list and reset the passwords of users within their jurisdiction only."""
+
+    def test_user_list_is_scoped_by_profile_station(self):
+        self.create_user('other_province_user', self.create_station_elsewhere())
+        expected = {
+            'HQ': {'admin_hq', 'admin_po', 'admin_do', 'admin_fc', 'other_province_user'},
+            'PO': {'admin_po', 'admin_do', 'admin_fc'},
+            'DO': {'admin_do', 'admin_fc'},
+            'FC': {'admin_fc'},
+        }
+        for role, usernames in expected.items():
+            with self.subTest(role=role):
+                self.authenticate(role)
+                response = self.client.get('/api/accounts/admin/users/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual({row['username'] for row in response.data['results']}, usernames)
+
+    def test_reset_password_is_scoped_by_profile_station(self):
+        outsider = self.create_user('other_province_user', self.create_station_elsewhere())
+        self.authenticate('PO')
+        reset = lambda user: self.client.patch(f'/api/accounts/admin/users/{user.pk}/reset-password/',
+                                               {'new_password': 'Another-pass-2'}, format='json')
+        self.assertEqual(reset(self.admins['FC']).status_code, 200)
+        self.assertEqual(reset(outsider).status_code, 403)
+
+    def create_station_elsewhere(self):
+        province = Province.objects.create(province_name='Bulawayo', province_suffix='02')
+        return Station.objects.create(station_name='Bulawayo Provincial Office', station_address='Bulawayo PO',
+                                      station_type='PO', province=province)
+
+
+class AdminUserDirectoryTests(ScopedAPITestCase):
+    """The admin user directory pages by cursor and searches and filters within the admin's scope."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('HQ')
+
+    def usernames(self, query):
+        response = self.client.get(f'/api/accounts/admin/users/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [row['username'] for row in response.data['results']]
+
+    def test_cursor_pages(self):
+        self.grow_users(12)
+        seen, url = [], '/api/accounts/admin/users/?page_size=5'
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            seen += [row['username'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, sorted(User.objects.values_list('username', flat=True)))
+
+    def test_search(self):
+        rudo = self.create_user('rmoyo', self.stations['DO'])
+        User.objects.filter(pk=rudo.pk).update(first_name='Rudo', last_name='Moyo', national_id='63-123456-X-42')
+        self.assertEqual(self.usernames('search=moyo'), ['rmoyo'])
+        self.assertEqual(self.usernames('search=rudo moyo'), ['rmoyo'])
+        self.assertEqual(self.usernames('search=123456'), ['rmoyo'])
+        self.assertEqual(self.usernames('search=rmoyo@mohcc'), ['rmoyo'])
+        self.assertEqual(self.usernames('search=_d'), ['admin_do'])  # short terms fall back to icontains
+        self.assertEqual(self.usernames('search=nobody'), [])
+
+    def test_filters(self):
+        self.create_user('clinic_clerk', self.stations['FC'])
+        self.assertEqual(self.usernames(f"station={self.stations['FC'].pk}"), ['admin_fc', 'clinic_clerk'])
+        self.assertEqual(self.usernames(f"station={self.stations['FC'].pk}&is_admin=true"), ['admin_fc'])
+        self.assertEqual(self.usernames(f'district={self.district.pk}'), ['admin_do', 'admin_fc', 'clinic_clerk'])
+        self.assertEqual(self.usernames(f'province={self.province.pk}&is_admin=false'), ['clinic_clerk'])
+        self.assertEqual(self.usernames('user_type=NGO'), [])
+
+    def test_filters_do_not_widen_the_scope(self):
+        self.authenticate('DO')
+        self.assertEqual(self.usernames(f"station={self.stations['PO'].pk}"), [])
+        self.assertEqual(self.usernames('search=admin'), ['admin_do', 'admin_fc'])
+
+
+@override_settings(JWT_SCOPE_CLAIMS=True)
+class TokenScopeClaimsTests(ScopedAPITestCase):
+    """Read-only requests with current scope claims in the token load no user."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Claims are only trusted with a cache every worker shares.
+        location = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(JWT_SCOPE_CLAIMS_CACHE='shared', CACHES={
+            **settings.CACHES,
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }))
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        claims_cache().clear()
+        self.grow_assets(3)
+
+    def log_in(self, username):
+        response = self.client.post('/api/accounts/login/', {'username': username, 'password': PASSWORD},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data['tokens']
+
+    def use(self, tokens):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def test_reads_are_authorized_from_claims(self):
+        self.use(self.log_in('admin_fc'))
+        # Only the asset list query: no user, profile or station lookup.
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/assets/assets/')
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.wsgi_request.user.pk, self.admins['FC'].pk)
+
+        # Writes and views that read the whole user still load it.
+        self.assertEqual(self.client.get('/api/profiles/me/').data['user']['username'], 'admin_fc')
+
+    @override_settings(JWT_SCOPE_CLAIMS_CACHE='default')
+    def test_per_process_cache_is_not_trusted(self):
+        # Another worker would not see this process forget the claims: the user is always loaded.
+        self.use(self.log_in('admin_fc'))
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/assets/assets/?status=IN_STOCK')
+            self.assertEqual(response.status_code, 200)
+            response_cache().clear()
+
+    def test_station_move_invalidates_claims(self):
+        old_tokens = self.log_in('admin_fc')
+        self.use(old_tokens)
+        elsewhere = Station.objects.create(station_name='Another Clinic', station_address='Another Clinic',
+                                           station_type='FC', province=self.province, district=self.district,
+                                           station_suffix='0B')
+        response = self.client.put('/api/profiles/update/', {'station': elsewhere.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+        new_tokens = response.data['tokens']
+
+        # The old token's claims are no longer current: the user is loaded and sees the new scope.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/assets/assets/')
+        self.assertEqual(response.data['results'], [])
+
+        # The re-issued token is trusted again (a new filter, so the response cache misses).
+        self.use(new_tokens)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/assets/assets/?status=IN_STOCK')
+        self.assertEqual(response.data['results'], [])
+
+    def test_admin_changes_invalidate_claims(self):
+        self.use(self.log_in('admin_fc'))
+        demoted = self.admins['FC']
+        demoted.is_admin = False
+        demoted.save()
+        self.assertEqual(self.client.get('/api/assets/assets/').status_code, 403)
+
+    def test_finishing_the_profile_reissues_tokens(self):
+        User.objects.create_user(username='new_admin', email='new_admin@mohcc.example', password=PASSWORD,
+                                 user_type='MOH', is_admin=True)
+        self.use(self.log_in('new_admin'))
+        response = self.client.post('/api/profiles/finish/', {
+            'department': 'IT', 'position': 'Officer', 'station': self.stations['FC'].pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.use(response.data['tokens'])
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/assets/assets/')
+        self.assertEqual(len(response.data['results']), 3)
+
+
+    def test_refinishing_the_profile_with_a_new_station_reissues_its_scope(self):
+        self.use(self.log_in('admin_fc'))
+        response = self.client.post('/api/profiles/finish/', {
+            'department': 'IT', 'position': 'Officer', 'station': self.stations['HQ'].pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        tokens = response.data['tokens']
+        claims = current_scope_claims(self.admins['FC'].pk)
+        self.assertEqual((claims['station'], claims['station_type']), (self.stations['HQ'].pk, 'HQ'))
+
+        # The re-issued token has the HQ scope: assets outside the old station are listed.
+        self.grow_assets(2, station=self.stations['DO'])
+        self.use(tokens)
+        self.assertEqual(len(self.client.get('/api/assets/assets/').data['results']), 5)
+
+
+class TokenBlacklistTests(ScopedAPITestCase):
+    """Blacklist checks are answered from the caches after the first lookup."""
+
+    def setUp(self):
+        super().setUp()
+        blacklist_cache().clear()
+        blacklisted_jtis.clear()
+        response = self.client.post('/api/accounts/login/', {'username': 'admin_fc', 'password': PASSWORD},
+                                    format='json')
+        self.tokens = response.data['tokens']
+
+    def refresh(self):
+        return self.client.post('/api/accounts/token/refresh/', {'refresh': self.tokens['refresh']}, format='json')
+
+    def log_out(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/accounts/logout/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 205)
+
+    def test_per_process_cache_does_not_cache_negative_answers(self):
+        # Another worker could blacklist the token: every refresh asks the database.
+        for _ in range(2):
+            with self.assertNumQueries(2):  # blacklist lookup + user
+                self.assertEqual(self.refresh().status_code, 200)
+
+        # A blacklisting is final, so it is remembered even by this process alone.
+        self.log_out()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.refresh().status_code, 401)
+
+    @override_settings(TOKEN_BLACKLIST_CACHE='shared')
+    def test_shared_cache_caches_both_answers(self):
+        with tempfile.TemporaryDirectory() as location, self.settings(CACHES={
+            **settings.CACHES,
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            with self.assertNumQueries(2):
+                self.assertEqual(self.refresh().status_code, 200)
+            # The negative answer is cached: only the user is loaded.
+            with self.assertNumQueries(1):
+                self.assertEqual(self.refresh().status_code, 200)
+
+            self.log_out()
+            # Another process, with only the shared cache, rejects it too.
+            blacklisted_jtis.clear()
+            with self.assertNumQueries(0):
+                self.assertEqual(self.refresh().status_code, 401)
+
+    def test_compaction_deletes_expired_tokens_in_batches(self):
+        expired_at = timezone.now() - timedelta(days=1)
+        for number in range(5):
+            token = OutstandingToken.objects.create(jti=f'expired-{number}', token='x', expires_at=expired_at)
+            if number % 2:
+                BlacklistedToken.objects.create(token=token)
+
+        out = StringIO()
+        call_command('compact_tokens', batch_size=2, stdout=out)
+        self.assertIn("Deleted 5 outstanding and 2 blacklisted tokens in 3 batches.", out.getvalue())
+        self.assertIn("After: 1 outstanding tokens (0 expired), 0 blacklisted tokens.", out.getvalue())
+        self.assertFalse(OutstandingToken.objects.filter(jti__startswith='expired-').exists())
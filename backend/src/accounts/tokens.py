@@ -0,0 +1,130 @@
+"""
+Authorization claims embedded in JWTs.
+
+With JWT_SCOPE_CLAIMS on, tokens issued at login carry the user's type,
+admin flag, profile state and station (id, type, province and district) in
+the SCOPE_CLAIM claim. ScopedJWTAuthentication then authorizes read-only
+requests to views that set `token_claims_auth = True` from the token alone,
+without loading the user, profile or station.
+
+Claims are only trusted while they equal the user's current claims, kept in
+the JWT_SCOPE_CLAIMS_CACHE cache. The entry is written when tokens are
+issued or a database load confirms a token's claims, and deleted whenever the user, their MOH profile or their station
+changes (see accounts.signals), so a token issued before a station move falls
+back to loading the user from the database and gets the new scope. A missing
+entry never grants anything; it only costs that database load.
+
+That deletion only reaches the workers sharing the cache. With a per-process
+backend (LocMemCache, DummyCache) the other workers would keep trusting the
+old claims, so claims are then never trusted and every request loads the user.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+
+from locations.models import District, Province, Station
+from profiles.models import MOHProfile
+from .blacklist import CachedBlacklistRefreshToken, caches_negative_answers
+
+
+SCOPE_CLAIM = 'moh_scope'
+
+
+def scope_claims_enabled():
+    return getattr(settings, 'JWT_SCOPE_CLAIMS', False)
+
+
+def claims_cache():
+    return caches[getattr(settings, 'JWT_SCOPE_CLAIMS_CACHE', 'default')]
+
+
+def _cache_key(user_id):
+    return f'token-scope:{user_id}'
+
+
+def scope_claims(user):
+    """The authorization state of `user` as a JSON-serializable dict."""
+    profile = getattr(user, 'moh_profile', None) if user.user_type == 'MOH' else None
+    station = getattr(profile, 'station', None)
+    return {
+        'user_type': user.user_type,
+        'is_admin': user.is_admin,
+        'profile_complete': user.profile_complete,
+        'station': station.pk if station else None,
+        'station_type': station.station_type if station else None,
+        'province': station.province_id if station else None,
+        'district': station.district_id if station else None,
+    }
+
+
+def remember_scope_claims(user_id, claims):
+    # Bounded by the access token lifetime: a token's claims are trusted at
+    # most that long after they were last confirmed against the database.
+    timeout = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    claims_cache().set(_cache_key(user_id), claims, timeout=timeout)
+
+
+def current_scope_claims(user_id):
+    """The user's current claims, or None when they are unknown or the cache is per-process."""
+    cache = claims_cache()
+    if not caches_negative_answers(cache):
+        return None
+    return cache.get(_cache_key(user_id))
+
+
+def forget_scope_claims(user_ids):
+    """
+    Stops trusting the claims of these users' tokens. Forgets now and again on
+    commit, so claims re-confirmed from pre-commit data meanwhile are dropped too.
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    def forget():
+        claims_cache().delete_many(keys)
+
+    forget()
+    transaction.on_commit(forget)
+
+
+def issue_tokens(user):
+    """A refresh/access token pair for `user`, carrying scope claims when enabled."""
+    refresh = CachedBlacklistRefreshToken.for_user(user)
+    if scope_claims_enabled():
+        claims = scope_claims(user)
+        refresh[SCOPE_CLAIM] = claims  # copied into the access token
+        remember_scope_claims(user.pk, claims)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token)
+    }
+
+
+def user_from_claims(user_model, user_id, claims):
+    """
+    A User carrying only the fields authorization reads, built from token
+    claims without a query. It is read-only: User.save() refuses it.
+    """
+    user = user_model(
+        pk=user_model._meta.pk.to_python(user_id),  # the claim holds it as a string
+        user_type=claims['user_type'],
+        is_admin=claims['is_admin'],
+        profile_complete=claims['profile_complete'],
+        is_active=True,
+    )
+    user._state.adding = False
+    user.from_token_claims = True
+
+    if claims['user_type'] == 'MOH':
+        station = None
+        if claims['station'] is not None:
+            station = Station(pk=claims['station'], station_type=claims['station_type'])
+            station.province = Province(pk=claims['province']) if claims['province'] else None
+            # A station's district is in its province (see Station.assign_location_path).
+            station.district = (
+                District(pk=claims['district'], province_id=claims['province']) if claims['district'] else None
+            )
+        user.moh_profile = MOHProfile(station=station)
+    return user
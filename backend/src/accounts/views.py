@@ -3,14 +3,20 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model, authenticate
-from accounts.permissions import get_admin_scope
+from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
+from django_filters.rest_framework import DjangoFilterBackend
+from accounts.permissions import get_admin_scope, scope_lookups
+from moh_assets_backend.fieldsets import SparseFieldsetViewMixin
+from .filters import AdminUserFilter, UserSearchFilter
+from .pagination import AdminUserCursorPagination
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer, 
     UserUpdateSerializer, 
     LogoutSerializer, 
     ChangePasswordSerializer, 
-    AdminUserListSerializer
+    AdminUserListSerializer,
+    TokenRefreshSerializer
 )
 
 User = get_user_model()
@@ -101,6 +107,9 @@ class LogoutView(APIView):
             status=status.HTTP_205_RESET_CONTENT
         )
 
+class TokenRefreshView(BaseTokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
 class ChangePasswordView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -138,13 +147,15 @@ class AdminChangeUserPasswordView(generics.UpdateAPIView):
         except User.DoesNotExist:
             return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        # Users are scoped through their MOH profile's station; admins without a scope reset nobody.
         scope_filter = get_admin_scope(admin_user)
-        if scope_filter is not None:
-            if not User.objects.filter(id=target_user.id, **scope_filter).exists():
-                return Response(
-                    {"error": "You cannot reset password for this user."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if scope_filter is None or not User.objects.filter(
+            id=target_user.id, **scope_lookups(scope_filter, 'moh_profile__station')
+        ).exists():
+            return Response(
+                {"error": "You cannot reset password for this user."},
+                status=status.HTTP_403_FORBIDDEN
+            )
 
         new_password = request.data.get("new_password")
         if not new_password:
@@ -160,9 +171,28 @@ class AdminChangeUserPasswordView(generics.UpdateAPIView):
             status=status.HTTP_200_OK
         )
 
-class AdminUserListView(generics.ListAPIView):
+class AdminUserListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """
+    GET /api/accounts/admin/users/
+    The users within the admin's jurisdiction, a page at a time in username order.
+
+    Query Parameters:
+    - search: Terms matched against username, email, first/last name and national ID
+    - station / district / province: Ids of the user's profile station, its district or province
+    - user_type / is_admin: Exact filters
+    - cursor / page_size: See AdminUserCursorPagination
+    - fields / expand: Sparse fieldset, e.g. ?fields=id,username&expand=station
+
+    Province and district scopes and filters join user -> MOH profile -> station
+    through the profile's (station, user) index and the station's province and
+    district indexes.
+    """
     serializer_class = AdminUserListSerializer
     permission_classes = [IsAuthenticated]
+    token_claims_auth = True
+    pagination_class = AdminUserCursorPagination
+    filter_backends = [DjangoFilterBackend, UserSearchFilter]
+    filterset_class = AdminUserFilter
 
     def get_queryset(self):
         admin_user = self.request.user
@@ -173,4 +203,4 @@ class AdminUserListView(generics.ListAPIView):
         if scope_filter is None:
             return User.objects.none()
             
-        return User.objects.filter(**scope_filter).order_by('username')
+        return User.objects.filter(**scope_lookups(scope_filter, 'moh_profile__station'))
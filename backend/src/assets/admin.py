@@ -36,7 +36,7 @@ class NonDeviceAssetInline(admin.StackedInline):
 class AssetAdmin(admin.ModelAdmin):
     list_display = ( 'asset_type', 'category', 'current_station', 'status', 'condition', 'created_at')
     list_filter = ('asset_type', 'status', 'condition', 'category')
-    search_fields = ('asset_code',)
+    search_fields = ('device__serial_number', 'non_device__name')
 
     # Dynamically choose inline based on asset_type
     def get_inline_instances(self, request, obj=None):
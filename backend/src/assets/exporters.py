@@ -0,0 +1,83 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
+
+
+# Column name -> queryset lookup. Column names match the import format
+# (see importers.AssetImporter) so an export can be edited and re-imported.
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('asset_type', 'asset_type'),
+    ('category', 'category__name'),
+    ('station_code', 'current_station__station_code'),
+    ('station_name', 'current_station__station_name'),
+    ('status', 'status'),
+    ('condition', 'condition'),
+    ('created_at', 'created_at'),
+    ('device_type', 'device__device_type__name'),
+    ('serial_number', 'device__serial_number'),
+    ('program', 'device__program'),
+    ('partner', 'device__partner'),
+    ('partner_number', 'device__partner_number'),
+    ('name', 'non_device__name'),
+    ('quantity', 'non_device__quantity'),
+    ('additional_notes', 'additional_notes'),
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose write() hands the value straight back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _iter_values(queryset):
+    """
+    Flattens Asset + Device/NonDeviceAsset into plain tuples.
+    Rows are fetched CHUNK_SIZE at a time (a server-side cursor on PostgreSQL),
+    so memory use does not depend on how many assets are exported.
+    """
+    return (
+        queryset
+        .annotate(additional_notes=Coalesce('device__additional_notes', 'non_device__additional_notes'))
+        .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    for row in _iter_values(queryset):
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def stream_ndjson(queryset):
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    for row in _iter_values(queryset):
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(queryset, export_format):
+    """Returns the line generator for the requested export format ('csv' or 'ndjson')."""
+    if export_format == 'ndjson':
+        return stream_ndjson(queryset)
+    return stream_csv(queryset)
@@ -0,0 +1,43 @@
+import django_filters
+from rest_framework import filters
+
+from .models import AssetCountRollup
+from .rollups import SUMMARY_DIMENSIONS
+from .search import search_assets
+
+
+def is_ranked_search(request):
+    """Whether the asset list is ordered by relevance: `?search=` terms without an explicit `?ordering=`."""
+    return bool(AssetSearchFilter().get_search_terms(request)) and not request.query_params.get(
+        AssetOrderingFilter.ordering_param
+    )
+
+
+class AssetSearchFilter(filters.SearchFilter):
+    """
+    `?search=` backed by the asset search index instead of LIKE '%x%' scans.
+    Matching assets are annotated with `search_rank` (lower is better).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return search_assets(queryset, self.get_search_terms(request))
+
+
+class AssetOrderingFilter(filters.OrderingFilter):
+    """
+    Orders search results by relevance unless the client asked for an explicit `?ordering=`.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['search_rank', *self.get_default_ordering(view)]
+        return super().get_ordering(request, queryset, view)
+
+
+class AssetSummaryFilter(django_filters.FilterSet):
+    """Validates the summary's ?asset_type= / ?category= / ?status= / ?condition= filters."""
+    category = django_filters.NumberFilter()
+
+    class Meta:
+        model = AssetCountRollup
+        fields = list(SUMMARY_DIMENSIONS)
@@ -0,0 +1,235 @@
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from locations.models import Station
+from moh_assets_backend.caching import invalidate_stations
+from .models import Asset, AssetCategory, DeviceType, Device, NonDeviceAsset, normalize_serial
+from .ledger import record_movements
+from .rollups import record_created
+
+
+# ------------------------
+# Importer
+# ------------------------
+class AssetImporter:
+    """
+    Bulk asset import.
+
+    Rows are consumed in batches of `batch_size`. For every batch:
+    1. category / device type / station lookups are resolved with one query each
+       (names and codes already seen in earlier batches are not fetched again),
+    2. every row is validated and bad rows are collected in the error report,
+    3. the valid rows are inserted with `bulk_create` (Asset, then Device and
+       NonDeviceAsset) inside one transaction, together with their rollup counts
+       and first ledger entries.
+
+    Expected columns:
+    asset_type, category, station_code, status, condition,
+    device_type, serial_number, program, partner, partner_number,   (DEVICE)
+    name, quantity,                                                  (NON_DEVICE)
+    additional_notes
+    """
+
+    ASSET_TYPES = {choice for choice, _ in Asset.ASSET_TYPE_CHOICES}
+    STATUSES = {choice for choice, _ in Asset.STATUS_CHOICES}
+    CONDITIONS = {choice for choice, _ in Asset.CONDITION_CHOICES}
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.categories = {}
+        self.device_types = {}
+        self.stations = {}  # station code -> (id, location_path)
+        self.seen_serials = set()
+
+    def run(self, rows):
+        """
+        Imports an iterable of row dicts and returns the report:
+        {"total_rows": ..., "created": ..., "failed": ..., "errors": [{"row": ..., "errors": {...}}]}
+        Row numbers are spreadsheet line numbers (the header is row 1).
+        """
+        report = {'total_rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+        numbered = enumerate(rows, start=2)
+
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            report['total_rows'] += len(batch)
+            created, errors = self._import_batch(batch)
+            report['created'] += created
+            report['failed'] += len(errors)
+            report['errors'].extend(errors)
+
+        return report
+
+    # ------------------------
+    # Batch processing
+    # ------------------------
+    def _import_batch(self, batch):
+        self._resolve_lookups(batch)
+        existing_serials = set(
+            Device.objects.filter(
+                serial_normalized__in=[
+                    normalize_serial(row['serial_number']) for _, row in batch if row.get('serial_number')
+                ]
+            ).values_list('serial_normalized', flat=True)
+        )
+
+        # Serials of this batch's valid rows; they only count as seen once the batch is written.
+        batch_serials = set()
+        valid, errors = [], []
+        for row_number, row in batch:
+            row_errors = self._validate_row(row, existing_serials, batch_serials)
+            if row_errors:
+                errors.append({'row': row_number, 'errors': row_errors})
+            else:
+                valid.append((row_number, row))
+
+        if not valid:
+            return 0, errors
+
+        try:
+            with transaction.atomic():
+                self._insert(valid)
+        except IntegrityError as exc:
+            errors.extend(
+                {'row': row_number, 'errors': {'batch': f"Batch rejected by the database: {exc}"}}
+                for row_number, _ in valid
+            )
+            return 0, sorted(errors, key=lambda error: error['row'])
+
+        self.seen_serials |= batch_serials
+        return len(valid), errors
+
+    def _resolve_lookups(self, batch):
+        category_names = {row.get('category') for _, row in batch} - self.categories.keys()
+        device_type_names = {row.get('device_type') for _, row in batch} - self.device_types.keys()
+        station_codes = {row.get('station_code') for _, row in batch} - self.stations.keys()
+
+        # Unknown names are remembered as None so they are not looked up again.
+        if category_names:
+            self.categories.update(dict.fromkeys(category_names))
+            self.categories.update(
+                AssetCategory.objects.filter(name__in=category_names).values_list('name', 'id')
+            )
+        if device_type_names:
+            self.device_types.update(dict.fromkeys(device_type_names))
+            self.device_types.update(
+                (name, (type_id, category_id))
+                for name, type_id, category_id in DeviceType.objects.filter(
+                    name__in=device_type_names
+                ).values_list('name', 'id', 'category_id')
+            )
+        if station_codes:
+            self.stations.update(dict.fromkeys(station_codes))
+            self.stations.update(
+                (code, (station_id, path))
+                for code, station_id, path in Station.objects.filter(
+                    station_code__in=station_codes
+                ).values_list('station_code', 'id', 'location_path')
+            )
+
+    def _validate_row(self, row, existing_serials, batch_serials):
+        errors = {}
+
+        asset_type = row.get('asset_type', '').upper()
+        if asset_type not in self.ASSET_TYPES:
+            errors['asset_type'] = f"Must be one of {', '.join(sorted(self.ASSET_TYPES))}."
+
+        category_id = self.categories.get(row.get('category'))
+        if not category_id:
+            errors['category'] = f"Unknown category '{row.get('category', '')}'."
+
+        station_code = row.get('station_code')
+        if station_code and not self.stations.get(station_code):
+            errors['station_code'] = f"Unknown station code '{station_code}'."
+
+        status = (row.get('status') or 'IN_STOCK').upper()
+        if status not in self.STATUSES:
+            errors['status'] = f"Must be one of {', '.join(sorted(self.STATUSES))}."
+
+        condition = (row.get('condition') or 'GOOD').upper()
+        if condition not in self.CONDITIONS:
+            errors['condition'] = f"Must be one of {', '.join(sorted(self.CONDITIONS))}."
+
+        if asset_type == 'DEVICE':
+            device_type = self.device_types.get(row.get('device_type'))
+            if not device_type:
+                errors['device_type'] = f"Unknown device type '{row.get('device_type', '')}'."
+            elif category_id and device_type[1] != category_id:
+                errors['device_type'] = "Device type does not belong to the given category."
+
+            serial_number = row.get('serial_number')
+            normalized = normalize_serial(serial_number)
+            if not serial_number:
+                errors['serial_number'] = "This field is required for DEVICE assets."
+            elif len(serial_number) > 100:
+                errors['serial_number'] = "Ensure this field has no more than 100 characters."
+            elif normalized in existing_serials:
+                errors['serial_number'] = "A device with this serial number already exists."
+            elif normalized in self.seen_serials or normalized in batch_serials:
+                errors['serial_number'] = "Duplicate serial number in the uploaded file."
+
+            for field in ('program', 'partner', 'partner_number'):
+                if len(row.get(field, '')) > 100:
+                    errors[field] = "Ensure this field has no more than 100 characters."
+
+        elif asset_type == 'NON_DEVICE':
+            name = row.get('name')
+            if not name:
+                errors['name'] = "This field is required for NON_DEVICE assets."
+            elif len(name) > 150:
+                errors['name'] = "Ensure this field has no more than 150 characters."
+
+            quantity = row.get('quantity', '')
+            if not quantity.isdigit():
+                errors['quantity'] = "A whole number is required for NON_DEVICE assets."
+
+        if not errors:
+            row['asset_type'], row['status'], row['condition'] = asset_type, status, condition
+            if asset_type == 'DEVICE':
+                batch_serials.add(normalize_serial(row['serial_number']))
+        return errors
+
+    def _insert(self, valid):
+        assets = []
+        for _, row in valid:
+            station_id, path = self.stations.get(row.get('station_code')) or (None, '')
+            assets.append(Asset(
+                asset_type=row['asset_type'],
+                category_id=self.categories[row['category']],
+                current_station_id=station_id,
+                location_path=path,
+                status=row['status'],
+                condition=row['condition'],
+            ))
+        assets = Asset.objects.bulk_create(assets)
+
+        devices, non_devices = [], []
+        for asset, (_, row) in zip(assets, valid):
+            if asset.asset_type == 'DEVICE':
+                devices.append(Device(
+                    asset=asset,
+                    device_type_id=self.device_types[row['device_type']][0],
+                    serial_number=row['serial_number'],
+                    serial_normalized=normalize_serial(row['serial_number']),
+                    program=row.get('program') or None,
+                    partner=row.get('partner') or None,
+                    partner_number=row.get('partner_number') or None,
+                    additional_notes=row.get('additional_notes', ''),
+                ))
+            else:
+                non_devices.append(NonDeviceAsset(
+                    asset=asset,
+                    name=row['name'],
+                    quantity=int(row['quantity']),
+                    additional_notes=row.get('additional_notes', ''),
+                ))
+
+        Device.objects.bulk_create(devices)
+        NonDeviceAsset.objects.bulk_create(non_devices)
+        record_created(assets)
+        record_movements(assets)
+        invalidate_stations('assets', {asset.current_station_id for asset in assets})
+        return assets
@@ -0,0 +1,40 @@
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from locations.models import Station
+
+from .models import AssetMovement
+
+
+def record_movements(assets, moved_at=None):
+    """Writes the current station/status of each asset to the ledger with a single INSERT."""
+    moved_at = moved_at or timezone.now()
+    AssetMovement.objects.bulk_create([
+        AssetMovement(asset_id=asset.pk, station_id=asset.current_station_id, status=asset.status, moved_at=moved_at)
+        for asset in assets
+    ])
+
+
+def movements_as_of(when):
+    """
+    The ledger row that was current for each asset at `when`: rows at or before
+    `when` with no later row for the same asset up to `when`.
+    Both sides are served by the (station, moved_at) / (asset, moved_at) indexes.
+    """
+    superseded = AssetMovement.objects.filter(
+        Q(moved_at__gt=OuterRef('moved_at')) | Q(moved_at=OuterRef('moved_at'), id__gt=OuterRef('id')),
+        asset=OuterRef('asset'),
+        moved_at__lte=when,
+    )
+    return AssetMovement.objects.filter(moved_at__lte=when).filter(~Exists(superseded))
+
+
+def with_station_names(movements):
+    """
+    Annotates `station_name`: None for stations deleted since. A join would
+    not do: filtering on station_id makes Django join the station table with
+    INNER JOIN, which drops the rows of deleted stations.
+    """
+    return movements.annotate(
+        station_name=Subquery(Station.objects.filter(pk=OuterRef('station_id')).values('station_name')[:1])
+    )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.importers import AssetImporter
+from moh_assets_backend.spreadsheets import iter_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import assets from a CSV or XLSX file, reporting rejected rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the .csv or .xlsx file to import.")
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of rows validated and inserted per transaction (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as fileobj:
+                report = AssetImporter(batch_size=options['batch_size']).run(iter_rows(fileobj, path))
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            details = "; ".join(f"{field}: {message}" for field, message in error['errors'].items())
+            self.stderr.write(f"Row {error['row']}: {details}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} of {report['total_rows']} rows ({report['failed']} rejected)."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from assets.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the asset count rollup table from the assets table."
+
+    def handle(self, *args, **options):
+        buckets = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt asset count rollups ({buckets} buckets)."))
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0003_remove_assetcategory_category_name_and_more'),
+        ('locations', '0004_alter_department_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetCountRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_type', models.CharField(choices=[('DEVICE', 'Device'), ('NON_DEVICE', 'Non-Device Asset')], max_length=20)),
+                ('status', models.CharField(choices=[('IN_STOCK', 'In Stock'), ('ASSIGNED', 'Assigned'), ('MAINTENANCE', 'Under Maintenance'), ('DISPOSED', 'Disposed'), ('STOLEN', 'Stolen')], max_length=20)),
+                ('condition', models.CharField(choices=[('NEW', 'New'), ('GOOD', 'Good / Serviceable'), ('FAIR', 'Fair (Minor Issues)'), ('DAMAGED', 'Damaged'), ('BEYOND_REPAIR', 'Beyond Repair')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assets.assetcategory')),
+                ('station', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.station')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('station', 'category', 'asset_type', 'status', 'condition'), name='unique_asset_count_rollup')],
+            },
+        ),
+    ]
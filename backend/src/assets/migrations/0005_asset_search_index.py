@@ -0,0 +1,35 @@
+from django.db import migrations
+
+from moh_assets_backend.search_index import SearchIndex, SearchSource
+
+
+# SQLite: FTS5 table keyed by asset id, kept in sync by triggers on the
+# subtype tables. PostgreSQL: trigram GIN indexes on the searched columns.
+SEARCH_INDEX = SearchIndex(
+    'assets_asset_search',
+    ['serial_number', 'program', 'partner', 'partner_number', 'name', 'additional_notes'],
+    [
+        SearchSource('assets_device', key='asset_id', columns={
+            'serial_number': 'serial_number',
+            'program': 'program',
+            'partner': 'partner',
+            'partner_number': 'partner_number',
+            'additional_notes': 'additional_notes',
+        }),
+        SearchSource('assets_nondeviceasset', key='asset_id', columns={
+            'name': 'name',
+            'additional_notes': 'additional_notes',
+        }),
+    ],
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0004_assetcountrollup"),
+    ]
+
+    operations = [
+        SEARCH_INDEX.migration_operation(),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_serial_normalized(apps, schema_editor):
+    Device = apps.get_model("assets", "Device")
+    batch = []
+    for device in Device.objects.only("id", "serial_number").iterator(chunk_size=2000):
+        device.serial_normalized = (device.serial_number or "").strip().upper()
+        batch.append(device)
+        if len(batch) >= 2000:
+            Device.objects.bulk_update(batch, ["serial_normalized"])
+            batch = []
+    if batch:
+        Device.objects.bulk_update(batch, ["serial_normalized"])
+
+
+def check_duplicate_serials(apps, schema_editor):
+    """Serials differing only in case or surrounding spaces must be resolved by hand first."""
+    Device = apps.get_model("assets", "Device")
+    duplicates = list(
+        Device.objects.values("serial_normalized")
+        .annotate(devices=Count("id"))
+        .filter(devices__gt=1)
+        .values_list("serial_normalized", flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Several devices share each of these serial numbers (ignoring case and spaces): "
+            f"{', '.join(duplicates)}. Correct them before migrating."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0005_asset_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="device",
+            name="serial_normalized",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                help_text="serial_number trimmed and upper-cased, for barcode lookups",
+                max_length=100,
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_serial_normalized, migrations.RunPython.noop),
+        migrations.RunPython(check_duplicate_serials, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="device",
+            name="serial_normalized",
+            field=models.CharField(
+                editable=False,
+                help_text="serial_number trimmed and upper-cased, for barcode lookups",
+                max_length=100,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_movements(apps, schema_editor):
+    # Existing assets start their history at creation, at their current station and status.
+    Asset = apps.get_model("assets", "Asset")
+    AssetMovement = apps.get_model("assets", "AssetMovement")
+    batch = []
+    for asset in Asset.objects.values("id", "current_station_id", "status", "created_at").iterator(chunk_size=2000):
+        batch.append(AssetMovement(
+            asset_id=asset["id"],
+            station_id=asset["current_station_id"],
+            status=asset["status"],
+            moved_at=asset["created_at"],
+        ))
+        if len(batch) >= 2000:
+            AssetMovement.objects.bulk_create(batch)
+            batch = []
+    AssetMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0006_device_serial_normalized'),
+        ('locations', '0004_alter_department_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('IN_STOCK', 'In Stock'), ('ASSIGNED', 'Assigned'), ('MAINTENANCE', 'Under Maintenance'), ('DISPOSED', 'Disposed'), ('STOLEN', 'Stolen')], max_length=20)),
+                ('moved_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='assets.asset')),
+                ('station', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='locations.station')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['asset', 'moved_at'], name='assets_move_asset_time_idx'), models.Index(fields=['station', 'moved_at'], name='assets_move_station_time_idx')],
+            },
+        ),
+        migrations.RunPython(seed_movements, migrations.RunPython.noop),
+    ]
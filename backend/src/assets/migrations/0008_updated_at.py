@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0007_assetmovement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="asset",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="assetcategory",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="devicetype",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="assetmovement",
+            index=models.Index(fields=["moved_at"], name="assets_move_time_idx"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0008_updated_at'),
+        ('locations', '0005_station_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asset',
+            name='category',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='assets.assetcategory'),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='current_station',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='locations.station'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['-created_at', 'id'], name='assets_asset_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['current_station', '-created_at'], name='assets_asset_stn_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['current_station', 'status', '-created_at'], name='assets_asset_stn_st_cr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['status', '-created_at'], name='assets_asset_st_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['category', '-created_at'], name='assets_asset_cat_created_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:30
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_location_path(apps, schema_editor):
+    Asset = apps.get_model('assets', 'Asset')
+    Station = apps.get_model('locations', 'Station')
+    station_path = Station.objects.filter(pk=OuterRef('current_station_id')).values('location_path')[:1]
+    Asset.objects.update(location_path=Coalesce(Subquery(station_path), Value('')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0009_asset_list_indexes'),
+        ('locations', '0006_station_location_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='location_path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.RunPython(populate_location_path, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['location_path', '-created_at'], name='assets_asset_path_created_idx'),
+        ),
+    ]
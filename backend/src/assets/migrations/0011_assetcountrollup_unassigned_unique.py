@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def recount_unassigned_buckets(apps, schema_editor):
+    # Each deleted station left its own NULL-station row per bucket, and later
+    # deltas were applied to all of them: recount those buckets from the assets.
+    Asset = apps.get_model("assets", "Asset")
+    AssetCountRollup = apps.get_model("assets", "AssetCountRollup")
+    AssetCountRollup.objects.filter(station=None).delete()
+    AssetCountRollup.objects.bulk_create([
+        AssetCountRollup(station=None, count=bucket.pop("total"), **bucket)
+        for bucket in Asset.objects.filter(current_station=None)
+        .values("category_id", "asset_type", "status", "condition")
+        .annotate(total=Count("id"))
+        .order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0010_asset_location_path'),
+        ('locations', '0007_station_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_unassigned_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assetcountrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('station__isnull', True)), fields=('category', 'asset_type', 'status', 'condition'), name='unique_unassigned_asset_count_rollup'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from locations.models import Station
 
 
@@ -9,6 +10,7 @@ from locations.models import Station
 class AssetCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -41,16 +43,48 @@ class Asset(models.Model):
 
     
     asset_type = models.CharField(max_length=20, choices=ASSET_TYPE_CHOICES)
-    category = models.ForeignKey(AssetCategory, on_delete=models.PROTECT)
+    # Both FKs are the leading column of a composite index in Meta, which replaces the default FK index.
+    category = models.ForeignKey(AssetCategory, on_delete=models.PROTECT, db_index=False)
     current_station = models.ForeignKey(
-        Station, on_delete=models.SET_NULL, null=True, blank=True
+        Station, on_delete=models.SET_NULL, null=True, blank=True, db_index=False
     )
+    # Copy of current_station.location_path, so province and district scopes
+    # filter the asset table alone. Set by save(); bulk paths set it themselves.
+    location_path = models.CharField(max_length=32, blank=True, default='', editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='IN_STOCK')
     condition = models.CharField(max_length=20, choices=CONDITION_CHOICES, default='GOOD')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by save(); bulk UPDATE paths must set it themselves (delta sync relies on it).
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # Tuned to the AssetViewSet filters and its (-created_at, id) cursor ordering,
+        # so a page is read in index order instead of sorting the filtered rows.
+        # Measure with `manage.py benchmark_asset_indexes`.
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='assets_asset_created_idx'),
+            models.Index(fields=['current_station', '-created_at'], name='assets_asset_stn_created_idx'),
+            models.Index(fields=['current_station', 'status', '-created_at'], name='assets_asset_stn_st_cr_idx'),
+            models.Index(fields=['status', '-created_at'], name='assets_asset_st_created_idx'),
+            models.Index(fields=['category', '-created_at'], name='assets_asset_cat_created_idx'),
+            models.Index(fields=['location_path', '-created_at'], name='assets_asset_path_created_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.asset_code} - {self.category.name}"
+        return f"#{self.pk} - {self.category.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the values the rollup counts are based on, so save/delete
+        # hooks can move the asset out of its old bucket (see assets.signals).
+        loaded = instance.__dict__
+        if all(field in loaded for field in ('current_station_id', 'category_id', 'asset_type', 'status', 'condition')):
+            instance._loaded_rollup_key = (
+                loaded['current_station_id'], loaded['category_id'],
+                loaded['asset_type'], loaded['status'], loaded['condition'],
+            )
+        return instance
 
     # ------------------------
     # Validation: Subtype completeness
@@ -87,16 +121,26 @@ class Asset(models.Model):
     # ------------------------
     def save(self, *args, **kwargs):
         self.full_clean()  # runs clean() to enforce all validation
+        self.location_path = self.current_station.location_path if self.current_station_id else ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'current_station', 'current_station_id'} & set(update_fields):
+            kwargs['update_fields'] = [*update_fields, 'location_path']
         super().save(*args, **kwargs)
 
 
 class DeviceType(models.Model):
     name = models.CharField(max_length=50, unique=True)
     category = models.ForeignKey(AssetCategory, on_delete=models.PROTECT, related_name='device_types')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
 
+def normalize_serial(value):
+    """Canonical form used for scanner lookups: trimmed and upper-cased."""
+    return (value or '').strip().upper()
+
+
 class Device(models.Model):
     asset = models.OneToOneField(
         Asset,
@@ -106,11 +150,19 @@ class Device(models.Model):
     )
     device_type = models.ForeignKey(DeviceType, on_delete=models.PROTECT)
     serial_number = models.CharField(max_length=100, unique=True)
+    serial_normalized = models.CharField(
+        max_length=100, unique=True, editable=False,
+        help_text="serial_number trimmed and upper-cased, for barcode lookups"
+    )
     program = models.CharField(max_length=100, blank=True, null=True)
     partner = models.CharField(max_length=100, blank=True, null=True)
     partner_number = models.CharField(max_length=100, blank=True, null=True)
     additional_notes = models.TextField(blank=True)
 
+    def save(self, *args, **kwargs):
+        self.serial_normalized = normalize_serial(self.serial_number)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.device_type} ({self.serial_number})"
 
@@ -127,3 +179,80 @@ class NonDeviceAsset(models.Model):
 
     def __str__(self):
         return f"{self.name} (Qty: {self.quantity})"
+
+
+# ------------------------
+# Asset Count Rollup
+# ------------------------
+class AssetCountRollup(models.Model):
+    """
+    Pre-aggregated asset counts per (station, category, asset_type, status, condition).
+
+    Kept current by the Asset save/delete hooks and by the bulk paths in
+    assets.rollups. Rebuild from scratch with `manage.py rebuild_asset_rollups`.
+    """
+    station = models.ForeignKey(
+        Station, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    category = models.ForeignKey(AssetCategory, on_delete=models.CASCADE, related_name='+')
+    asset_type = models.CharField(max_length=20, choices=Asset.ASSET_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=Asset.STATUS_CHOICES)
+    condition = models.CharField(max_length=20, choices=Asset.CONDITION_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'category', 'asset_type', 'status', 'condition'],
+                name='unique_asset_count_rollup',
+            ),
+            # NULLs are distinct in the constraint above, so station-less buckets need their own.
+            models.UniqueConstraint(
+                fields=['category', 'asset_type', 'status', 'condition'],
+                condition=models.Q(station__isnull=True),
+                name='unique_unassigned_asset_count_rollup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.station_id}/{self.category_id}/{self.asset_type}/{self.status}/{self.condition}: {self.count}"
+
+
+# ------------------------
+# Asset Movement Ledger
+# ------------------------
+class AssetMovement(models.Model):
+    """
+    Append-only history of an asset's station and status.
+
+    One row is written when an asset is created and one each time its
+    current_station or status changes. Each row is the asset's state from
+    `moved_at` until the next row for the same asset.
+
+    Deleting a station must not rewrite history, so `station` has no database
+    constraint and keeps the id of a deleted station (which then joins to nothing).
+    """
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name='movements')
+    station = models.ForeignKey(
+        Station, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    status = models.CharField(max_length=20, choices=Asset.STATUS_CHOICES)
+    moved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Full history of one asset
+            models.Index(fields=['asset', 'moved_at'], name='assets_move_asset_time_idx'),
+            # What was at a station at a point in time
+            models.Index(fields=['station', 'moved_at'], name='assets_move_station_time_idx'),
+            # Movements since a sync token (see sync.changes)
+            models.Index(fields=['moved_at'], name='assets_move_time_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Asset movements are append-only and cannot be changed.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Asset #{self.asset_id} -> {self.station_id} ({self.status}) at {self.moved_at}"
@@ -0,0 +1,100 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class AssetCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the asset list.
+
+    Pages are addressed by an opaque cursor holding a position on the first
+    ordering field (created_at by default). The next page is the rows past
+    that position (`WHERE created_at < :position` for the default newest-first
+    order, `>` for `?ordering=created_at`) plus a small offset over rows that
+    share the position's timestamp, so fetching page 500 costs the same as
+    fetching page 1 instead of an ever-growing OFFSET.
+
+    That only holds while the first ordering field is close to unique: on a
+    field with a handful of values (status) the offset would grow with the
+    page number. Client ordering is therefore limited to KEYSET_FIELDS.
+
+    Query Parameters:
+    - cursor: Opaque value taken from the `next` / `previous` links.
+    - page_size: Optional page size (max 200).
+    - ordering: created_at / updated_at, optionally prefixed with '-'.
+    """
+    ordering = ('-created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    # Fields with (nearly) unique values, usable as cursor positions.
+    KEYSET_FIELDS = ('created_at', 'updated_at')
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Honour `?ordering=` from the OrderingFilter when it leads with one of
+        KEYSET_FIELDS, and append the (-created_at, id) key so that rows are
+        totally ordered: the offset over rows sharing a position then always
+        skips the same rows.
+        """
+        ordering = list(super().get_ordering(request, queryset, view))
+        if ordering[0].lstrip('-') not in self.KEYSET_FIELDS:
+            ordering = list(self.ordering)
+        ordered_fields = {field.lstrip('-') for field in ordering}
+        for field in self.ordering:
+            if field.lstrip('-') not in ordered_fields:
+                ordering.append(field)
+        return tuple(ordering)
+
+
+class AssetSearchPagination(LimitOffsetPagination):
+    """
+    Pagination for search results ranked by relevance.
+
+    CursorPagination keys its position on the first ordering field, and
+    search_rank only has five values, so a cursor into ranked results would
+    degrade into an OFFSET within a tier anyway. Ranked pages are addressed
+    by offset instead, without the COUNT(*) a LimitOffsetPagination response
+    normally carries: one extra row is fetched to know whether a next page
+    exists. Responses have the same shape as the cursor pages.
+
+    Query Parameters:
+    - offset: Position of the first result, taken from the `next` / `previous` links.
+    - page_size: Optional page size (max 200).
+    """
+    default_limit = AssetCursorPagination.page_size
+    limit_query_param = AssetCursorPagination.page_size_query_param
+    max_limit = AssetCursorPagination.max_page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.offset <= self.limit:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.offset_query_param, self.offset - self.limit)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return AssetCursorPagination().get_paginated_response_schema(schema)
@@ -0,0 +1,139 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import Asset, AssetCountRollup
+
+
+ROLLUP_FIELDS = ('station_id', 'category_id', 'asset_type', 'status', 'condition')
+
+
+def rollup_key(asset):
+    """The rollup bucket an asset is counted in: (station_id, category_id, asset_type, status, condition)."""
+    return (asset.current_station_id, asset.category_id, asset.asset_type, asset.status, asset.condition)
+
+
+def apply_deltas(deltas):
+    """
+    Adds a {rollup_key: delta} mapping to the rollup table.
+    Each bucket costs one UPDATE, plus an INSERT the first time the bucket is seen.
+    """
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        bucket = dict(zip(ROLLUP_FIELDS, key))
+        if AssetCountRollup.objects.filter(**bucket).update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                AssetCountRollup.objects.create(count=delta, **bucket)
+        except IntegrityError:
+            # Another request created the bucket in the meantime.
+            AssetCountRollup.objects.filter(**bucket).update(count=F('count') + delta)
+
+
+def record_created(assets):
+    """Counts freshly bulk-created assets."""
+    apply_deltas(Counter(rollup_key(asset) for asset in assets))
+
+
+def release_station(station_id):
+    """
+    Moves a station's buckets into the station-less ones before the station is
+    deleted, as its assets' current_station is about to be set to NULL. Left to
+    SET_NULL, every deleted station would leave its own NULL-station row per bucket.
+    """
+    buckets = AssetCountRollup.objects.filter(station_id=station_id)
+    deltas = Counter()
+    for category_id, asset_type, status, condition, count in buckets.values_list(*ROLLUP_FIELDS[1:], 'count'):
+        deltas[(None, category_id, asset_type, status, condition)] += count
+    buckets.delete()
+    apply_deltas(deltas)
+
+
+# Scope level -> (breakdown name, breakdown id lookup, breakdown name lookup)
+SUMMARY_LEVELS = {
+    'national': ('province', 'station__province', 'station__province__province_name'),
+    'province': ('district', 'station__district', 'station__district__district_name'),
+    'district': ('station', 'station', 'station__station_name'),
+    'station': ('station', 'station', 'station__station_name'),
+}
+
+SUMMARY_DIMENSIONS = ('asset_type', 'category', 'status', 'condition')
+
+
+def summary_level(admin_scope):
+    """Maps a get_admin_scope() filter to the level the summary is reported at."""
+    if not admin_scope:
+        return 'national'
+    if 'station__province' in admin_scope:
+        return 'province'
+    if 'station__district' in admin_scope:
+        return 'district'
+    return 'station'
+
+
+def summarize(admin_scope, group_by=(), filters=None):
+    """
+    Sums the rollup table inside an admin scope.
+
+    The result is broken down one level below the scope (national -> provinces,
+    province -> districts, district -> stations) and optionally by any of
+    SUMMARY_DIMENSIONS. `filters` narrows the buckets, e.g. {'status': 'ASSIGNED'}.
+    """
+    level = summary_level(admin_scope)
+    breakdown, id_lookup, name_lookup = SUMMARY_LEVELS[level]
+
+    rows = (
+        AssetCountRollup.objects
+        .filter(**admin_scope, **(filters or {}))
+        .values(id_lookup, name_lookup, *group_by)
+        .annotate(total=Sum('count'))
+        .filter(total__gt=0)
+        .order_by(name_lookup, *group_by)
+    )
+
+    results = []
+    for row in rows:
+        result = {'id': row[id_lookup], 'name': row[name_lookup]}
+        result.update((dimension, row[dimension]) for dimension in group_by)
+        result['count'] = row['total']
+        results.append(result)
+
+    return {
+        'level': level,
+        'breakdown': breakdown,
+        'total': sum(result['count'] for result in results),
+        'results': results,
+    }
+
+
+def rebuild_rollups():
+    """
+    Recomputes the whole rollup table from assets_asset with a single GROUP BY.
+    Returns the number of buckets written.
+    """
+    buckets = (
+        Asset.objects
+        .values('current_station_id', 'category_id', 'asset_type', 'status', 'condition')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        AssetCountRollup.objects.all().delete()
+        created = AssetCountRollup.objects.bulk_create(
+            [
+                AssetCountRollup(
+                    station_id=bucket['current_station_id'],
+                    category_id=bucket['category_id'],
+                    asset_type=bucket['asset_type'],
+                    status=bucket['status'],
+                    condition=bucket['condition'],
+                    count=bucket['total'],
+                )
+                for bucket in buckets.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(created)
@@ -0,0 +1,95 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from moh_assets_backend.search_index import SearchIndex, SearchSource, fts5_phrase
+
+
+# Fields covered by the search index (see migration 0005_asset_search_index).
+SEARCH_FIELDS = [
+    'device__serial_number',
+    'device__program',
+    'device__partner',
+    'device__partner_number',
+    'device__additional_notes',
+    'non_device__name',
+    'non_device__additional_notes',
+]
+
+# FTS5's trigram tokenizer cannot match terms shorter than this.
+MIN_TRIGRAM_LENGTH = 3
+
+# FTS5 table fed by the subtype tables (see migration 0005_asset_search_index).
+SEARCH_INDEX = SearchIndex(
+    'assets_asset_search',
+    ['serial_number', 'program', 'partner', 'partner_number', 'name', 'additional_notes'],
+    [
+        SearchSource('assets_device', key='asset_id', columns={
+            'serial_number': 'serial_number',
+            'program': 'program',
+            'partner': 'partner',
+            'partner_number': 'partner_number',
+            'additional_notes': 'additional_notes',
+        }),
+        SearchSource('assets_nondeviceasset', key='asset_id', columns={
+            'name': 'name',
+            'additional_notes': 'additional_notes',
+        }),
+    ],
+)
+
+# post_migrate handler: SQLite drops a table's triggers whenever a migration
+# rebuilds that table (most AddField/AlterField operations do).
+ensure_search_triggers = SEARCH_INDEX.ensure_triggers
+
+
+def _contains_any(term, fields=SEARCH_FIELDS):
+    return reduce(or_, (Q(**{f'{field}__icontains': term}) for field in fields))
+
+
+def _rank(query):
+    """
+    Relevance tiers, lower is better: exact serial, serial prefix, identifier
+    match, name/program/partner match, notes only. Only evaluated on rows that
+    already matched, so it costs a few comparisons per result.
+    """
+    return Case(
+        When(device__serial_number__iexact=query, then=Value(0)),
+        When(device__serial_number__istartswith=query, then=Value(1)),
+        When(_contains_any(query, ['device__serial_number', 'device__partner_number']), then=Value(2)),
+        When(_contains_any(query, ['non_device__name', 'device__program', 'device__partner']), then=Value(3)),
+        default=Value(4),
+        output_field=IntegerField(),
+    )
+
+
+def search_assets(queryset, terms):
+    """
+    Filters `queryset` to assets matching every term and annotates `search_rank`
+    (lower is a better match).
+
+    - SQLite: MATCH against the FTS5 trigram table; terms shorter than three
+      characters fall back to icontains.
+    - PostgreSQL: icontains, served by the trigram GIN indexes.
+    """
+    if not terms:
+        return queryset
+
+    indexed = terms
+    if connection.vendor == 'sqlite':
+        indexed = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+        if indexed:
+            queryset = queryset.filter(
+                id__in=SEARCH_INDEX.matching_ids(' AND '.join(fts5_phrase(term) for term in indexed))
+            )
+        indexed_terms = set(indexed)
+        terms_left = [term for term in terms if term not in indexed_terms]
+    else:
+        terms_left = terms
+
+    if terms_left:
+        queryset = queryset.filter(reduce(and_, (_contains_any(term) for term in terms_left)))
+
+    return queryset.annotate(search_rank=_rank(' '.join(terms)))
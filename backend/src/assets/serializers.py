@@ -1,5 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Asset, Device, NonDeviceAsset, DeviceType, AssetCategory
+from accounts.permissions import get_admin_scope, scope_lookups
+from locations.models import Station
+from locations.serializers import StationSerializer
+from moh_assets_backend.fieldsets import SparseFieldsetMixin
+from .models import Asset, AssetMovement, Device, NonDeviceAsset, DeviceType, AssetCategory, normalize_serial
 
 
 class AssetCategorySerializer(serializers.ModelSerializer):
@@ -21,6 +26,16 @@ class DeviceSerializer(serializers.ModelSerializer):
         model = Device
         fields = ['device_type', 'serial_number', 'program', 'partner', 'partner_number', 'additional_notes']
 
+    def validate_serial_number(self, value):
+        """Scanner lookups ignore case and surrounding spaces, so serials must be unique that way too."""
+        duplicates = Device.objects.filter(serial_normalized=normalize_serial(value))
+        asset = getattr(self.parent, 'instance', None)
+        if asset is not None:
+            duplicates = duplicates.exclude(asset=asset)
+        if duplicates.exists():
+            raise serializers.ValidationError("A device with this serial number already exists.")
+        return value
+
 
 class NonDeviceAssetSerializer(serializers.ModelSerializer):
     class Meta:
@@ -28,18 +43,25 @@ class NonDeviceAssetSerializer(serializers.ModelSerializer):
         fields = ['name', 'quantity', 'additional_notes']
 
 
-class AssetSerializer(serializers.ModelSerializer):
+class AssetSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     device = DeviceSerializer(required=False)
     non_device = NonDeviceAssetSerializer(required=False)
 
     class Meta:
         model = Asset
         fields = [
-            'id', 'asset_code', 'asset_type', 'category', 'current_station',
+            'id', 'asset_type', 'category', 'current_station',
             'status', 'condition', 'created_at', 'device', 'non_device'
         ]
+        expandable_fields = {
+            'category': (AssetCategorySerializer, {}),
+            'current_station': (StationSerializer, {}),
+        }
 
     def validate(self, data):
+        if self.partial and 'asset_type' not in data:
+            # PATCHing asset fields (e.g. moving an asset) leaves the subtype as it is.
+            return data
         asset_type = data.get('asset_type') or getattr(self.instance, 'asset_type', None)
         if asset_type == 'DEVICE' and 'device' not in data:
             raise serializers.ValidationError("Device data must be provided for DEVICE asset_type.")
@@ -51,12 +73,17 @@ class AssetSerializer(serializers.ModelSerializer):
         device_data = validated_data.pop('device', None)
         non_device_data = validated_data.pop('non_device', None)
 
-        asset = Asset.objects.create(**validated_data)
-
+        # Attach the subtype before saving: Asset.save() runs full_clean(),
+        # which requires the Device / NonDeviceAsset record to be present.
+        asset = Asset(**validated_data)
         if asset.asset_type == 'DEVICE':
-            Device.objects.create(asset=asset, **device_data)
-        elif asset.asset_type == 'NON_DEVICE':
-            NonDeviceAsset.objects.create(asset=asset, **non_device_data)
+            asset.device = subtype = Device(**device_data)
+        else:
+            asset.non_device = subtype = NonDeviceAsset(**non_device_data)
+
+        with transaction.atomic():
+            asset.save()
+            subtype.save()
 
         return asset
 
@@ -74,3 +101,58 @@ class AssetSerializer(serializers.ModelSerializer):
             NonDeviceAsset.objects.update_or_create(asset=instance, defaults=non_device_data)
 
         return instance
+
+
+class AssetCompactSerializer(serializers.ModelSerializer):
+    """
+    Flat asset record for scanner lookups.
+    Expects the queryset to select_related category, current_station and device__device_type.
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    station_name = serializers.CharField(source='current_station.station_name', read_only=True, default=None)
+    station_code = serializers.CharField(source='current_station.station_code', read_only=True, default=None)
+    serial_number = serializers.CharField(source='device.serial_number', read_only=True)
+    device_type = serializers.CharField(source='device.device_type.name', read_only=True)
+
+    class Meta:
+        model = Asset
+        fields = [
+            'id', 'asset_type', 'category', 'category_name', 'current_station', 'station_name',
+            'station_code', 'status', 'condition', 'serial_number', 'device_type'
+        ]
+
+
+class AssetMovementSerializer(serializers.ModelSerializer):
+    # Annotated by assets.ledger.with_station_names
+    station_name = serializers.CharField(read_only=True, default=None)
+
+    class Meta:
+        model = AssetMovement
+        fields = ['asset', 'station', 'station_name', 'status', 'moved_at']
+
+
+class BulkTransitionSerializer(serializers.Serializer):
+    """
+    Request body of the bulk transition endpoint: pick assets by `ids` or by
+    list `filters`, and give at least one of the target fields.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filters = serializers.DictField(required=False, allow_empty=False)
+    status = serializers.ChoiceField(choices=Asset.STATUS_CHOICES, required=False)
+    condition = serializers.ChoiceField(choices=Asset.CONDITION_CHOICES, required=False)
+    current_station = serializers.PrimaryKeyRelatedField(queryset=Station.objects.all(), required=False)
+
+    TARGET_FIELDS = ('status', 'condition', 'current_station')
+
+    def validate_current_station(self, station):
+        admin_scope = get_admin_scope(self.context['request'].user) or {}
+        if not Station.objects.filter(**scope_lookups(admin_scope, None)).filter(pk=station.pk).exists():
+            raise serializers.ValidationError("Station is outside your jurisdiction.")
+        return station
+
+    def validate(self, data):
+        if ('ids' in data) == ('filters' in data):
+            raise serializers.ValidationError("Provide either 'ids' or 'filters'.")
+        if not any(field in data for field in self.TARGET_FIELDS):
+            raise serializers.ValidationError("Provide at least one of: status, condition, current_station.")
+        return data
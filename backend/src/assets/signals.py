@@ -0,0 +1,122 @@
+from collections import Counter
+
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from locations.models import District, Station, location_path
+from locations.signals import stations_imported
+from moh_assets_backend.caching import bump_generations, invalidate_stations
+from .ledger import record_movements
+from .models import Asset, AssetCategory, Device, DeviceType, NonDeviceAsset
+from .rollups import apply_deltas, release_station, rollup_key
+
+# Sent when assets' location_path changes while their station stays the same
+# (the station or its district moved, or the station was deleted), with
+# `previous`: the (asset id, old location_path) of each asset that moved.
+asset_paths_changed = Signal()
+
+
+@receiver(pre_save, sender=Asset)
+def remember_rollup_key(sender, instance, **kwargs):
+    # Instances loaded with deferred fields have no snapshot; read it before it is overwritten.
+    if instance.pk and not hasattr(instance, '_loaded_rollup_key'):
+        previous = Asset.objects.filter(pk=instance.pk).first()
+        if previous is not None:
+            instance._loaded_rollup_key = rollup_key(previous)
+
+
+@receiver(post_save, sender=Asset)
+def update_rollups_on_save(sender, instance, created, **kwargs):
+    new_key = rollup_key(instance)
+    old_key = None if created else getattr(instance, '_loaded_rollup_key', None)
+    if old_key != new_key:
+        deltas = Counter({new_key: 1})
+        if old_key is not None:
+            deltas[old_key] -= 1
+        apply_deltas(deltas)
+
+        # Ledger: one row on create and whenever station (key[0]) or status (key[3]) changes.
+        if old_key is None or (old_key[0], old_key[3]) != (new_key[0], new_key[3]):
+            record_movements([instance])
+    instance._loaded_rollup_key = new_key
+    invalidate_stations('assets', {instance.current_station_id, old_key[0] if old_key else None})
+
+
+@receiver(post_delete, sender=Asset)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    key = getattr(instance, '_loaded_rollup_key', None) or rollup_key(instance)
+    apply_deltas({key: -1})
+    invalidate_stations('assets', {instance.current_station_id})
+
+
+@receiver(pre_delete, sender=Station)
+def release_station_rollups(sender, instance, **kwargs):
+    release_station(instance.pk)
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+@receiver(post_save, sender=NonDeviceAsset)
+@receiver(post_delete, sender=NonDeviceAsset)
+def invalidate_subtype_asset(sender, instance, **kwargs):
+    # Assets render their Device / NonDeviceAsset inline.
+    station_ids = Asset.objects.filter(pk=instance.asset_id).values_list('current_station_id', flat=True)
+    invalidate_stations('assets', set(station_ids))
+
+
+@receiver(post_save, sender=AssetCategory)
+@receiver(post_delete, sender=AssetCategory)
+@receiver(post_save, sender=DeviceType)
+@receiver(post_delete, sender=DeviceType)
+def invalidate_catalogue(sender, **kwargs):
+    bump_generations('catalogue')
+    if sender is AssetCategory:
+        # Shown in every scope through ?expand=category.
+        bump_generations('assets')
+
+
+def move_asset_paths(assets, current, new):
+    """
+    Sets location_path to `new` on those of `assets` whose path is not
+    `current` (either may be an expression). updated_at is stamped too, so
+    delta sync sends them to their new scope; asset_paths_changed lets it
+    tell the old one.
+    """
+    moved = assets.exclude(location_path=current)
+    previous = list(moved.order_by().values_list('id', 'location_path'))
+    if previous:
+        moved.update(location_path=new, updated_at=Now())
+        asset_paths_changed.send(sender=Asset, previous=previous)
+
+
+@receiver(post_save, sender=Station)
+def sync_station_location_path(sender, instance, **kwargs):
+    # A station moved to another district or province takes its assets' paths along.
+    path = instance.location_path
+    move_asset_paths(Asset.objects.filter(current_station=instance), path, path)
+
+
+@receiver(post_save, sender=District)
+def sync_district_location_path(sender, instance, created, **kwargs):
+    if not created:
+        path = location_path(instance.province_id, instance.pk)
+        move_asset_paths(Asset.objects.filter(current_station__district=instance), path, path)
+
+
+@receiver(pre_delete, sender=Station)
+def clear_deleted_station_paths(sender, instance, **kwargs):
+    # The SET_NULL cascade keeps location_path, which would leave the assets in
+    # the old province and district scopes.
+    move_asset_paths(Asset.objects.filter(current_station=instance), '', '')
+
+
+@receiver(stations_imported)
+def sync_imported_location_paths(sender, updated=(), **kwargs):
+    if updated:
+        move_asset_paths(
+            Asset.objects.filter(current_station_id__in=updated),
+            F('current_station__location_path'),
+            Subquery(Station.objects.filter(pk=OuterRef('current_station_id')).values('location_path')[:1]),
+        )
@@ -1,3 +1,781 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts.permissions import get_admin_scope, scope_path_lookups
+from moh_assets_backend.testing import QueryCountTestCase, ScopedAPITestCase
+
+from locations.models import District, Province, Station
+from .importers import AssetImporter
+from .models import Asset, AssetCategory, AssetCountRollup, AssetMovement, Device, DeviceType
+
+
+class AssetQueryCountTests(QueryCountTestCase):
+    """Asset endpoints issue a fixed number of queries however many assets they return."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('FC')
+
+    def test_asset_list(self):
+        for role in ('HQ', 'FC'):
+            with self.subTest(role=role):
+                self.authenticate(role)
+                self.assertQueriesAtEverySize(2, self.grow_assets, lambda: self.client.get('/api/assets/assets/'))
+
+    def test_asset_list_filtered_and_searched(self):
+        self.assertQueriesAtEverySize(
+            2, self.grow_assets, lambda: self.client.get('/api/assets/assets/?asset_type=DEVICE&status=IN_STOCK')
+        )
+        self.assertQueriesAtEverySize(2, self.grow_assets, lambda: self.client.get('/api/assets/assets/?search=QC'))
+
+    def test_asset_list_sparse(self):
+        self.assertQueriesAtEverySize(
+            2, self.grow_assets,
+            lambda: self.client.get('/api/assets/assets/?fields=id,status,current_station&expand=current_station'),
+        )
+
+    def test_asset_retrieve(self):
+        self.grow_assets(1)
+        asset = Asset.objects.order_by('id').first()
+        self.assertQueriesAtEverySize(2, self.grow_assets, lambda: self.client.get(f'/api/assets/assets/{asset.pk}/'))
+
+    def test_asset_history(self):
+        self.grow_assets(1)
+        asset = Asset.objects.order_by('id').first()
+
+        def grow(size):
+            while asset.movements.count() < size:
+                asset.status = 'MAINTENANCE' if asset.status != 'MAINTENANCE' else 'IN_STOCK'
+                asset.save()
+
+        self.assertQueriesAtEverySize(3, grow, lambda: self.client.get(f'/api/assets/assets/{asset.pk}/history/'))
+
+    def test_asset_as_of(self):
+        station = self.stations['FC']
+        self.assertQueriesAtEverySize(
+            2, self.grow_assets, lambda: self.client.get(f'/api/assets/assets/as-of/?station={station.pk}')
+        )
+
+    def test_asset_summary(self):
+        self.authenticate('PO')
+        self.assertQueriesAtEverySize(
+            2, self.grow_assets, lambda: self.client.get('/api/assets/assets/summary/?group_by=status,category')
+        )
+
+    def test_asset_export(self):
+        self.assertQueriesAtEverySize(2, self.grow_assets, lambda: self.client.get('/api/assets/assets/export/'))
+        self.assertQueriesAtEverySize(
+            2, self.grow_assets, lambda: self.client.get('/api/assets/assets/export/?export_format=ndjson')
+        )
+
+    def test_bulk_transition(self):
+        # Rollup updates cost a query per bucket touched, so each size starts
+        # afresh with devices and non-devices in the same two buckets.
+        for size in self.SIZES:
+            with self.subTest(size=size), transaction.atomic():
+                self.grow_assets(2 * size)
+                ids = list(Asset.objects.values_list('id', flat=True))
+                with self.assertNumQueries(16):
+                    response = self.client.patch('/api/assets/assets/bulk-transition/',
+                                                 {'ids': ids, 'condition': 'DAMAGED'}, format='json')
+                self.assertEqual(response.status_code, 200)
+                transaction.set_rollback(True)
+
+    def test_lookup_by_serial(self):
+        self.grow_assets(2)
+        serial = Device.objects.order_by('id').first().serial_number
+        self.assertQueriesAtEverySize(
+            2, self.grow_assets, lambda: self.client.get(f'/api/assets/by-serial/{serial.lower()}/')
+        )
+
+    def test_lookup_by_serial_batch(self):
+        def request():
+            serials = list(Device.objects.values_list('serial_number', flat=True)) + ['MISSING-1']
+            return self.client.post('/api/assets/by-serial/', {'serials': serials}, format='json')
+
+        self.assertQueriesAtEverySize(3, self.grow_assets, request)
+
+    def test_category_list(self):
+        def grow(size):
+            for number in range(AssetCategory.objects.count(), size):
+                AssetCategory.objects.create(name=f'Category {number}')
+
+        self.assertQueriesAtEverySize(2, grow, lambda: self.client.get('/api/assets/categories/'))
+
+    def test_device_type_list(self):
+        def grow(size):
+            for number in range(DeviceType.objects.count(), size):
+                category = AssetCategory.objects.create(name=f'Category {number}')
+                DeviceType.objects.create(name=f'Type {number}', category=category)
+
+        self.assertQueriesAtEverySize(2, grow, lambda: self.client.get('/api/assets/device-types/'))
+
+
+class AssetPaginationTests(ScopedAPITestCase):
+    """The asset list pages with a keyset cursor that neither skips nor repeats rows."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('FC')
+        self.grow_assets(7)
+
+    def pages(self, **params):
+        pages = [self.client.get('/api/assets/assets/', {'page_size': 2, **params}).data]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data)
+        return pages
+
+    def ids(self, pages):
+        return [asset['id'] for page in pages for asset in page['results']]
+
+    def test_pages_cover_every_asset_once(self):
+        pages = self.pages()
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(self.ids(pages), list(Asset.objects.order_by('-created_at', 'id').values_list('id', flat=True)))
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(self.ids([previous]), self.ids(pages[2:3]))
+
+    def test_shared_timestamps_are_paged_by_id(self):
+        Asset.objects.update(created_at=timezone.now())
+        self.assertEqual(self.ids(self.pages()), list(Asset.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_ordering_on_keyset_fields(self):
+        expected = list(Asset.objects.order_by('created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(self.ids(self.pages(ordering='created_at')), expected)
+
+    def test_ordering_on_other_fields_is_ignored(self):
+        expected = list(Asset.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(self.ids(self.pages(ordering='status')), expected)
+        self.assertEqual(self.ids(self.pages(ordering='status,-created_at')), expected)
+
+
+class AssetSerialLookupTests(ScopedAPITestCase):
+    """Scanned serials resolve to one asset: they are unique ignoring case and surrounding spaces."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('HQ')
+
+    def create(self, serial):
+        return self.client.post('/api/assets/assets/', {
+            'asset_type': 'DEVICE', 'category': self.category.pk, 'current_station': self.stations['FC'].pk,
+            'device': {'device_type': self.device_type.pk, 'serial_number': serial},
+        }, format='json')
+
+    def test_serials_with_slashes(self):
+        asset_id = self.create('SN/2024/001').data['id']
+        response = self.client.get('/api/assets/by-serial/sn/2024/001/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], asset_id)
+
+    def test_serials_differing_in_case_are_rejected(self):
+        self.assertEqual(self.create('ab-100').status_code, 201)
+        response = self.create(' AB-100 ')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('serial_number', response.data['device'])
+
+    def test_updates_keep_their_own_serial(self):
+        asset_id = self.create('AB-200').data['id']
+        response = self.client.patch(f'/api/assets/assets/{asset_id}/', {
+            'asset_type': 'DEVICE', 'device': {'device_type': self.device_type.pk, 'serial_number': 'ab-200'},
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Device.objects.get(asset_id=asset_id).serial_normalized, 'AB-200')
+
+
+class AssetImportTests(ScopedAPITestCase):
+    """Asset imports validate every row, write valid ones per batch and report the rest."""
+
+    def device_row(self, serial, **fields):
+        return {'asset_type': 'DEVICE', 'category': 'Computers', 'station_code': '01010A', 'status': 'IN_STOCK',
+                'condition': 'GOOD', 'device_type': 'Laptop', 'serial_number': serial, **fields}
+
+    def test_upload_creates_assets_with_rollups_and_ledger(self):
+        self.authenticate('HQ')
+        upload = SimpleUploadedFile('assets.csv', (
+            b"asset_type,category,station_code,status,condition,device_type,serial_number,name,quantity\n"
+            b"DEVICE,Computers,01010A,IN_STOCK,GOOD,Laptop,IMP-001,,\n"
+            b"NON_DEVICE,Computers,01010A,ASSIGNED,FAIR,,,Desk,3\n"
+        ), content_type='text/csv')
+        response = self.client.post('/api/assets/assets/import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'total_rows': 2, 'created': 2, 'failed': 0, 'errors': []})
+        device = Device.objects.get(serial_number='IMP-001')
+        self.assertEqual(device.asset.current_station, self.stations['FC'])
+        self.assertEqual(device.asset.location_path, self.stations['FC'].location_path)
+        self.assertEqual(device.asset.movements.count(), 1)
+        self.assertEqual(self.client.get('/api/assets/assets/summary/').data['total'], 2)
+
+    def test_rejects_bad_rows(self):
+        rows = [
+            self.device_row('IMP-100'),
+            self.device_row('IMP-101', category='Furniture'),
+            self.device_row('IMP-102', station_code='99999Z'),
+            self.device_row('IMP-103', status='LOST'),
+            self.device_row(''),
+            {'asset_type': 'NON_DEVICE', 'category': 'Computers', 'name': 'Desk', 'quantity': 'two'},
+            {'asset_type': 'VEHICLE', 'category': 'Computers'},
+        ]
+        report = AssetImporter().run(rows)
+        self.assertEqual((report['created'], report['failed']), (1, 6))
+        self.assertEqual([list(error['errors']) for error in report['errors']], [
+            ['category'], ['station_code'], ['status'], ['serial_number'], ['quantity'], ['asset_type'],
+        ])
+
+    def test_rejects_duplicate_serials(self):
+        self.grow_assets(2)
+        taken = Device.objects.get().serial_number
+        rows = [self.device_row('IMP-200'), self.device_row(taken.lower()), self.device_row(' imp-200 ')]
+        report = AssetImporter().run(rows)
+        self.assertEqual((report['created'], report['failed']), (1, 2))
+        self.assertEqual([(error['row'], error['errors']['serial_number']) for error in report['errors']], [
+            (3, "A device with this serial number already exists."),
+            (4, "Duplicate serial number in the uploaded file."),
+        ])
+
+    def test_rows_of_a_rejected_batch_can_be_retried(self):
+        insert = AssetImporter._insert
+
+        def fail_first_batch(importer, valid):
+            if valid[0][1]['serial_number'] == 'IMP-300':
+                raise IntegrityError("simulated conflict")
+            return insert(importer, valid)
+
+        rows = [self.device_row('IMP-300'), self.device_row('IMP-301'),
+                self.device_row('IMP-302'), self.device_row('IMP-301')]
+        with mock.patch.object(AssetImporter, '_insert', autospec=True, side_effect=fail_first_batch):
+            report = AssetImporter(batch_size=2).run(rows)
+
+        self.assertEqual((report['created'], report['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        self.assertIn('batch', report['errors'][0]['errors'])
+        self.assertEqual(set(Device.objects.values_list('serial_number', flat=True)), {'IMP-301', 'IMP-302'})
+
+
+class AssetLedgerTests(ScopedAPITestCase):
+    """The movement ledger answers an asset's history and what a station held at a point in time."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('HQ')
+        self.outreach = Station.objects.create(station_name='Outreach Clinic', station_address='Outreach',
+                                               station_type='FC', province=self.province, district=self.district,
+                                               station_suffix='0C')
+        self.grow_assets(1, station=self.outreach)
+        self.asset = Asset.objects.get(current_station=self.outreach)
+        self.asset.current_station = self.stations['FC']
+        self.asset.status = 'MAINTENANCE'
+        self.asset.save()
+        # Created ten days ago, moved five days ago.
+        created, moved = self.asset.movements.order_by('id')
+        self.now = timezone.now()
+        AssetMovement.objects.filter(pk=created.pk).update(moved_at=self.now - timedelta(days=10))
+        AssetMovement.objects.filter(pk=moved.pk).update(moved_at=self.now - timedelta(days=5))
+
+    def history(self):
+        response = self.client.get(f'/api/assets/assets/{self.asset.pk}/history/')
+        self.assertEqual(response.status_code, 200)
+        return [(row['station'], row['station_name'], row['status']) for row in response.data]
+
+    def as_of(self, station, **params):
+        return self.client.get('/api/assets/assets/as-of/', {'station': getattr(station, 'pk', station), **params})
+
+    def held(self, station, **params):
+        response = self.as_of(station, **params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['asset'], row['status']) for row in response.data['results']]
+
+    def test_history_lists_every_move_oldest_first(self):
+        self.assertEqual(self.history(), [
+            (self.outreach.pk, 'Outreach Clinic', 'IN_STOCK'),
+            (self.stations['FC'].pk, 'Harare Central Clinic', 'MAINTENANCE'),
+        ])
+
+    def test_as_of_reads_the_state_at_that_time(self):
+        week_ago = (self.now - timedelta(days=7)).date().isoformat()
+        self.assertEqual(self.held(self.outreach, date=week_ago), [(self.asset.pk, 'IN_STOCK')])
+        self.assertEqual(self.held(self.stations['FC'], date=week_ago), [])
+        self.assertEqual(self.held(self.outreach), [])
+        self.assertEqual(self.held(self.stations['FC']), [(self.asset.pk, 'MAINTENANCE')])
+        self.assertEqual(self.held(self.outreach, date=(self.now - timedelta(days=11)).isoformat()), [])
+
+    def test_as_of_is_limited_to_the_admin_scope(self):
+        week_ago = (self.now - timedelta(days=7)).date().isoformat()
+        self.authenticate('FC')
+        self.assertEqual(self.held(self.outreach, date=week_ago), [])
+        self.assertEqual(self.held(self.stations['FC']), [(self.asset.pk, 'MAINTENANCE')])
+
+    def test_as_of_rejects_bad_parameters(self):
+        for params in ({'date': '2024-13-45'}, {'date': '2024-02-30T10:00'}, {'date': 'yesterday'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.as_of(self.outreach, **params).status_code, 400)
+        self.assertEqual(self.client.get('/api/assets/assets/as-of/').status_code, 400)
+
+    def test_deleting_a_station_keeps_its_history(self):
+        week_ago = (self.now - timedelta(days=7)).date().isoformat()
+        station_id = self.outreach.pk
+        self.outreach.delete()
+
+        self.assertEqual(self.history()[0], (station_id, None, 'IN_STOCK'))
+        self.assertEqual(self.held(station_id, date=week_ago), [(self.asset.pk, 'IN_STOCK')])
+
+
+class AssetSummaryTests(ScopedAPITestCase):
+    """The summary reads the rollup table, which stays equal to counting the assets."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('HQ')
+        self.grow_assets(4)
+        self.grow_assets(2, station=self.stations['DO'])
+
+    def summary(self, role='HQ', **params):
+        self.authenticate(role)
+        response = self.client.get('/api/assets/assets/summary/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assertMatchesAssets(self):
+        by_status = {}
+        for asset in Asset.objects.all():
+            by_status[asset.status] = by_status.get(asset.status, 0) + 1
+        national = self.summary(group_by='status')
+        summed = {}
+        for row in national['results']:
+            summed[row['status']] = summed.get(row['status'], 0) + row['count']
+        self.assertEqual(summed, by_status)
+        self.assertEqual(national['total'], Asset.objects.count())
+
+        by_station = self.summary('DO')
+        self.assertEqual({row['id']: row['count'] for row in by_station['results']}, {
+            station.pk: Asset.objects.filter(current_station=station).count()
+            for station in (self.stations['DO'], self.stations['FC'])
+            if Asset.objects.filter(current_station=station).exists()
+        })
+
+    def test_rollups_follow_creates_updates_and_deletes(self):
+        self.assertMatchesAssets()
+
+        self.grow_assets(6)
+        self.assertMatchesAssets()
+
+        asset = Asset.objects.filter(current_station=self.stations['FC']).order_by('id').first()
+        asset.status = 'MAINTENANCE'
+        asset.current_station = self.stations['DO']
+        asset.save()
+        self.assertMatchesAssets()
+
+        ids = list(Asset.objects.filter(current_station=self.stations['DO']).values_list('id', flat=True))
+        response = self.client.patch('/api/assets/assets/bulk-transition/',
+                                     {'ids': ids, 'status': 'DISPOSED'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesAssets()
+
+        self.authenticate('HQ')
+        self.assertEqual(self.client.delete(f'/api/assets/assets/{ids[0]}/').status_code, 204)
+        Asset.objects.filter(current_station=self.stations['FC']).first().delete()
+        self.assertMatchesAssets()
+
+    def test_deleting_stations_keeps_the_totals(self):
+        clinics = [
+            Station.objects.create(station_name=f'Clinic {suffix}', station_address=f'Clinic {suffix}',
+                                   station_type='FC', province=self.province, district=self.district,
+                                   station_suffix=suffix)
+            for suffix in ('0B', '0C')
+        ]
+        for clinic in clinics:
+            self.grow_assets(2, station=clinic)
+        for clinic in clinics:
+            clinic.delete()
+        self.assertEqual(AssetCountRollup.objects.filter(station=None).count(), 2)  # devices, non-devices
+        self.assertMatchesAssets()
+
+        # Deltas for the assets left without a station land in a single bucket.
+        for asset in Asset.objects.filter(current_station=None):
+            asset.status = 'MAINTENANCE'
+            asset.save()
+        self.assertMatchesAssets()
+        self.assertEqual(self.summary()['total'], Asset.objects.count())
+
+    def test_filters(self):
+        self.assertEqual(self.summary(category=self.category.pk, status='IN_STOCK')['total'], 6)
+        self.assertEqual(self.summary(asset_type='DEVICE')['total'],
+                         Asset.objects.filter(asset_type='DEVICE').count())
+        self.assertEqual(self.summary(status='DISPOSED')['total'], 0)
+
+    def test_invalid_filters_are_rejected(self):
+        for params in ({'category': 'abc'}, {'status': 'LOST_AT_SEA'}, {'group_by': 'colour'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/assets/assets/summary/', params).status_code, 400)
+
+
+class AssetSearchTests(ScopedAPITestCase):
+    """`?search=` goes through the search index, ranks by relevance and pages ranked results by offset."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('FC')
+
+    def create_device(self, serial, **fields):
+        asset = Asset(asset_type='DEVICE', category=self.category, current_station=self.stations['FC'])
+        asset.device = device = Device(device_type=self.device_type, serial_number=serial, **fields)
+        asset.save()
+        device.asset = asset
+        device.save()
+        return asset
+
+    def search(self, term, **params):
+        response = self.client.get('/api/assets/assets/', {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def found(self, term, **params):
+        return [asset['id'] for asset in self.search(term, **params)['results']]
+
+    def test_terms_match_the_indexed_fields(self):
+        laptop = self.create_device('SN-LAP-77', program='Malaria', partner='Global Fund')
+        self.grow_assets(4)
+
+        self.assertEqual(self.found('lap-77'), [laptop.pk])
+        self.assertEqual(self.found('global fund'), [laptop.pk])
+        self.assertEqual(self.found('malaria lap'), [laptop.pk])
+        self.assertEqual(sorted(self.found('chair')),
+                         sorted(Asset.objects.filter(asset_type='NON_DEVICE').values_list('id', flat=True)))
+        self.assertEqual(self.found('nothing-like-this'), [])
+
+    def test_results_are_ranked_by_relevance(self):
+        exact = self.create_device('RANK-1')
+        prefix = self.create_device('RANK-1-B')
+        noted = self.create_device('OTHER-9', additional_notes='Replaces RANK-1')
+
+        self.assertEqual(self.found('rank-1'), [exact.pk, prefix.pk, noted.pk])
+        # An explicit ordering replaces the ranking.
+        self.assertEqual(self.found('rank-1', ordering='-created_at'), [noted.pk, prefix.pk, exact.pk])
+
+    def test_index_follows_writes(self):
+        asset = self.create_device('OLD-SERIAL')
+        asset.device.serial_number = 'NEW-SERIAL'
+        asset.device.save()
+        self.assertEqual(self.found('old-serial'), [])
+        self.assertEqual(self.found('new-serial'), [asset.pk])
+
+        asset.delete()
+        self.assertEqual(self.found('new-serial'), [])
+
+    def test_ranked_results_page_by_offset(self):
+        self.grow_assets(6)
+        pages = [self.search('QC', page_size=2)]
+        while pages[-1]['next']:
+            self.assertIn('offset=', pages[-1]['next'])
+            pages.append(self.client.get(pages[-1]['next']).data)
+
+        found = [asset['id'] for page in pages for asset in page['results']]
+        self.assertEqual(len(pages), 2)  # three devices
+        self.assertEqual(sorted(found), sorted(Device.objects.values_list('asset_id', flat=True)))
+        self.assertIsNone(pages[0]['previous'])
+        self.assertIsNotNone(pages[1]['previous'])
+        self.assertNotIn('count', pages[0])
+
+        # Explicitly ordered searches keep the keyset cursor.
+        self.assertIn('cursor=', self.search('QC', page_size=2, ordering='created_at')['next'])
+
+
+class AssetBulkTransitionTests(ScopedAPITestCase):
+    """Bulk transitions are all-or-nothing, limited to the caller's scope and to allowed status changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_clinic = Station.objects.create(station_name='Epworth Clinic', station_address='Epworth FC',
+                                                   station_type='FC', province=self.province,
+                                                   district=self.district, station_suffix='0B')
+        self.grow_assets(2)
+        self.grow_assets(1, station=self.other_clinic)
+        self.mine = list(Asset.objects.filter(current_station=self.stations['FC']).order_by('id'))
+        self.theirs = Asset.objects.get(current_station=self.other_clinic)
+        self.authenticate('FC')
+
+    def transition(self, **body):
+        return self.client.patch('/api/assets/assets/bulk-transition/', body, format='json')
+
+    def statuses(self):
+        return dict(Asset.objects.values_list('id', 'status'))
+
+    def test_assets_outside_the_scope_are_refused(self):
+        before = self.statuses()
+        response = self.transition(ids=[self.mine[0].pk, self.theirs.pk], status='MAINTENANCE')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing'], [self.theirs.pk])
+        self.assertEqual(self.statuses(), before)
+
+    def test_filters_stay_inside_the_scope(self):
+        response = self.transition(filters={'current_station': self.other_clinic.pk}, status='MAINTENANCE')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(Asset.objects.get(pk=self.theirs.pk).status, 'IN_STOCK')
+
+        response = self.transition(filters={'colour': 'red'}, status='MAINTENANCE')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('colour', response.data['filters'])
+
+    def test_target_station_must_be_in_scope(self):
+        response = self.transition(ids=[self.mine[0].pk], current_station=self.other_clinic.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Asset.objects.get(pk=self.mine[0].pk).current_station_id, self.stations['FC'].pk)
+
+    def test_invalid_status_transitions_are_refused(self):
+        stolen, disposed = self.mine
+        Asset.objects.filter(pk=stolen.pk).update(status='STOLEN')
+        Asset.objects.filter(pk=disposed.pk).update(status='DISPOSED')
+
+        response = self.transition(ids=[stolen.pk, disposed.pk], status='ASSIGNED')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['rejected'],
+                         {'STOLEN->ASSIGNED': [stolen.pk], 'DISPOSED->ASSIGNED': [disposed.pk]})
+
+        self.authenticate('HQ')
+        response = self.transition(ids=[disposed.pk], current_station=self.other_clinic.pk)
+        self.assertEqual(response.data['rejected'], {'DISPOSED->move': [disposed.pk]})
+
+        # One refused asset leaves the others unchanged.
+        response = self.transition(ids=[stolen.pk, self.theirs.pk], status='IN_STOCK')
+        self.assertEqual(response.status_code, 200)
+        response = self.transition(ids=[disposed.pk, stolen.pk], status='MAINTENANCE')
+        self.assertEqual(response.data['rejected'], {'DISPOSED->MAINTENANCE': [disposed.pk]})
+        self.assertEqual(Asset.objects.get(pk=stolen.pk).status, 'IN_STOCK')
+
+    def test_allowed_transitions_are_applied(self):
+        ids = [asset.pk for asset in self.mine]
+        response = self.transition(ids=ids, status='ASSIGNED', condition='FAIR')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 2, 'ids': ids})
+        self.assertEqual(set(Asset.objects.filter(pk__in=ids).values_list('status', 'condition')),
+                         {('ASSIGNED', 'FAIR')})
+
+
+class AssetExportTests(ScopedAPITestCase):
+    """The streamed export holds the same scoped, filtered assets as the list."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_clinic = Station.objects.create(station_name='Epworth Clinic', station_address='Epworth FC',
+                                                   station_type='FC', province=self.province,
+                                                   district=self.district, station_suffix='0B')
+        self.grow_assets(5)
+        self.grow_assets(3, station=self.other_clinic)
+        self.authenticate('FC')
+
+    def listed(self, **params):
+        response = self.client.get('/api/assets/assets/', {'page_size': 200, **params})
+        return {asset['id']: asset for asset in response.data['results']}
+
+    def export(self, export_format, **params):
+        response = self.client.get('/api/assets/assets/export/', {'export_format': export_format, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'.{export_format}"', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_matches_the_list(self):
+        listed = self.listed()
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+
+        self.assertEqual([int(row['id']) for row in rows], list(listed))
+        for row in rows:
+            asset = listed[int(row['id'])]
+            self.assertEqual((row['asset_type'], row['status'], row['station_code'], row['category']),
+                             (asset['asset_type'], asset['status'], self.stations['FC'].station_code, 'Computers'))
+            if asset['asset_type'] == 'DEVICE':
+                self.assertEqual(row['serial_number'], asset['device']['serial_number'])
+            else:
+                self.assertEqual((row['name'], row['serial_number']), (asset['non_device']['name'], ''))
+
+    def test_ndjson_matches_the_list(self):
+        listed = self.listed()
+        rows = [json.loads(line) for line in self.export('ndjson').splitlines()]
+
+        self.assertEqual([row['id'] for row in rows], list(listed))
+        for row in rows:
+            asset = listed[row['id']]
+            self.assertEqual((row['status'], row['condition']), (asset['status'], asset['condition']))
+            self.assertEqual(row['serial_number'], (asset['device'] or {}).get('serial_number'))
+
+    def test_filters_and_scope_apply(self):
+        devices = self.listed(asset_type='DEVICE')
+        rows = list(csv.DictReader(io.StringIO(self.export('csv', asset_type='DEVICE'))))
+        self.assertEqual([int(row['id']) for row in rows], list(devices))
+
+        self.authenticate('DO')
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual([int(row['id']) for row in rows], list(self.listed()))
+
+
+class AssetListCacheTests(ScopedAPITestCase):
+    """The asset list is cached per admin scope and invalidated by writes in that scope."""
+
+    def setUp(self):
+        super().setUp()
+        self.grow_assets(3)
+
+    def test_admins_with_the_same_scope_share_entries(self):
+        other_po_admin = self.create_user('admin_po_2', self.stations['PO'], is_admin=True)
+        self.authenticate('PO')
+        self.assertEqual(self.client.get('/api/assets/assets/')['X-Cache'], 'MISS')
+
+        self.authenticate(other_po_admin)
+        # Only the authenticating user query (with its profile and station) runs.
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/assets/assets/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(response.data['results']), 3)
+
+        self.authenticate('FC')
+        self.assertEqual(self.client.get('/api/assets/assets/')['X-Cache'], 'MISS')
+
+    def test_query_parameters_are_normalized(self):
+        self.authenticate('FC')
+        self.client.get('/api/assets/assets/?status=IN_STOCK&asset_type=DEVICE')
+        response = self.client.get('/api/assets/assets/?asset_type=DEVICE&status=IN_STOCK&condition=')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        response = self.client.get('/api/assets/assets/?asset_type=NON_DEVICE&status=IN_STOCK')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_writes_invalidate_the_scopes_that_see_them(self):
+        province = Province.objects.create(province_name='Bulawayo', province_suffix='02')
+        district = District.objects.create(district_name='Bulawayo Central', province=province, district_suffix='01')
+        elsewhere = Station.objects.create(station_name='Bulawayo Clinic', station_address='Bulawayo FC',
+                                           station_type='FC', province=province, district=district)
+        for role in ('HQ', 'PO', 'FC'):
+            self.authenticate(role)
+            self.client.get('/api/assets/assets/')
+
+        # A write in another province leaves the PO and FC entries warm.
+        self.grow_assets(1, station=elsewhere)
+        for role, expected in (('HQ', 'MISS'), ('PO', 'HIT'), ('FC', 'HIT')):
+            self.authenticate(role)
+            self.assertEqual(self.client.get('/api/assets/assets/')['X-Cache'], expected, role)
+
+        # Moving an asset out of the facility invalidates both sides.
+        asset = Asset.objects.filter(current_station=self.stations['FC']).first()
+        self.authenticate('HQ')
+        self.client.patch('/api/assets/assets/bulk-transition/',
+                          {'ids': [asset.pk], 'current_station': elsewhere.pk}, format='json')
+        self.authenticate('FC')
+        response = self.client.get('/api/assets/assets/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotIn(asset.pk, [row['id'] for row in response.data['results']])
+
+    def test_subtype_and_category_writes_invalidate(self):
+        self.authenticate('FC')
+        self.client.get('/api/assets/assets/')
+        device = Device.objects.first()
+        device.program = 'TB'
+        device.save()
+        self.assertEqual(self.client.get('/api/assets/assets/')['X-Cache'], 'MISS')
+
+        self.category.name = 'Computing'
+        self.category.save()
+        self.assertEqual(self.client.get('/api/assets/assets/')['X-Cache'], 'MISS')
+
+
+class AssetConditionalGetTests(ScopedAPITestCase):
+    """ETags come from the scope's change version, so a 304 skips the list query and the serializer."""
+
+    def setUp(self):
+        super().setUp()
+        self.grow_assets(3)
+        self.authenticate('FC')
+
+    def test_list_not_modified(self):
+        response = self.client.get('/api/assets/assets/')
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # Only the authenticating user query runs.
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/assets/assets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.assertEqual(self.client.get('/api/assets/assets/?status=IN_STOCK', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.grow_assets(4)
+        response = self.client.get('/api/assets/assets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_retrieve_not_modified(self):
+        asset = Asset.objects.first()
+        etag = self.client.get(f'/api/assets/assets/{asset.pk}/')['ETag']
+        self.assertEqual(self.client.get(f'/api/assets/assets/{asset.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.patch(f'/api/assets/assets/{asset.pk}/', {'condition': 'FAIR'}, format='json')
+        self.assertEqual(self.client.get(f'/api/assets/assets/{asset.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_catalogue_not_modified(self):
+        for path in ('/api/assets/categories/', '/api/assets/device-types/'):
+            etag = self.client.get(path)['ETag']
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            DeviceType.objects.create(name=f'Tablet {path}', category=self.category)
+            self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AssetLocationPathTests(ScopedAPITestCase):
+    """Province and district scopes filter Asset.location_path, which follows station moves."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_province = Province.objects.create(province_name='Bulawayo', province_suffix='02')
+        self.other_district = District.objects.create(district_name='Bulawayo Central', province=self.other_province,
+                                                      district_suffix='01')
+        self.other_clinic = Station.objects.create(station_name='Bulawayo Clinic', station_address='Bulawayo FC',
+                                                   station_type='FC', province=self.other_province,
+                                                   district=self.other_district, station_suffix='0B')
+        self.grow_assets(2)
+        self.grow_assets(3, station=self.other_clinic)
+
+    def visible(self, role):
+        return Asset.objects.filter(**scope_path_lookups(get_admin_scope(self.admins[role]))).count()
+
+    def test_scopes_filter_the_asset_table_alone(self):
+        self.assertEqual({role: self.visible(role) for role in self.admins}, {'HQ': 5, 'PO': 2, 'DO': 2, 'FC': 2})
+        for role in ('PO', 'DO'):
+            query = str(Asset.objects.filter(**scope_path_lookups(get_admin_scope(self.admins[role]))).query)
+            self.assertNotIn('JOIN', query)
+
+    def test_paths_follow_station_and_district_moves(self):
+        clinic = self.stations['FC']
+        clinic.province, clinic.district = self.other_province, self.other_district
+        clinic.save()
+        self.assertEqual((self.visible('PO'), self.visible('DO')), (0, 0))
+
+        self.other_district.province = self.province
+        self.other_district.save()
+        self.assertEqual(self.visible('PO'), 5)
+        self.assertEqual(set(Asset.objects.values_list('location_path', flat=True)),
+                         {f'{self.province.pk}/{self.other_district.pk}/'})
+
+    def test_deleting_a_station_takes_its_assets_out_of_scopes(self):
+        self.stations['FC'].delete()
+        self.assertEqual(set(Asset.objects.filter(current_station=None).values_list('location_path', flat=True)),
+                         {''})
+        self.assertEqual((self.visible('PO'), self.visible('DO')), (0, 0))
+
+    def test_transitions_move_paths(self):
+        self.authenticate('HQ')
+        ids = list(Asset.objects.filter(current_station=self.other_clinic).values_list('id', flat=True))
+        response = self.client.patch('/api/assets/assets/bulk-transition/',
+                                     {'ids': ids, 'current_station': self.stations['FC'].pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.visible('DO'), 5)
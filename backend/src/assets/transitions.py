@@ -0,0 +1,104 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from moh_assets_backend.caching import invalidate_stations
+from .ledger import record_movements
+from .models import Asset
+from .rollups import apply_deltas
+
+
+# Status -> statuses an asset may move to. Keeping the same status is always
+# allowed (e.g. moving ASSIGNED laptops between facilities); DISPOSED is final.
+ALLOWED_STATUS_TRANSITIONS = {
+    'IN_STOCK': {'ASSIGNED', 'MAINTENANCE', 'DISPOSED', 'STOLEN'},
+    'ASSIGNED': {'IN_STOCK', 'MAINTENANCE', 'DISPOSED', 'STOLEN'},
+    'MAINTENANCE': {'IN_STOCK', 'ASSIGNED', 'DISPOSED'},
+    'STOLEN': {'IN_STOCK'},
+    'DISPOSED': set(),
+}
+
+MAX_BULK_TRANSITION = 5000
+
+_ROW_FIELDS = ('id', 'current_station_id', 'category_id', 'asset_type', 'status', 'condition')
+
+
+class TransitionError(Exception):
+    """Raised when a bulk transition is rejected; `detail` is the error response body."""
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def _rejected(rows, changes):
+    """{'FROM->TO': [ids]} for every row whose status/station may not be changed."""
+    rejected = defaultdict(list)
+    target = changes.get('status')
+    for row in rows:
+        current = row[4]
+        if target and target != current and target not in ALLOWED_STATUS_TRANSITIONS[current]:
+            rejected[f'{current}->{target}'].append(row[0])
+        elif current == 'DISPOSED' and 'current_station' in changes:
+            rejected['DISPOSED->move'].append(row[0])
+    return dict(rejected)
+
+
+def apply_transition(queryset, changes, ids=None):
+    """
+    Applies `changes` (any of status, condition, current_station) to every asset
+    in `queryset` with one UPDATE, all-or-nothing.
+
+    The rows are read once (locked on PostgreSQL) to check the transitions and to
+    derive the rollup deltas and ledger rows, so no per-asset save() runs.
+    When `ids` is given, every id must be inside `queryset` (i.e. the admin's scope).
+    Returns the ids that were updated, or raises TransitionError.
+    """
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().order_by('id').values_list(*_ROW_FIELDS)[:MAX_BULK_TRANSITION + 1])
+        if len(rows) > MAX_BULK_TRANSITION:
+            raise TransitionError({"error": f"At most {MAX_BULK_TRANSITION} assets can be transitioned at once."})
+
+        if ids is not None:
+            missing = set(ids) - {row[0] for row in rows}
+            if missing:
+                raise TransitionError({
+                    "error": "Some assets do not exist or are outside your jurisdiction.",
+                    "missing": sorted(missing),
+                })
+
+        rejected = _rejected(rows, changes)
+        if rejected:
+            raise TransitionError({"error": "Transition not allowed for some assets.", "rejected": rejected})
+
+        updated_ids = [row[0] for row in rows]
+        if not updated_ids:
+            return updated_ids
+
+        values = dict(changes)
+        if 'current_station' in values:
+            station = values.pop('current_station')
+            values['current_station_id'] = getattr(station, 'pk', None)
+            values['location_path'] = getattr(station, 'location_path', '')
+        Asset.objects.filter(id__in=updated_ids).update(**values, updated_at=timezone.now())
+
+        deltas = Counter()
+        moved = []
+        for row in rows:
+            old_key = row[1:]
+            new = dict(zip(_ROW_FIELDS[1:], old_key), **values)
+            new_key = tuple(new[field] for field in _ROW_FIELDS[1:])
+            if new_key != old_key:
+                deltas[old_key] -= 1
+                deltas[new_key] += 1
+            if (new['current_station_id'], new['status']) != (row[1], row[4]):
+                moved.append(Asset(pk=row[0], current_station_id=new['current_station_id'], status=new['status']))
+        apply_deltas(deltas)
+        record_movements(moved)
+        invalidate_stations('assets', {row[1] for row in rows} | {values.get('current_station_id')})
+
+    return updated_ids
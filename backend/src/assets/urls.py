@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AssetViewSet, AssetCategoryViewSet, DeviceTypeViewSet
+from .views import (
+    AssetViewSet, AssetCategoryViewSet, DeviceTypeViewSet, AssetBySerialView, AssetBySerialBatchView
+)
 
 router = DefaultRouter()
 router.register(r'categories', AssetCategoryViewSet)
@@ -8,5 +10,8 @@ router.register(r'device-types', DeviceTypeViewSet)
 router.register(r'assets', AssetViewSet)
 
 urlpatterns = [
+    path('by-serial/', AssetBySerialBatchView.as_view(), name='asset-by-serial-batch'),
+    # Serials may contain slashes (e.g. 'SN/2024/001').
+    path('by-serial/<path:serial>/', AssetBySerialView.as_view(), name='asset-by-serial'),
     path('', include(router.urls)),
 ]
@@ -1,36 +1,74 @@
-from rest_framework import viewsets, filters 
+from datetime import datetime, time
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from accounts.permissions import IsAssetAdmin, get_admin_scope
-from .models import Asset, AssetCategory, DeviceType
+from moh_assets_backend.caching import ScopedResponseCacheMixin
+from moh_assets_backend.conditional import ConditionalGetMixin
+from moh_assets_backend.fieldsets import SparseFieldsetViewMixin
+from moh_assets_backend.spreadsheets import iter_rows
+from accounts.permissions import HasAdminScope, IsAssetAdmin, get_admin_scope, scope_lookups, scope_path_lookups
+from .models import Asset, AssetCategory, DeviceType, normalize_serial
+from .exporters import EXPORT_FORMATS, stream_export
+from .filters import AssetOrderingFilter, AssetSearchFilter, AssetSummaryFilter, is_ranked_search
+from .ledger import movements_as_of, with_station_names
+from .importers import AssetImporter
+from .pagination import AssetCursorPagination, AssetSearchPagination
+from .rollups import SUMMARY_DIMENSIONS, summarize
 from .serializers import (
     AssetSerializer, 
     AssetCategorySerializer, 
+    AssetCompactSerializer,
+    AssetMovementSerializer,
+    BulkTransitionSerializer,
     DeviceTypeSerializer
 )
+from .transitions import TransitionError, apply_transition
 
-class AssetCategoryViewSet(viewsets.ModelViewSet):
+class AssetCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = AssetCategory.objects.all()
     serializer_class = AssetCategorySerializer
+    cache_namespace = 'catalogue'
+    cache_scoped = False
     permission_classes = [IsAuthenticated]
+    token_claims_auth = True
 
-class DeviceTypeViewSet(viewsets.ModelViewSet):
-    queryset = DeviceType.objects.all()
+class DeviceTypeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = DeviceType.objects.select_related('category')
     serializer_class = DeviceTypeSerializer
+    cache_namespace = 'catalogue'
+    cache_scoped = False
     permission_classes = [IsAuthenticated]
+    token_claims_auth = True
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['category']
     search_fields = ['name']
 
-class AssetViewSet(viewsets.ModelViewSet):
+class AssetViewSet(SparseFieldsetViewMixin, ConditionalGetMixin, ScopedResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Asset.objects.all().select_related('category', 'current_station', 'device', 'non_device')
     serializer_class = AssetSerializer
     permission_classes = [IsAuthenticated, IsAssetAdmin]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    token_claims_auth = True
+    pagination_class = AssetCursorPagination
+    filter_backends = [DjangoFilterBackend, AssetSearchFilter, AssetOrderingFilter]
     filterset_fields = ['asset_type', 'category', 'current_station', 'status', 'condition']
-    search_fields = ['asset_code', 'device__serial_number', 'device__program']
-    ordering_fields = ['created_at', 'status']
-    ordering = ['-created_at']
+    ordering_fields = AssetCursorPagination.KEYSET_FIELDS
+    ordering = ['-created_at', 'id']
+    cache_namespace = 'assets'
+
+    @property
+    def paginator(self):
+        """Search results ranked by relevance are paged by offset (see AssetSearchPagination)."""
+        if not hasattr(self, '_paginator'):
+            self._paginator = AssetSearchPagination() if is_ranked_search(self.request) else self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
         """
@@ -47,17 +85,220 @@ class AssetViewSet(viewsets.ModelViewSet):
         if not admin_scope: # Empty dict = HQ = All access
             return qs
             
-        # Map scope keys from 'station' to 'current_station'
-        # e.g. {'station__province': ...} -> {'current_station__province': ...}
-        # e.g. {'station': ...} -> {'current_station': ...}
-        
-        asset_filters = {}
-        for key, value in admin_scope.items():
-            if key == 'station':
-                asset_filters['current_station'] = value
-            elif key.startswith('station__'):
-                new_key = key.replace('station__', 'current_station__', 1)
-                asset_filters[new_key] = value
-                
-        return qs.filter(**asset_filters)
+        # Province / district scopes filter Asset.location_path (no join to the
+        # station table); a station scope is current_station itself.
+        return qs.filter(**scope_path_lookups(admin_scope))
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Bulk import assets from a CSV or XLSX file uploaded in the `file` field.
+        Valid rows are created in batches; invalid rows are listed in the error report.
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({"error": "Upload a CSV or XLSX file in the 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = AssetImporter().run(iter_rows(upload, upload.name))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['patch'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        Set status / condition / current_station on many assets with one UPDATE.
+
+        Body:
+        - ids: Asset ids (max 5000), all of which must be in your jurisdiction, or
+        - filters: List filters, e.g. {"current_station": 12, "status": "IN_STOCK"}
+        - status, condition, current_station: Target values (at least one)
+
+        Nothing is changed if any asset may not make the requested transition.
+        """
+        serializer = BulkTransitionSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = self.get_queryset()
+        if 'filters' in data:
+            backend = DjangoFilterBackend()
+            filterset = backend.get_filterset_class(self, queryset)(data=data['filters'], queryset=queryset)
+            unknown = set(data['filters']) - set(filterset.filters)
+            if unknown or not filterset.is_valid():
+                errors = dict(filterset.errors)
+                errors.update((field, ["Unknown filter."]) for field in unknown)
+                return Response({"filters": errors}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = filterset.qs
+
+        changes = {field: data[field] for field in BulkTransitionSerializer.TARGET_FIELDS if field in data}
+        try:
+            updated_ids = apply_transition(queryset, changes, ids=data.get('ids'))
+        except TransitionError as exc:
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"updated": len(updated_ids), "ids": updated_ids})
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Asset counts for the admin's jurisdiction, read from the rollup table.
+        HQ sees national totals per province, PO per district, DO/FC per station.
+
+        Query Parameters:
+        - group_by: Comma-separated extra breakdowns (asset_type, category, status, condition)
+        - asset_type, category, status, condition: Only count matching assets
+        """
+        group_by = [field for field in request.query_params.get('group_by', '').split(',') if field]
+        invalid = set(group_by) - set(SUMMARY_DIMENSIONS)
+        if invalid:
+            return Response(
+                {"error": f"group_by must be a subset of: {', '.join(SUMMARY_DIMENSIONS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filterset = AssetSummaryFilter(request.query_params)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        filters = {
+            dimension: value
+            for dimension, value in filterset.form.cleaned_data.items()
+            if value not in (None, '')
+        }
+        return Response(summarize(get_admin_scope(request.user), group_by, filters))
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """
+        Full station/status history of one asset, oldest first.
+        """
+        asset = self.get_object()
+        movements = with_station_names(asset.movements.order_by('moved_at', 'id'))
+        return Response(AssetMovementSerializer(movements, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='as-of')
+    def as_of(self, request):
+        """
+        Assets that were at a station at a point in time, with their status then.
+
+        Query Parameters:
+        - station: Station id (required, must be within the admin's jurisdiction)
+        - date: ISO date (end of that day) or datetime. Defaults to now.
+        """
+        station_id = request.query_params.get('station')
+        if not station_id or not station_id.isdigit():
+            return Response({"error": "'station' (station id) is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        raw_date = request.query_params.get('date')
+        when = timezone.now()
+        if raw_date:
+            # A bare date means the end of that day. parse_date goes first because
+            # parse_datetime also accepts bare dates (as midnight). Both raise
+            # ValueError for well-formed but impossible values (2024-13-45).
+            try:
+                day = parse_date(raw_date)
+                when = datetime.combine(day, time.max) if day else parse_datetime(raw_date)
+            except ValueError:
+                when = None
+            if when is None:
+                return Response({"error": "'date' must be an ISO date or datetime."}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(when):
+                when = timezone.make_aware(when)
+
+        movements = with_station_names(
+            movements_as_of(when)
+            .filter(station_id=station_id, **scope_lookups(get_admin_scope(request.user), 'station'))
+            .order_by('asset_id')
+        )
+        return Response({
+            "station": int(station_id),
+            "as_of": when,
+            "results": AssetMovementSerializer(movements, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream the filtered, scoped asset list as a file download.
+
+        Query Parameters:
+        - export_format: 'csv' (default) or 'ndjson'
+        - Any of the list filters (asset_type, category, current_station, status, condition, search, ordering)
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"export_format must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            stream_export(queryset, export_format),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        filename = f"assets-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+# ---------------------------------------------------------------------------
+# SERIAL NUMBER LOOKUPS (barcode scanning)
+# ---------------------------------------------------------------------------
+def scanned_assets(user, serials):
+    """
+    Assets with the given normalized serial numbers inside the user's scope,
+    fetched in one query through the Device.serial_normalized index.
+    """
+    queryset = Asset.objects.select_related(
+        'category', 'current_station', 'device__device_type'
+    ).filter(device__serial_normalized__in=serials)
+    return queryset.filter(**scope_path_lookups(get_admin_scope(user)))
+
+
+class AssetBySerialView(APIView):
+    """
+    GET /api/assets/by-serial/<serial>/
+    Looks up a single scanned serial number (case and surrounding spaces are ignored).
+    """
+    permission_classes = [IsAuthenticated, HasAdminScope]
+    token_claims_auth = True
+
+    def get(self, request, serial):
+        asset = scanned_assets(request.user, [normalize_serial(serial)]).first()
+        if asset is None:
+            return Response(
+                {"error": "No asset with this serial number in your jurisdiction."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(AssetCompactSerializer(asset).data)
+
+
+class AssetBySerialBatchView(APIView):
+    """
+    POST /api/assets/by-serial/
+    Body: {"serials": ["SN1", "SN2", ...]} (max 500)
+    Returns the matching assets in scan order plus the serials that were not found.
+    """
+    permission_classes = [IsAuthenticated, HasAdminScope]
+    max_serials = 500
+
+    def post(self, request):
+        serials = request.data.get('serials')
+        if not isinstance(serials, list) or not serials:
+            return Response({"error": "'serials' must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(serials) > self.max_serials:
+            return Response(
+                {"error": f"At most {self.max_serials} serials can be looked up at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        normalized = list(dict.fromkeys(normalize_serial(str(serial)) for serial in serials))
+        found = {asset.device.serial_normalized: asset for asset in scanned_assets(request.user, normalized)}
 
+        return Response({
+            "results": [AssetCompactSerializer(found[serial]).data for serial in normalized if serial in found],
+            "missing": [serial for serial in normalized if serial not in found],
+        })
@@ -0,0 +1,231 @@
+"""
+Synthetic data for benchmarks.
+
+Every value is drawn from a random.Random seeded by the caller, so the same
+arguments always produce the same rows (timestamps count back from the fixed
+DATASET_END). Rows, including their movement ledger entries, are written with
+bulk_create and the rollup table is rebuilt once at the end.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from assets.models import Asset, AssetCategory, AssetMovement, Device, DeviceType, NonDeviceAsset, normalize_serial
+from assets.rollups import rebuild_rollups
+from locations.models import FACILITY_SUFFIXES, District, Province, Station
+from profiles.models import MOHProfile
+
+User = get_user_model()
+
+
+BATCH_SIZE = 2000
+DEFAULT_ASSETS = 200_000
+DATASET_END = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+CATEGORIES = {
+    'Computers': ['Laptop', 'Desktop', 'Tablet', 'Server'],
+    'Networking': ['Router', 'Switch', 'Access Point'],
+    'Printing': ['Printer', 'Scanner'],
+    'Mobile': ['Smartphone', 'Feature Phone'],
+    'Power': ['UPS', 'Solar Kit'],
+    'Furniture': [],
+    'Consumables': [],
+}
+NON_DEVICE_ITEMS = ['Office Chair', 'Desk', 'Filing Cabinet', 'Extension Cable', 'Toner Cartridge']
+PROGRAMS = ['HIV', 'TB', 'Malaria', 'EPI', 'HMIS', None]
+PARTNERS = ['CDC', 'USAID', 'Global Fund', 'UNICEF', 'WHO', None]
+FIRST_NAMES = ['Tendai', 'Rudo', 'Tatenda', 'Nyasha', 'Farai', 'Chipo', 'Tinashe', 'Kudzai', 'Sipho', 'Thandiwe']
+LAST_NAMES = ['Moyo', 'Ncube', 'Dube', 'Sibanda', 'Mpofu', 'Chikwanha', 'Mutasa', 'Ndlovu', 'Gumbo', 'Zhou']
+POSITIONS = ['Health Information Officer', 'Data Clerk', 'Nurse in Charge', 'Pharmacist', 'Logistics Officer']
+
+# Weighted the way a real register looks: most assets are in use and serviceable.
+STATUS_WEIGHTS = {'ASSIGNED': 60, 'IN_STOCK': 20, 'MAINTENANCE': 10, 'DISPOSED': 8, 'STOLEN': 2}
+CONDITION_WEIGHTS = {'GOOD': 50, 'NEW': 20, 'FAIR': 18, 'DAMAGED': 9, 'BEYOND_REPAIR': 3}
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Lets bulk_create keep the created_at/updated_at values set on the objects."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _weighted(rng, weights, count):
+    return rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+
+def _station(**fields):
+    station = Station(**fields)
+    station.clean()
+    station.assign_station_code()
+    station.assign_location_path()
+    return station
+
+
+def build_locations(rng, provinces, districts_per_province, facilities_per_district):
+    """
+    HQ plus, per province, a PO and districts with a DO and facilities each.
+    Station codes and location paths are derived as on save().
+    """
+    province_rows = Province.objects.bulk_create([
+        Province(province_name=f'Province {number:02d}', province_suffix=f'{number:02d}')
+        for number in range(1, provinces + 1)
+    ])
+    district_rows = District.objects.bulk_create([
+        District(district_name=f'{province.province_name} District {number:02d}', province=province,
+                 district_suffix=f'{number:02d}')
+        for province in province_rows
+        for number in range(1, districts_per_province + 1)
+    ])
+
+    stations = [_station(station_name='National Office', station_address='National Office, Harare',
+                         station_type='HQ')]
+    for province in province_rows:
+        stations.append(_station(
+            station_name=f'{province.province_name} Provincial Office',
+            station_address=f'{province.province_name} Provincial Office',
+            station_type='PO', province=province,
+        ))
+    for district in district_rows:
+        stations.append(_station(
+            station_name=f'{district.district_name} District Office',
+            station_address=f'{district.district_name} District Office',
+            station_type='DO', province=district.province, district=district,
+        ))
+        for suffix in FACILITY_SUFFIXES[:facilities_per_district]:
+            stations.append(_station(
+                station_name=f'{district.district_name} Clinic {suffix}',
+                station_address=f'{district.district_name} Clinic {suffix}, {rng.randint(1, 999)} Main Road',
+                station_type='FC', province=district.province, district=district, station_suffix=suffix,
+            ))
+    return Station.objects.bulk_create(stations, batch_size=BATCH_SIZE)
+
+
+def build_users(rng, stations, users_per_station, password, seed):
+    """
+    One admin per station (so every scope level has admins) plus
+    `users_per_station` regular MOH users, all with a complete MOHProfile.
+    Usernames are `admin_<station code>` and `user_<station code>_<n>`.
+    The password is hashed once with a seed-derived salt and shared by all users.
+    """
+    password_hash = make_password(password, salt=f'dataset{seed}')
+    users = []
+    for station in stations:
+        code = station.station_code.lower()
+        names = [(f'admin_{code}', True)] + [(f'user_{code}_{n}', False) for n in range(1, users_per_station + 1)]
+        for username, is_admin in names:
+            users.append(User(
+                username=username, email=f'{username}@mohcc.example', password=password_hash,
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                user_type='MOH', is_admin=is_admin, profile_complete=True,
+            ))
+    users = User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+    per_station = users_per_station + 1
+    MOHProfile.objects.bulk_create([
+        MOHProfile(user=user, station=stations[index // per_station], department='IT',
+                   position='System Administrator' if user.is_admin else rng.choice(POSITIONS))
+        for index, user in enumerate(users)
+    ], batch_size=BATCH_SIZE)
+    return users
+
+
+def build_catalogue():
+    categories = AssetCategory.objects.bulk_create([AssetCategory(name=name) for name in CATEGORIES])
+    device_types = DeviceType.objects.bulk_create([
+        DeviceType(name=type_name, category=category)
+        for category in categories
+        for type_name in CATEGORIES[category.name]
+    ])
+    return categories, device_types
+
+
+def build_assets(rng, count, stations, categories, device_types, non_device_share=0.15, years=5):
+    """
+    `count` assets spread over `stations`, created over the last `years` years,
+    with their Device / NonDeviceAsset rows. Returns the number created.
+    """
+    span = int(timedelta(days=365 * years).total_seconds())
+    other_categories = [category for category in categories if not CATEGORIES[category.name]]
+    created = 0
+    timestamps = (Asset._meta.get_field('created_at'), Asset._meta.get_field('updated_at'))
+
+    while created < count:
+        size = min(BATCH_SIZE, count - created)
+        statuses = _weighted(rng, STATUS_WEIGHTS, size)
+        conditions = _weighted(rng, CONDITION_WEIGHTS, size)
+        assets, subtypes = [], []
+        for index in range(size):
+            created_at = DATASET_END - timedelta(seconds=rng.randrange(span))
+            is_device = rng.random() >= non_device_share
+            device_type = rng.choice(device_types) if is_device else None
+            category_id = device_type.category_id if is_device else rng.choice(other_categories).pk
+            station = rng.choice(stations)
+            assets.append(Asset(
+                asset_type='DEVICE' if is_device else 'NON_DEVICE',
+                category_id=category_id,
+                current_station=station,
+                location_path=station.location_path,
+                status=statuses[index],
+                condition=conditions[index],
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+            subtypes.append(device_type)
+
+        with transaction.atomic(), explicit_timestamps(*timestamps):
+            Asset.objects.bulk_create(assets)
+            devices, non_devices = [], []
+            for number, (asset, device_type) in enumerate(zip(assets, subtypes), start=created):
+                if device_type is not None:
+                    serial = f'{device_type.name[:3].upper()}-{rng.randrange(16 ** 6):06X}-{number:07d}'
+                    devices.append(Device(
+                        asset=asset, device_type=device_type, serial_number=serial,
+                        serial_normalized=normalize_serial(serial),
+                        program=rng.choice(PROGRAMS), partner=rng.choice(PARTNERS),
+                        partner_number=f'PN-{rng.randrange(10 ** 5):05d}' if rng.random() < 0.3 else None,
+                    ))
+                else:
+                    non_devices.append(NonDeviceAsset(
+                        asset=asset, name=rng.choice(NON_DEVICE_ITEMS), quantity=rng.randint(1, 20),
+                    ))
+            Device.objects.bulk_create(devices)
+            NonDeviceAsset.objects.bulk_create(non_devices)
+            AssetMovement.objects.bulk_create([
+                AssetMovement(asset_id=asset.pk, station_id=asset.current_station_id,
+                              status=asset.status, moved_at=asset.created_at)
+                for asset in assets
+            ])
+        created += size
+    return created
+
+
+def build_dataset(seed=1, provinces=10, districts_per_province=8, facilities_per_district=20,
+                  assets=DEFAULT_ASSETS, users_per_station=1, password='benchmark'):
+    """
+    Creates a complete national dataset in an empty database and returns a
+    summary of what was written.
+    """
+    rng = random.Random(seed)
+    stations = build_locations(rng, provinces, districts_per_province, facilities_per_district)
+    users = build_users(rng, stations, users_per_station, password, seed)
+    categories, device_types = build_catalogue()
+    asset_count = build_assets(rng, assets, stations, categories, device_types)
+    rebuild_rollups()
+    return {
+        'seed': seed,
+        'provinces': provinces,
+        'districts': provinces * districts_per_province,
+        'stations': len(stations),
+        'users': len(users),
+        'assets': asset_count,
+    }
@@ -0,0 +1,190 @@
+"""
+Endpoint benchmarks: latency percentiles and SQL query counts per endpoint
+and per admin role, measured through the full Django/DRF stack (URL routing,
+middleware, JWT authentication, serialization).
+
+Endpoints served from the response cache are measured twice: with the cache
+emptied before every timed request ('miss') and warm ('hit').
+"""
+import statistics
+import time
+
+from django.db import connection
+from rest_framework.test import APIClient
+
+from accounts.permissions import get_admin_scope, scope_path_lookups
+from assets.models import Asset
+from moh_assets_backend.caching import response_cache
+from profiles.models import MOHProfile
+
+
+ROLES = ('HQ', 'PO', 'DO', 'FC')
+
+# A p95 this much slower than the baseline (and by at least MIN_REGRESSION_MS) is a regression.
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 2.0
+
+
+def role_admins():
+    """The first generated admin at each station level: {'HQ': user, 'PO': user, ...}."""
+    admins = {}
+    profiles = (
+        MOHProfile.objects
+        .filter(user__is_admin=True, user__user_type='MOH', station__station_type__in=ROLES)
+        .select_related('user', 'station')
+        .order_by('id')
+    )
+    for profile in profiles:
+        admins.setdefault(profile.station.station_type, profile.user)
+        if len(admins) == len(ROLES):
+            break
+    return admins
+
+
+def endpoints(user):
+    """(name, method, path, body) for every benchmarked endpoint, as seen by `user`."""
+    visible = Asset.objects.filter(**scope_path_lookups(get_admin_scope(user)))
+    sample = visible.filter(asset_type='DEVICE').select_related('device').order_by('id').first()
+    cases = [
+        ('assets.list', 'get', '/api/assets/assets/', None),
+        ('assets.list_filtered', 'get', '/api/assets/assets/?status=ASSIGNED&condition=GOOD', None),
+        ('assets.list_sparse', 'get', '/api/assets/assets/?fields=id,category,status,current_station', None),
+        ('assets.search_broad', 'get', '/api/assets/assets/?search=lap', None),
+        ('stations.list', 'get', '/api/locations/stations/', None),
+        ('districts.list', 'get', '/api/locations/districts/', None),
+        ('stations.autocomplete', 'get', '/api/locations/stations/autocomplete/?q=province+03+district', None),
+        ('stations.autocomplete_fuzzy', 'get', '/api/locations/stations/autocomplete/?q=provnce+03+distrct+05', None),
+        ('admin_users.list', 'get', '/api/accounts/admin/users/', None),
+        ('admin_users.search', 'get', '/api/accounts/admin/users/?search=user_0101', None),
+        ('profile.me', 'get', '/api/profiles/me/', None),
+    ]
+    if sample is not None:
+        cases += [
+            ('assets.retrieve', 'get', f'/api/assets/assets/{sample.pk}/', None),
+            ('assets.search_serial', 'get', f'/api/assets/assets/?search={sample.device.serial_number[4:10]}', None),
+        ]
+    return cases
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryCounter:
+    """Database execute wrapper counting statements without logging them."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, method, path, body, iterations, warmup=2, cold=False):
+    """
+    Runs one request `warmup + iterations` times and summarises the timed runs.
+    With `cold`, the response cache is emptied before each run, so every run misses.
+    """
+    timings, queries, response = [], [], None
+    for run in range(warmup + iterations):
+        if cold:
+            response_cache().clear()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            if method == 'get':
+                response = client.get(path)
+            else:
+                response = getattr(client, method)(path, body, format='json')
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+            elapsed = (time.perf_counter() - started) * 1000
+        if run >= warmup:
+            timings.append(elapsed)
+            queries.append(counter.count)
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'bytes': len(response.content) if not getattr(response, 'streaming', False) else None,
+        'queries': max(queries),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(_percentile(timings, 0.50), 3),
+        'p95_ms': round(_percentile(timings, 0.95), 3),
+        'p99_ms': round(_percentile(timings, 0.99), 3),
+        'cached': response.has_header('X-Cache'),
+    }
+
+
+def run_suite(password, iterations, roles=ROLES, log=None):
+    """
+    Benchmarks every endpoint for each role's admin, plus login.
+    Returns a list of result rows ({endpoint, role, cache, status, queries, p50_ms, ...});
+    cache is 'miss' or 'hit' for endpoints behind the response cache, '' otherwise.
+    """
+    admins = role_admins()
+    results = []
+    for role in roles:
+        user = admins.get(role)
+        if user is None:
+            continue
+
+        anonymous = APIClient(raise_request_exception=False)
+        login = measure(anonymous, 'post', '/api/accounts/login/',
+                        {'username': user.username, 'password': password}, iterations=max(1, iterations // 10))
+        login.pop('cached')
+        results.append({'endpoint': 'auth.login', 'role': role, 'cache': '', **login})
+        if log:
+            log(result_line(results[-1]))
+
+        response = anonymous.post('/api/accounts/login/', {'username': user.username, 'password': password}, format='json')
+        if response.status_code != 200:
+            raise ValueError(f"Could not log in as {user.username}: {response.content[:200]!r}")
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['tokens']['access']}")
+
+        for name, method, path, body in endpoints(user):
+            runs = [('miss', measure(client, method, path, body, iterations, cold=True))]
+            if runs[0][1]['cached']:
+                runs.append(('hit', measure(client, method, path, body, iterations)))
+            for cache, result in runs:
+                cache = cache if result.pop('cached') else ''
+                results.append({'endpoint': name, 'role': role, 'cache': cache, **result})
+                if log:
+                    log(result_line(results[-1]))
+    return results
+
+
+def result_line(row):
+    return (
+        f"{row['endpoint']:<28}{row['role']:<5}{row.get('cache', ''):<6}{row['status']:>6}{row['queries']:>9}"
+        f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+    )
+
+
+RESULT_HEADER = f"{'endpoint':<28}{'role':<5}{'cache':<6}{'status':>6}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of `current` against `baseline` results (both lists of rows):
+    more queries, a different status code, or a p95 more than `tolerance`
+    (and MIN_REGRESSION_MS) slower. Returns a list of human-readable findings.
+    """
+    previous = {(row['endpoint'], row['role'], row.get('cache', '')): row for row in baseline}
+    findings = []
+    for row in current:
+        key = (row['endpoint'], row['role'], row.get('cache', ''))
+        before = previous.get(key)
+        if before is None:
+            continue
+        label = f"{row['endpoint']} [{' '.join(filter(None, key[1:]))}]"
+        if row['status'] != before['status']:
+            findings.append(f"{label}: status {before['status']} -> {row['status']}")
+        if row['queries'] > before['queries']:
+            findings.append(f"{label}: queries {before['queries']} -> {row['queries']}")
+        slower = row['p95_ms'] - before['p95_ms']
+        if slower > MIN_REGRESSION_MS and row['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            findings.append(f"{label}: p95 {before['p95_ms']:.2f}ms -> {row['p95_ms']:.2f}ms")
+    return findings
@@ -0,0 +1,136 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+
+from accounts.permissions import scope_path_lookups
+from assets.models import Asset, AssetCategory
+from assets.pagination import AssetCursorPagination
+from assets.views import AssetViewSet
+from benchmarks.datasets import DEFAULT_ASSETS, build_dataset
+from locations.models import Station
+
+
+# The schema before the composite indexes: Django's default single-column FK indexes.
+BASELINE_INDEXES = [
+    models.Index(fields=['category'], name='bench_asset_category_idx'),
+    models.Index(fields=['current_station'], name='bench_asset_station_idx'),
+]
+
+
+def list_queryset(admin_scope, filters):
+    """The first page of the asset list, built the way AssetViewSet and AssetCursorPagination build it."""
+    return (
+        AssetViewSet.queryset
+        .filter(**scope_path_lookups(admin_scope), **filters)
+        .order_by(*AssetCursorPagination.ordering)[:AssetCursorPagination.page_size + 1]
+    )
+
+
+def scenarios():
+    """(name, admin scope, list filters) combinations covering every scope level."""
+    station = Station.objects.filter(station_type='FC').order_by('id').first()
+    category = AssetCategory.objects.order_by('id').first()
+    scopes = [
+        ('national', {}),
+        ('province', {'station__province': station.province}),
+        ('district', {'station__district': station.district}),
+        ('station', {'station': station}),
+    ]
+    filter_sets = [
+        ('', {}),
+        ('status', {'status': 'IN_STOCK'}),
+        ('category', {'category': category}),
+        ('status+condition', {'status': 'ASSIGNED', 'condition': 'DAMAGED'}),
+        ('asset_type', {'asset_type': 'NON_DEVICE'}),
+    ]
+    for scope_name, admin_scope in scopes:
+        for filter_name, filters in filter_sets:
+            yield f'{scope_name} {filter_name}'.strip(), admin_scope, filters
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and compare EXPLAIN plans and timings of the "
+        "asset list queries with the default FK indexes and with the composite indexes on Asset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assets', type=int, default=DEFAULT_ASSETS, help="Number of assets to generate.")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed for the dataset.")
+        parser.add_argument('--repeat', type=int, default=7, help="Timed runs per query.")
+        parser.add_argument('--output', help="Write the full results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_benchmark(self, options):
+        started = time.perf_counter()
+        dataset = build_dataset(seed=options['seed'], assets=options['assets'])
+        self.stdout.write(
+            f"Seeded {dataset['assets']} assets at {dataset['stations']} stations "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        indexes = list(Asset._meta.indexes)
+        cases = list(scenarios())
+
+        # The database starts with the composite indexes (from the migrations); measure the baseline first.
+        self.set_indexes(indexes, present=False)
+        before = {name: self.measure(list_queryset(scope, filters), options['repeat']) for name, scope, filters in cases}
+        self.set_indexes(indexes, present=True)
+        after = {name: self.measure(list_queryset(scope, filters), options['repeat']) for name, scope, filters in cases}
+
+        self.stdout.write(f"\n{'scenario':<28}{'baseline (ms)':>14}{'composite (ms)':>15}{'speed-up':>10}  index used")
+        for name, _, _ in cases:
+            used = next((index.name for index in indexes if index.name in after[name]['plan']), '-')
+            speedup = before[name]['median_ms'] / max(after[name]['median_ms'], 0.001)
+            self.stdout.write(
+                f"{name:<28}{before[name]['median_ms']:>14.2f}{after[name]['median_ms']:>15.2f}{speedup:>9.1f}x  {used}"
+            )
+
+        return {
+            'vendor': connection.vendor,
+            'dataset': dataset,
+            'indexes': [index.name for index in indexes],
+            'scenarios': [
+                {'name': name, 'sql': str(list_queryset(scope, filters).query),
+                 'baseline': before[name], 'composite': after[name]}
+                for name, scope, filters in cases
+            ],
+        }
+
+    def set_indexes(self, indexes, present):
+        """Switches between the composite indexes (present=True) and the baseline FK indexes."""
+        add, remove = (indexes, BASELINE_INDEXES) if present else (BASELINE_INDEXES, indexes)
+        with connection.schema_editor() as editor:
+            for index in remove:
+                editor.remove_index(Asset, index)
+            for index in add:
+                editor.add_index(Asset, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'plan': queryset.explain(),
+            'median_ms': round(statistics.median(timings), 3),
+            'max_ms': round(max(timings), 3),
+        }
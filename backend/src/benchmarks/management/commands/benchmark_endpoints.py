@@ -0,0 +1,97 @@
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.datasets import build_dataset
+from benchmarks.endpoints import DEFAULT_TOLERANCE, RESULT_HEADER, ROLES, compare, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency percentiles and query counts of the main API endpoints as HQ, PO, DO "
+        "and FC admins. By default a throwaway test database is seeded first; --existing runs "
+        "against the configured database (seeded with seed_national_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--existing', action='store_true',
+                            help="Use the configured database instead of seeding a test database.")
+        parser.add_argument('--assets', type=int, default=50_000, help="Assets to seed (ignored with --existing).")
+        parser.add_argument('--seed', type=int, default=1, help="Dataset seed (ignored with --existing).")
+        parser.add_argument('--password', default='benchmark', help="Password of the generated users.")
+        parser.add_argument('--iterations', type=int, default=30, help="Timed requests per endpoint and role.")
+        parser.add_argument('--roles', default=','.join(ROLES), help="Comma-separated roles to run as.")
+        parser.add_argument('--output', help="Write the results as JSON to this path.")
+        parser.add_argument('--compare', metavar='BASELINE', help="Flag regressions against a stored results file.")
+        parser.add_argument('--results', help="Compare this stored results file instead of running the suite.")
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="Allowed relative p95 slowdown before a regression is flagged (default 0.25).")
+
+    def handle(self, *args, **options):
+        if options['results']:
+            if not options['compare']:
+                raise CommandError("--results is only used together with --compare.")
+            report = self.load(options['results'])
+        else:
+            report = self.run(options)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            findings = compare(self.load(options['compare'])['results'], report['results'], options['tolerance'])
+            if findings:
+                for finding in findings:
+                    self.stdout.write(self.style.ERROR(f"REGRESSION {finding}"))
+                raise CommandError(f"{len(findings)} regression(s) against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
+
+    def run(self, options):
+        roles = [role.strip().upper() for role in options['roles'].split(',') if role.strip()]
+        invalid = set(roles) - set(ROLES)
+        if invalid:
+            raise CommandError(f"Unknown role(s): {', '.join(sorted(invalid))}. Choose from {', '.join(ROLES)}.")
+
+        # As under the test runner: the test client's 'testserver' host is allowed, mail is kept in memory.
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        if not options['existing']:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            dataset = None
+            if not options['existing']:
+                started = time.perf_counter()
+                dataset = build_dataset(seed=options['seed'], assets=options['assets'], password=options['password'])
+                self.stdout.write(f"Seeded {dataset['assets']} assets in {time.perf_counter() - started:.1f}s")
+
+            self.stdout.write(RESULT_HEADER)
+            results = run_suite(options['password'], options['iterations'], roles=roles, log=self.stdout.write)
+        finally:
+            if not options['existing']:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        return {
+            'environment': {
+                'vendor': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+            },
+            'dataset': dataset,
+            'iterations': options['iterations'],
+            'results': results,
+        }
+
+    def load(self, path):
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read results file {path}: {exc}")
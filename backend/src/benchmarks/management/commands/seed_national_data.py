@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from assets.models import Asset
+from benchmarks.datasets import DEFAULT_ASSETS, FACILITY_SUFFIXES, build_dataset
+from locations.models import Province, Station
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic national dataset (provinces, districts, stations, "
+        "users with MOH profiles, assets) in an empty database, for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help="Random seed; the same seed gives the same data.")
+        parser.add_argument('--provinces', type=int, default=10)
+        parser.add_argument('--districts', type=int, default=8, help="Districts per province.")
+        parser.add_argument('--facilities', type=int, default=20, help="Facilities per district.")
+        parser.add_argument('--assets', type=int, default=DEFAULT_ASSETS)
+        parser.add_argument('--users-per-station', type=int, default=1,
+                            help="Regular users per station, on top of one admin per station.")
+        parser.add_argument('--password', default='benchmark', help="Password shared by all generated users.")
+
+    def handle(self, *args, **options):
+        if not 1 <= options['provinces'] <= 99 or not 1 <= options['districts'] <= 99:
+            raise CommandError("Provinces and districts per province must be between 1 and 99 (two-digit suffixes).")
+        if not 0 <= options['facilities'] <= len(FACILITY_SUFFIXES):
+            raise CommandError(f"Facilities per district must be between 0 and {len(FACILITY_SUFFIXES)}.")
+        if Province.objects.exists() or Station.objects.exists() or Asset.objects.exists():
+            raise CommandError("The database already has locations or assets; run this against an empty database.")
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            summary = build_dataset(
+                seed=options['seed'],
+                provinces=options['provinces'],
+                districts_per_province=options['districts'],
+                facilities_per_district=options['facilities'],
+                assets=options['assets'],
+                users_per_station=options['users_per_station'],
+                password=options['password'],
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['provinces']} provinces, {summary['districts']} districts, "
+            f"{summary['stations']} stations, {summary['users']} users and {summary['assets']} assets "
+            f"(seed {summary['seed']}) in {time.perf_counter() - started:.1f}s."
+        ))
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class LocationsConfig(AppConfig):
     name = "locations"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_search_triggers
+        post_migrate.connect(ensure_search_triggers, sender=self)
@@ -0,0 +1,261 @@
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import FACILITY_SUFFIXES, District, Province, Station
+from .signals import stations_imported
+
+
+class StationImporter:
+    """
+    Bulk station (facility registry) import.
+
+    Station.save() looks up the district's province for every station code, and
+    two facilities left on the default suffix collide on station_code. Instead:
+    1. provinces, districts and the station codes in use are loaded once,
+    2. rows are consumed in batches of `batch_size`; the stations they name
+       (matched on station_address) are fetched with one query per batch,
+    3. every row is validated with Station.clean(), facilities without a
+       station_suffix get the next free one in their district, and codes and
+       location paths are computed in memory,
+    4. new stations are inserted with `bulk_create` and changed ones written
+       with `bulk_update` in one transaction per batch, which then sends
+       `stations_imported` in place of the post_save signals bulk writes skip.
+
+    With dry_run=True nothing is written; the report lists the same changes.
+
+    Expected columns:
+    station_name, station_address, station_type, province, district,
+    station_suffix   (optional, FC only; allocated when blank)
+    Province and district are matched on name, case-insensitively.
+    """
+
+    STATION_TYPES = {choice for choice, _ in Station.STATION_TYPE_CHOICES}
+    UPDATE_FIELDS = [
+        'station_name', 'station_type', 'province', 'district', 'station_suffix', 'station_code',
+        'location_path', 'updated_at',
+    ]
+
+    def __init__(self, batch_size=500, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.provinces = {}  # lower-cased name -> Province
+        self.districts = {}  # (province id, lower-cased name) -> District
+        self.provinces_by_id = {}
+        self.districts_by_id = {}
+        self.taken_codes = set()
+        self.next_suffix = {}  # district id -> index into FACILITY_SUFFIXES
+        self.seen_addresses = set()
+
+    def run(self, rows):
+        """
+        Imports an iterable of row dicts and returns the report:
+        {"dry_run": ..., "total_rows": ..., "created": ..., "updated": ..., "unchanged": ..., "failed": ...,
+         "errors": [{"row": ..., "errors": {...}}],
+         "changes": [{"row": ..., "action": "create" | "update", "station_code": ..., "station_name": ...,
+                      "changes": {field: [old, new]}  (updates only)}]}
+        Row numbers are spreadsheet line numbers (the header is row 1).
+        """
+        report = {
+            'dry_run': self.dry_run, 'total_rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0,
+            'errors': [], 'changes': [],
+        }
+        self._preload()
+        numbered = enumerate(rows, start=2)
+
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            report['total_rows'] += len(batch)
+            self._import_batch(batch, report)
+
+        return report
+
+    # ------------------------
+    # Lookups
+    # ------------------------
+    def _preload(self):
+        for province in Province.objects.all():
+            self.provinces[province.province_name.lower()] = province
+            self.provinces_by_id[province.pk] = province
+        for district in District.objects.all():
+            district.province = self.provinces_by_id[district.province_id]
+            self.districts[(district.province_id, district.district_name.lower())] = district
+            self.districts_by_id[district.pk] = district
+        self.taken_codes = set(
+            Station.objects.exclude(station_code=None).values_list('station_code', flat=True)
+        )
+
+    def _allocate_suffix(self, district, batch_codes):
+        """The first facility suffix whose code is free in `district`, or None when all are taken."""
+        prefix = f"{district.province.province_suffix}{district.district_suffix}"
+        index = self.next_suffix.get(district.pk, 0)
+        while index < len(FACILITY_SUFFIXES) and prefix + FACILITY_SUFFIXES[index] in self.taken_codes:
+            index += 1
+        # Only codes already written move the starting point; the batch's own may still be rolled back.
+        self.next_suffix[district.pk] = index
+        while index < len(FACILITY_SUFFIXES) and prefix + FACILITY_SUFFIXES[index] in batch_codes:
+            index += 1
+        return FACILITY_SUFFIXES[index] if index < len(FACILITY_SUFFIXES) else None
+
+    # ------------------------
+    # Batch processing
+    # ------------------------
+    def _import_batch(self, batch, report):
+        existing = {
+            station.station_address: station
+            for station in Station.objects.filter(
+                station_address__in=[row.get('station_address') for _, row in batch if row.get('station_address')]
+            )
+        }
+
+        # Codes and addresses of this batch's valid rows; they only count as taken once the batch is written.
+        batch_codes, batch_addresses = set(), set()
+        created, updated, changes, errors = [], [], [], []
+        for row_number, row in batch:
+            station, row_errors = self._build_station(
+                row, existing.get(row.get('station_address')), batch_codes, batch_addresses
+            )
+            if row_errors:
+                errors.append({'row': row_number, 'errors': row_errors})
+                continue
+
+            previous = existing.get(station.station_address)
+            if previous is None:
+                created.append(station)
+                changes.append({'row': row_number, 'action': 'create', 'station_code': station.station_code,
+                                'station_name': station.station_name})
+                continue
+
+            diff = self._diff(self._snapshot(previous), self._snapshot(station))
+            if diff:
+                updated.append(station)
+                changes.append({'row': row_number, 'action': 'update', 'station_code': station.station_code,
+                                'station_name': station.station_name, 'changes': diff})
+            else:
+                report['unchanged'] += 1
+
+        if (created or updated) and not self.dry_run:
+            try:
+                self._write(created, updated)
+            except IntegrityError as exc:
+                errors.extend(
+                    {'row': change['row'], 'errors': {'batch': f"Batch rejected by the database: {exc}"}}
+                    for change in changes
+                )
+                created, updated, changes = [], [], []
+                batch_codes, batch_addresses = set(), set()
+
+        self.taken_codes |= batch_codes
+        self.seen_addresses |= batch_addresses
+        report['created'] += len(created)
+        report['updated'] += len(updated)
+        report['failed'] += len(errors)
+        report['errors'].extend(sorted(errors, key=lambda error: error['row']))
+        report['changes'].extend(changes)
+
+    def _build_station(self, row, previous, batch_codes, batch_addresses):
+        """The station `row` describes (a changed copy of `previous` when it exists) and the row's errors."""
+        errors = {}
+
+        station_type = row.get('station_type', '').upper()
+        if station_type not in self.STATION_TYPES:
+            errors['station_type'] = f"Must be one of {', '.join(sorted(self.STATION_TYPES))}."
+
+        for field in ('station_name', 'station_address'):
+            value = row.get(field)
+            if not value:
+                errors[field] = "This field is required."
+            elif len(value) > 255:
+                errors[field] = "Ensure this field has no more than 255 characters."
+
+        address = row.get('station_address')
+        if address in self.seen_addresses or address in batch_addresses:
+            errors['station_address'] = "Duplicate station address in the uploaded file."
+
+        # Station.clean() checks these too, but facility suffixes are allocated per district first.
+        if station_type in ('PO', 'DO', 'FC') and not row.get('province'):
+            errors['province'] = f"This field is required for {station_type} stations."
+        if station_type in ('DO', 'FC') and not row.get('district'):
+            errors['district'] = f"This field is required for {station_type} stations."
+
+        province = district = None
+        if station_type != 'HQ' and row.get('province'):
+            province = self.provinces.get(row['province'].lower())
+            if province is None:
+                errors['province'] = f"Unknown province '{row['province']}'."
+        if station_type in ('DO', 'FC') and row.get('district') and province is not None:
+            district = self.districts.get((province.pk, row['district'].lower()))
+            if district is None:
+                errors['district'] = f"Unknown district '{row['district']}' in province '{row['province']}'."
+
+        suffix = row.get('station_suffix', '').upper() or None
+        if suffix and len(suffix) > 5:
+            errors['station_suffix'] = "Ensure this field has no more than 5 characters."
+
+        if errors:
+            return None, errors
+
+        station = Station(pk=previous.pk, station_code=previous.station_code) if previous else Station()
+        station.station_name = row['station_name']
+        station.station_address = address
+        station.station_type = station_type
+        station.province = province
+        station.district = district
+        if station_type == 'FC' and not suffix:
+            # Keep the current suffix of a facility that stays in its district.
+            if previous and previous.station_type == 'FC' and previous.district_id == district.pk:
+                suffix = previous.station_suffix
+            else:
+                suffix = self._allocate_suffix(district, batch_codes)
+                if suffix is None:
+                    return None, {'station_suffix': f"No free facility suffix left in district '{district}'."}
+        station.station_suffix = suffix if station_type == 'FC' else None  # offices get theirs from clean()
+
+        try:
+            station.clean()
+        except ValidationError as exc:
+            return None, {field: " ".join(messages) for field, messages in exc.message_dict.items()}
+
+        previous_code = station.station_code
+        station.assign_station_code()
+        station.assign_location_path()
+        if station.station_code != previous_code and (
+            station.station_code in self.taken_codes or station.station_code in batch_codes
+        ):
+            return None, {'station_code': f"Station code '{station.station_code}' is already in use."}
+
+        batch_codes.add(station.station_code)
+        batch_addresses.add(address)
+        return station, {}
+
+    def _snapshot(self, station):
+        province = self.provinces_by_id.get(station.province_id)
+        district = self.districts_by_id.get(station.district_id)
+        return {
+            'station_name': station.station_name,
+            'station_type': station.station_type,
+            'province': province.province_name if province else None,
+            'district': district.district_name if district else None,
+            'station_code': station.station_code,
+        }
+
+    @staticmethod
+    def _diff(old, new):
+        return {field: [old[field], new[field]] for field in old if old[field] != new[field]}
+
+    def _write(self, created, updated):
+        now = timezone.now()
+        for station in updated:
+            station.updated_at = now  # bulk_update skips auto_now
+        with transaction.atomic():
+            Station.objects.bulk_create(created)
+            Station.objects.bulk_update(updated, self.UPDATE_FIELDS)
+            stations_imported.send(
+                sender=Station,
+                created=[station.pk for station in created],
+                updated=[station.pk for station in updated],
+            )
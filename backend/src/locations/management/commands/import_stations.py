@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from locations.importers import StationImporter
+from moh_assets_backend.spreadsheets import iter_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import stations (a facility registry) from a CSV or XLSX file, reporting rejected rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the .csv or .xlsx file to import.")
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of rows validated and written per transaction (default: 500).",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Write nothing; list the stations that would be created or changed.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        importer = StationImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(path, 'rb') as fileobj:
+                report = importer.run(iter_rows(fileobj, path))
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            details = "; ".join(f"{field}: {message}" for field, message in error['errors'].items())
+            self.stderr.write(f"Row {error['row']}: {details}")
+
+        if report['dry_run']:
+            for change in report['changes']:
+                if change['action'] == 'create':
+                    self.stdout.write(f"+ {change['station_code']} {change['station_name']}")
+                else:
+                    details = "; ".join(f"{field}: {old} -> {new}" for field, (old, new) in change['changes'].items())
+                    self.stdout.write(f"~ {change['station_code']} {change['station_name']} ({details})")
+
+        summary = (
+            f"{report['created']} created, {report['updated']} updated, {report['unchanged']} unchanged "
+            f"of {report['total_rows']} rows ({report['failed']} rejected)."
+        )
+        if report['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run, nothing written: {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Imported stations: {summary}"))
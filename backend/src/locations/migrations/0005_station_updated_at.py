@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0004_alter_department_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="station",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
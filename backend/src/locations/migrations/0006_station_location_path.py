@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+def populate_location_path(apps, schema_editor):
+    # Mirrors locations.models.location_path(): a district's province wins.
+    Station = apps.get_model('locations', 'Station')
+    stations = list(Station.objects.select_related('district').only('id', 'province_id', 'district__province_id'))
+    for station in stations:
+        province_id = station.district.province_id if station.district_id else station.province_id
+        station.location_path = f"{province_id or 0}/{station.district_id or 0}/"
+    Station.objects.bulk_update(stations, ['location_path'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0005_station_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='station',
+            name='location_path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.RunPython(populate_location_path, migrations.RunPython.noop),
+    ]
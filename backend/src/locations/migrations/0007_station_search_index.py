@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:45
+
+from django.db import migrations
+
+from moh_assets_backend.search_index import SearchIndex, SearchSource
+
+
+# SQLite: FTS5 trigram table keyed by station id, kept in sync by triggers on
+# locations_station. PostgreSQL: trigram GIN indexes, serving icontains /
+# istartswith and the trigram operators used for fuzzy matches.
+SEARCH_INDEX = SearchIndex('locations_station_search', ['station_name', 'station_code'], [
+    SearchSource('locations_station', columns={'station_name': 'station_name', 'station_code': 'station_code'}),
+])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0006_station_location_path"),
+    ]
+
+    operations = [
+        SEARCH_INDEX.migration_operation(),
+    ]
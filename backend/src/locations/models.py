@@ -1,9 +1,32 @@
+from string import ascii_uppercase, digits
+
 from django.db import models
 from django.core.exceptions import ValidationError
-from django.db import models
 
+# Two-character facility suffixes (0A, 0B, ..., ZZ), skipping the office suffixes NC/PC/DC.
+FACILITY_SUFFIXES = [
+    first + second
+    for first in digits + ascii_uppercase
+    for second in ascii_uppercase + digits
+    if first + second not in ('NC', 'PC', 'DC')
+]
+
+
+def location_path(province_id, district_id):
+    """
+    '<province id>/<district id>/' ('0' for a missing level). Assets copy their
+    station's path, so province and district scopes are a prefix of it.
+    """
+    return f"{province_id or 0}/{district_id or 0}/"
+
+
+def path_prefix_range(prefix):
+    """
+    (low, high) such that path >= low and path < high exactly when path starts
+    with `prefix` (which ends with '/'): a range any B-tree index can scan.
+    """
+    return prefix, prefix[:-1] + chr(ord('/') + 1)
 
-from django.db import models
 
 class Province(models.Model):
     """
@@ -92,6 +115,9 @@ class Station(models.Model):
     district = models.ForeignKey('District', on_delete=models.DO_NOTHING, null=True, blank=True)
     station_suffix = models.CharField(max_length=5, blank=True, null=True)
     station_code = models.CharField(max_length=20, unique=True, blank=True, null=True)
+    # Denormalized onto Asset.location_path; see location_path().
+    location_path = models.CharField(max_length=32, blank=True, default='', editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def clean(self):
         """
@@ -140,7 +166,25 @@ class Station(models.Model):
         """
         # Call clean() to enforce validations
         self.clean()
+        self.assign_station_code()
+        self.assign_location_path()
+
+        super().save(*args, **kwargs)
+
+    def assign_location_path(self):
+        """
+        Sets location_path. A station with a district takes its province from
+        the district. Bulk loaders call it with assign_station_code().
+        """
+        province_id = self.district.province_id if self.district_id else self.province_id
+        self.location_path = location_path(province_id, self.district_id)
 
+    def assign_station_code(self):
+        """
+        Sets station_code from the province, district and station suffixes.
+        Called by save(); bulk loaders call it directly (after clean()) since
+        bulk_create bypasses save().
+        """
         # --- Determine code prefixes ---
         if self.station_type == 'HQ':
             province_suffix = '00'
@@ -160,8 +204,6 @@ class Station(models.Model):
         # --- Generate full station code ---
         self.station_code = f"{province_suffix}{district_suffix}{self.station_suffix}"
 
-        super().save(*args, **kwargs)
-
     def __str__(self):
         """Friendly display for admin or debugging"""
         return f"{self.station_name} ({self.station_code})"
@@ -0,0 +1,134 @@
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from moh_assets_backend.search_index import SearchIndex, SearchSource, fts5_phrase
+
+
+# FTS5's trigram tokenizer cannot match terms shorter than this.
+MIN_TRIGRAM_LENGTH = 3
+
+# Fuzzy matches need at least this word similarity (pg_trgm's default similarity threshold).
+SIMILARITY_THRESHOLD = 0.3
+
+# Fuzzy candidates fetched from the index, best first, before scoring.
+FUZZY_CANDIDATES = 100
+
+# FTS5 table fed by locations_station (see migration 0007_station_search_index).
+SEARCH_INDEX = SearchIndex('locations_station_search', ['station_name', 'station_code'], [
+    SearchSource('locations_station', columns={'station_name': 'station_name', 'station_code': 'station_code'}),
+])
+
+# post_migrate handler: migrations that rebuild locations_station on SQLite drop its triggers.
+ensure_search_triggers = SEARCH_INDEX.ensure_triggers
+
+
+def trigrams(text):
+    """pg_trgm's trigrams: every word lower-cased and padded with two spaces before and one after."""
+    result = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(term_trigrams, text_trigrams):
+    """pg_trgm's similarity() between two trigram sets."""
+    if not term_trigrams or not text_trigrams:
+        return 0.0
+    shared = len(term_trigrams & text_trigrams)
+    return shared / (len(term_trigrams) + len(text_trigrams) - shared)
+
+
+def word_similarity(term_trigrams, text):
+    """
+    pg_trgm's strict_word_similarity(): the best similarity between the term
+    and any run of whole words in `text`, so "hrare" scores against "Harare"
+    rather than against all of "Harare Central Clinic".
+    """
+    words = [trigrams(word) for word in text.split()]
+    best = 0.0
+    for start in range(len(words)):
+        extent = set()
+        for word in words[start:]:
+            extent |= word
+            best = max(best, similarity(term_trigrams, extent))
+    return best
+
+
+def _rank(term):
+    """Match tiers, lower is better: code prefix, name prefix, name word prefix, anywhere."""
+    return Case(
+        When(station_code__istartswith=term, then=Value(0)),
+        When(station_name__istartswith=term, then=Value(1)),
+        When(station_name__icontains=f' {term}', then=Value(2)),
+        default=Value(3),
+        output_field=IntegerField(),
+    )
+
+
+def _matching(queryset, term):
+    """
+    Stations whose name or code contains `term`.
+    - SQLite: MATCH against the FTS5 trigram table; shorter terms only match
+      name and code prefixes.
+    - PostgreSQL: icontains, served by the trigram GIN indexes.
+    """
+    if connection.vendor != 'sqlite':
+        return queryset.filter(Q(station_name__icontains=term) | Q(station_code__icontains=term))
+    if len(term) < MIN_TRIGRAM_LENGTH:
+        return queryset.filter(Q(station_name__istartswith=term) | Q(station_code__istartswith=term))
+    return queryset.filter(id__in=SEARCH_INDEX.matching_ids(fts5_phrase(term)))
+
+
+def _fuzzy_candidates(queryset, term, fields):
+    """Rows of the stations sharing trigrams with `term`, from the best-matching FUZZY_CANDIDATES."""
+    if connection.vendor == 'sqlite':
+        # Any of the term's trigrams; FTS5's rank favours rows matching more (and rarer) ones.
+        query = ' OR '.join(fts5_phrase(gram) for gram in dict.fromkeys(
+            term[i:i + 3].lower() for i in range(len(term) - 2)
+        ))
+        ids = SEARCH_INDEX.matching_ids(query, limit=FUZZY_CANDIDATES)
+        return list(queryset.filter(id__in=ids).values(*fields))
+
+    # <<% is served by the trigram GIN index; its threshold defaults to 0.5.
+    ids = RawSQL(
+        "SELECT id FROM locations_station WHERE UPPER(%s) <<%% UPPER(station_name::text) "
+        "ORDER BY strict_word_similarity(UPPER(%s), UPPER(station_name::text)) DESC LIMIT %s",
+        (term, term, FUZZY_CANDIDATES),
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL pg_trgm.strict_word_similarity_threshold = %s", [SIMILARITY_THRESHOLD])
+        return list(queryset.filter(id__in=ids).values(*fields))
+
+
+def autocomplete_stations(queryset, term, limit, fields):
+    """
+    Up to `limit` stations of `queryset` for the typeahead term, as dicts of `fields`:
+    1. name / code matches, ranked by _rank() then name (one query),
+    2. when those leave room, fuzzy matches on the name (misspellings), ranked
+       by word_similarity() (one more query).
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    results = list(
+        _matching(queryset, term).annotate(match_rank=_rank(term))
+        .order_by('match_rank', 'station_name').values(*fields)[:limit]
+    )
+    if len(results) >= limit or len(term) < MIN_TRIGRAM_LENGTH:
+        return results
+
+    found = {row['id'] for row in results}
+    term_trigrams = trigrams(term)
+    scored = [
+        (word_similarity(term_trigrams, row['station_name']), row)
+        for row in _fuzzy_candidates(queryset, term, fields)
+        if row['id'] not in found
+    ]
+    scored = sorted(
+        (item for item in scored if item[0] >= SIMILARITY_THRESHOLD),
+        key=lambda item: (-item[0], item[1]['station_name']),
+    )
+    return results + [row for _, row in scored[:limit - len(results)]]
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from moh_assets_backend.fieldsets import SparseFieldsetMixin
 from .models import Province, District, Station
 
 class ProvinceSerializer(serializers.ModelSerializer):
@@ -21,7 +22,7 @@ class DistrictSerializer(serializers.ModelSerializer):
         fields = ['id', 'district_name', 'province', 'district_suffix']
 
 
-class StationSerializer(serializers.ModelSerializer):
+class StationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for the Station model.
     Includes formatted names for province and district for easier frontend display.
@@ -44,3 +45,7 @@ class StationSerializer(serializers.ModelSerializer):
             'district_name',
             'station_code'
         ]
+        expandable_fields = {
+            'province': (ProvinceSerializer, {}),
+            'district': (DistrictSerializer, {}),
+        }
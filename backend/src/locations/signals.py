@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal
+
+from moh_assets_backend.caching import bump_generations
+from .models import District, Province, Station, location_path
+
+# Sent by bulk station writes (see locations.importers), which send no
+# post_save, with the ids of the stations they created and updated.
+stations_imported = Signal()
+
+
+def invalidate_locations(sender, **kwargs):
+    # Location lists show province and district names; asset lists show stations through ?expand=.
+    bump_generations('locations')
+    if sender is Station:
+        bump_generations('assets')
+
+
+def sync_district_location_path(sender, instance, created, **kwargs):
+    # A district moved to another province moves its stations (assets follow in assets.signals).
+    if not created:
+        path = location_path(instance.province_id, instance.pk)
+        Station.objects.filter(district=instance).exclude(location_path=path).update(location_path=path)
+
+
+post_save.connect(sync_district_location_path, sender=District, dispatch_uid='sync_district_location_path')
+stations_imported.connect(invalidate_locations, sender=Station, dispatch_uid='invalidate_imported_stations')
+
+for _model in (Province, District, Station):
+    post_save.connect(invalidate_locations, sender=_model, dispatch_uid=f'invalidate_{_model.__name__}')
+    post_delete.connect(invalidate_locations, sender=_model, dispatch_uid=f'invalidate_{_model.__name__}_delete')
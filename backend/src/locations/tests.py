@@ -1,3 +1,354 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.utils.http import http_date
+
+from assets.models import Asset
+from moh_assets_backend.testing import QueryCountTestCase, ScopedAPITestCase
+
+from .importers import StationImporter
+from .models import District, Province, Station
+from .tree import location_tree
+
+
+class LocationQueryCountTests(QueryCountTestCase):
+    """Location lists issue a fixed number of queries however many rows they return."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('FC')
+
+    def test_province_list(self):
+        self.assertQueriesAtEverySize(2, lambda size: None, lambda: self.client.get('/api/locations/provinces/'))
+
+    def test_district_list(self):
+        def grow(size):
+            for number in range(District.objects.count(), size):
+                District.objects.create(district_name=f'District {number}', province=self.province,
+                                        district_suffix=f'{number + 1:02d}')
+
+        self.assertQueriesAtEverySize(2, grow, lambda: self.client.get('/api/locations/districts/'))
+        self.assertQueriesAtEverySize(
+            2, grow, lambda: self.client.get(f'/api/locations/districts/?province_id={self.province.pk}')
+        )
+
+    def test_station_list(self):
+        self.assertQueriesAtEverySize(2, self.grow_facilities, lambda: self.client.get('/api/locations/stations/'))
+        self.assertQueriesAtEverySize(
+            2, self.grow_facilities,
+            lambda: self.client.get(f'/api/locations/stations/?district_id={self.district.pk}&type=FC'),
+        )
+
+    def test_station_list_sparse(self):
+        self.assertQueriesAtEverySize(
+            2, self.grow_facilities,
+            lambda: self.client.get('/api/locations/stations/?fields=id,station_name,district&expand=district'),
+        )
+        self.assertQueriesAtEverySize(
+            2, self.grow_facilities,
+            lambda: self.client.get('/api/locations/stations/?fields=id,province_name&expand=province'),
+        )
+
+
+class StationSparseFieldsetTests(ScopedAPITestCase):
+    """?fields= keeps only the listed keys and ?expand= nests the related object."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('FC')
+
+    def station_row(self, query):
+        response = self.client.get(f'/api/locations/stations/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return next(row for row in response.data if row['id'] == self.stations['FC'].pk)
+
+    def test_fields_limit_the_keys(self):
+        row = self.station_row('fields=id,station_name')
+        self.assertEqual(row, {'id': self.stations['FC'].pk, 'station_name': 'Harare Central Clinic'})
+
+    def test_expand_nests_the_related_object(self):
+        row = self.station_row('fields=id,district&expand=district')
+        self.assertEqual(set(row), {'id', 'district'})
+        self.assertEqual(row['district'], {
+            'id': self.district.pk, 'district_name': 'Harare Central', 'province': self.province.pk,
+            'district_suffix': '01',
+        })
+
+        # Without ?fields= the expanded object replaces the id among all the other keys.
+        row = self.station_row('expand=province')
+        self.assertEqual(row['province']['province_name'], 'Harare')
+        self.assertEqual(row['district'], self.district.pk)
+        self.assertIn('station_code', row)
+
+    def test_unknown_names_are_ignored(self):
+        self.assertEqual(set(self.station_row('fields=id,no_such_field')), {'id'})
+        self.assertEqual(self.station_row('expand=no_such_field'), self.station_row(''))
+        # A field that is not expandable stays as it is.
+        self.assertEqual(self.station_row('fields=id,station_type&expand=station_type')['station_type'], 'FC')
+
+
+class StationListCacheTests(ScopedAPITestCase):
+    """Every user shares the cached station list until a location changes."""
+
+    def test_shared_and_invalidated(self):
+        self.authenticate('FC')
+        self.assertEqual(self.client.get('/api/locations/stations/')['X-Cache'], 'MISS')
+
+        self.authenticate('HQ')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/locations/stations/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        self.district.district_name = 'Harare North'
+        self.district.save()
+        response = self.client.get('/api/locations/stations/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Harare North', {row.get('district_name') for row in response.data})
+
+
+class LocationConditionalGetTests(ScopedAPITestCase):
+    """Location lookups answer 304 from the location change version."""
+
+    def test_not_modified_until_a_location_changes(self):
+        self.authenticate('FC')
+        paths = ('/api/locations/provinces/', '/api/locations/districts/', '/api/locations/stations/')
+        etags = {path: self.client.get(path)['ETag'] for path in paths}
+        for path, etag in etags.items():
+            with self.assertNumQueries(1):
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, path)
+
+        Province.objects.create(province_name='Bulawayo', province_suffix='02')
+        for path, etag in etags.items():
+            self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200, path)
+
+    def test_if_modified_since(self):
+        self.authenticate('FC')
+        self.assertEqual(
+            self.client.get('/api/locations/provinces/', HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)).status_code,
+            304,
+        )
+        self.assertEqual(
+            self.client.get('/api/locations/provinces/', HTTP_IF_MODIFIED_SINCE=http_date(time.time() - 3600)).status_code,
+            200,
+        )
+
+
+class LocationTreeTests(ScopedAPITestCase):
+    """The location tree is built once per location change and then served from memory."""
+
+    def setUp(self):
+        super().setUp()
+        location_tree.clear()
+        self.authenticate('FC')
+
+    def test_layout(self):
+        tree = self.client.get('/api/locations/tree/').json()
+        station = lambda role: [self.stations[role].pk, self.stations[role].station_name, role,
+                                self.stations[role].station_code]
+        self.assertEqual(tree['stations'], [station('HQ')])
+        self.assertEqual(tree['provinces'], [[
+            self.province.pk, 'Harare', '01', [station('PO')],
+            [[self.district.pk, 'Harare Central', '01', [station('FC'), station('DO')]]],
+        ]])
+
+    def test_built_once_per_location_change(self):
+        # Authentication, then provinces, districts and stations.
+        with self.assertNumQueries(4):
+            etag = self.client.get('/api/locations/tree/')['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/locations/tree/').status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/locations/tree/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Station.objects.create(station_name='Avondale Clinic', station_address='Avondale', station_type='FC',
+                               province=self.province, district=self.district, station_suffix='0C')
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/locations/tree/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['provinces'][0][4][0][3]), 3)
+
+
+class StationImportTests(ScopedAPITestCase):
+    """Station imports allocate facility codes in memory and write each batch with bulk queries."""
+
+    def facility_rows(self, count, district='Harare Central'):
+        return [
+            {'station_name': f'Registry Clinic {number}', 'station_address': f'Registry Clinic {number}',
+             'station_type': 'FC', 'province': 'harare', 'district': district}
+            for number in range(count)
+        ]
+
+    def test_allocates_free_suffixes_per_district(self):
+        # Provinces, districts and codes once; then per batch: lookup, savepoint, insert, release.
+        with self.assertNumQueries(7):
+            report = StationImporter().run(self.facility_rows(40))
+        self.assertEqual((report['created'], report['failed']), (40, 0))
+
+        codes = set(Station.objects.filter(station_name__startswith='Registry').values_list('station_code', flat=True))
+        self.assertEqual(len(codes), 40)
+        self.assertNotIn(self.stations['FC'].station_code, codes)  # 01010A is taken
+        self.assertIn('01010B', codes)
+        self.assertEqual(
+            set(Station.objects.filter(station_name__startswith='Registry').values_list('location_path', flat=True)),
+            {f'{self.province.pk}/{self.district.pk}/'},
+        )
+
+    def test_rejects_bad_rows(self):
+        rows = self.facility_rows(2) + [
+            {'station_name': 'Nowhere Clinic', 'station_address': 'Nowhere', 'station_type': 'FC',
+             'province': 'Harare', 'district': 'Atlantis'},
+            {'station_name': 'Second Harare PO', 'station_address': 'Second Harare PO', 'station_type': 'PO',
+             'province': 'Harare'},
+            {'station_name': 'Registry Clinic 0', 'station_address': 'Registry Clinic 0', 'station_type': 'FC',
+             'province': 'Harare', 'district': 'Harare Central'},
+            {'station_name': 'Districtless Clinic', 'station_address': 'Districtless', 'station_type': 'FC',
+             'province': 'Harare', 'district': ''},
+            {'station_name': 'Provinceless Clinic', 'station_address': 'Provinceless', 'station_type': 'FC',
+             'province': '', 'district': 'Harare Central'},
+        ]
+        report = StationImporter().run(rows)
+        self.assertEqual((report['created'], report['failed']), (2, 5))
+        self.assertEqual([error['row'] for error in report['errors']], [4, 5, 6, 7, 8])
+        self.assertIn('district', report['errors'][0]['errors'])
+        self.assertIn('station_code', report['errors'][1]['errors'])
+        self.assertIn('station_address', report['errors'][2]['errors'])
+        self.assertIn('district', report['errors'][3]['errors'])
+        self.assertIn('province', report['errors'][4]['errors'])
+
+    def test_failed_batch_releases_its_codes_and_addresses(self):
+        rows = self.facility_rows(2) + self.facility_rows(3)[::2]  # clinics 0, 1 | 0 (again), 2
+        bulk_create = Station.objects.bulk_create
+        calls = []
+
+        def fail_first_batch(stations, *args, **kwargs):
+            calls.append(stations)
+            if len(calls) == 1:
+                raise IntegrityError('simulated conflict')
+            return bulk_create(stations, *args, **kwargs)
+
+        with mock.patch.object(Station.objects, 'bulk_create', fail_first_batch):
+            report = StationImporter(batch_size=2).run(rows)
+
+        self.assertEqual((report['created'], report['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        # The rejected batch's suffixes and addresses are free for the next one.
+        self.assertEqual(
+            dict(Station.objects.filter(station_name__startswith='Registry').values_list('station_address',
+                                                                                         'station_code')),
+            {'Registry Clinic 0': '01010B', 'Registry Clinic 2': '01010C'},
+        )
+
+    def test_dry_run_diff_then_update_moves_assets(self):
+        self.grow_assets(2)
+        elsewhere = District.objects.create(district_name='Epworth', province=self.province, district_suffix='02')
+        rows = [
+            {'station_name': 'Harare Central Clinic', 'station_address': 'Harare FC', 'station_type': 'FC',
+             'province': 'Harare', 'district': 'Epworth'},
+            {'station_name': 'Harare Central District Office', 'station_address': 'Harare DO', 'station_type': 'DO',
+             'province': 'Harare', 'district': 'Harare Central'},
+        ]
+
+        report = StationImporter(dry_run=True).run(rows)
+        self.assertEqual((report['updated'], report['unchanged']), (1, 1))
+        self.assertEqual(report['changes'], [{
+            'row': 2, 'action': 'update', 'station_code': '01020A', 'station_name': 'Harare Central Clinic',
+            'changes': {'district': ['Harare Central', 'Epworth'], 'station_code': ['01010A', '01020A']},
+        }])
+        self.stations['FC'].refresh_from_db()
+        self.assertEqual(self.stations['FC'].district_id, self.district.pk)
+
+        StationImporter().run(rows)
+        self.stations['FC'].refresh_from_db()
+        self.assertEqual((self.stations['FC'].district_id, self.stations['FC'].station_code), (elsewhere.pk, '01020A'))
+        self.assertEqual(
+            set(Asset.objects.filter(current_station=self.stations['FC']).values_list('location_path', flat=True)),
+            {f'{self.province.pk}/{elsewhere.pk}/'},
+        )
+
+    def test_endpoint_is_for_hq_admins(self):
+        upload = lambda: SimpleUploadedFile(
+            'registry.csv',
+            b'Station Name,Station Address,Station Type,Province,District\n'
+            b'Mbare Clinic,Mbare,FC,Harare,Harare Central\n',
+        )
+        self.authenticate('FC')
+        response = self.client.post('/api/locations/stations/import/', {'file': upload()}, format='multipart')
+        self.assertEqual(response.status_code, 403)
+
+        self.authenticate('HQ')
+        response = self.client.post('/api/locations/stations/import/?dry_run=true', {'file': upload()},
+                                    format='multipart')
+        self.assertEqual((response.data['dry_run'], response.data['created']), (True, 1))
+        self.assertFalse(Station.objects.filter(station_address='Mbare').exists())
+
+        response = self.client.post('/api/locations/stations/import/', {'file': upload()}, format='multipart')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Station.objects.get(station_address='Mbare').station_code, '01010B')
+
+
+class StationAutocompleteTests(ScopedAPITestCase):
+    """Station typeahead ranks code and name prefixes first and tolerates misspellings."""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('FC')
+        for suffix, name in (('0B', 'Mbare Polyclinic'), ('0C', 'Kuwadzana Clinic'), ('0D', 'Parirenyatwa Hospital')):
+            Station.objects.create(station_name=name, station_address=name, station_type='FC',
+                                   province=self.province, district=self.district, station_suffix=suffix)
+
+    def suggest(self, query):
+        response = self.client.get(f'/api/locations/stations/autocomplete/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [row['station_name'] for row in response.data]
+
+    def test_prefixes_rank_first(self):
+        self.assertEqual(
+            self.suggest('q=harare'),
+            ['Harare Central Clinic', 'Harare Central District Office', 'Harare Provincial Office'],
+        )
+        self.assertEqual(self.suggest('q=clinic'),
+                         ['Harare Central Clinic', 'Kuwadzana Clinic', 'Mbare Polyclinic'])
+        self.assertEqual(self.suggest('q=01010b'), ['Mbare Polyclinic'])
+        self.assertEqual(self.suggest('q=Mb'), ['Mbare Polyclinic'])
+        self.assertEqual(self.suggest('q=clinic&limit=1'), ['Harare Central Clinic'])
+
+    def test_fuzzy_matches(self):
+        self.assertEqual(self.suggest('q=kuwadzna'), ['Kuwadzana Clinic'])
+        self.assertEqual(self.suggest('q=parirenyatwa hospitl'), ['Parirenyatwa Hospital'])
+        # Scored against the best-matching words, not the whole name.
+        self.assertEqual(self.suggest('q=hrare'),
+                         ['Harare Central Clinic', 'Harare Central District Office', 'Harare Provincial Office'])
+        self.assertEqual(self.suggest('q=mbre polyclinik'), ['Mbare Polyclinic'])
+
+    def test_filters_and_scope(self):
+        self.assertEqual(self.suggest('q=harare&type=PO'), ['Harare Provincial Office'])
+        self.assertEqual(self.suggest(f'q=harare&district_id={self.district.pk}'),
+                         ['Harare Central Clinic', 'Harare Central District Office'])
+        self.assertEqual(self.suggest('q=harare&in_scope=true'), ['Harare Central Clinic'])
+
+        self.authenticate('DO')
+        self.assertEqual(self.suggest('q=clinic&in_scope=true'),
+                         ['Harare Central Clinic', 'Kuwadzana Clinic', 'Mbare Polyclinic'])
+
+    def test_invalid_filters_are_rejected(self):
+        for query in ('q=harare&province_id=abc', 'q=harare&district_id=1.5', 'q=harare&limit=ten'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/locations/stations/autocomplete/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+    def test_queries(self):
+        # Authentication and the match query; a fuzzy fill adds one.
+        with self.assertNumQueries(2):
+            self.suggest('q=clinic&limit=2')
+        with self.assertNumQueries(3):
+            self.suggest('q=kuwadzna')
+
+    def test_index_follows_renames(self):
+        station = Station.objects.get(station_name='Mbare Polyclinic')
+        station.station_name = 'Mbare Netball Complex Clinic'
+        station.save()
+        self.assertEqual(self.suggest('q=netball'), ['Mbare Netball Complex Clinic'])
+        self.assertEqual(self.suggest('q=polycl'), [])
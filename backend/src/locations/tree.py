@@ -0,0 +1,89 @@
+"""
+The Province -> District -> Station hierarchy as one compact JSON document.
+
+The document is built on first use in each process and held in memory,
+keyed on the global 'locations' generation (moh_assets_backend.caching)
+that every Province, District and Station write bumps. While the generation
+is unchanged it is served without a query; the first request after a
+location write rebuilds it with three.
+
+Rows are arrays whose positions are named in "columns":
+
+    {
+      "columns": {"province": [...], "district": [...], "station": [...]},
+      "stations": [national stations, which have no province],
+      "provinces": [
+        [id, name, suffix, [provincial stations], [
+          [id, name, suffix, [district stations]], ...
+        ]], ...
+      ]
+    }
+
+Stations are placed under their district when they have one, as in
+Station.location_path.
+"""
+import json
+import threading
+
+from .models import District, Province, Station
+
+
+COLUMNS = {
+    'province': ['id', 'name', 'suffix', 'stations', 'districts'],
+    'district': ['id', 'name', 'suffix', 'stations'],
+    'station': ['id', 'name', 'type', 'code'],
+}
+
+
+def build_tree():
+    provinces = {
+        pk: [pk, name, suffix, [], []]
+        for pk, name, suffix in Province.objects.order_by('province_name').values_list(
+            'id', 'province_name', 'province_suffix'
+        )
+    }
+    districts = {}
+    for pk, name, suffix, province_id in District.objects.order_by('district_name').values_list(
+        'id', 'district_name', 'district_suffix', 'province_id'
+    ):
+        districts[pk] = row = [pk, name, suffix, []]
+        if province_id in provinces:
+            provinces[province_id][4].append(row)
+
+    national = []
+    for pk, name, station_type, code, province_id, district_id in Station.objects.order_by('station_name').values_list(
+        'id', 'station_name', 'station_type', 'station_code', 'province_id', 'district_id'
+    ):
+        row = [pk, name, station_type, code]
+        if district_id in districts:
+            districts[district_id][3].append(row)
+        elif province_id in provinces:
+            provinces[province_id][3].append(row)
+        else:
+            national.append(row)
+
+    return {'columns': COLUMNS, 'stations': national, 'provinces': list(provinces.values())}
+
+
+class LocationTree:
+    """The serialized tree of this process and the generation it was built at."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._content = None
+
+    def get(self, version):
+        """The tree as JSON bytes, rebuilt first when it was built at another generation."""
+        with self._lock:
+            if self._version != version:
+                self._content = json.dumps(build_tree(), separators=(',', ':')).encode()
+                self._version = version
+            return self._content
+
+    def clear(self):
+        with self._lock:
+            self._version = self._content = None
+
+
+location_tree = LocationTree()
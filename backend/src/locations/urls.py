@@ -1,9 +1,14 @@
 from django.urls import path
-from .views import ProvinceListView, DistrictListView, StationListView
+from .views import (
+    ProvinceListView, DistrictListView, StationListView, StationAutocompleteView, StationImportView, LocationTreeView,
+)
 
 # URL patterns for location lookups
 urlpatterns = [
     path('provinces/', ProvinceListView.as_view(), name='province-list'),
     path('districts/', DistrictListView.as_view(), name='district-list'),
     path('stations/', StationListView.as_view(), name='station-list'),
+    path('stations/autocomplete/', StationAutocompleteView.as_view(), name='station-autocomplete'),
+    path('stations/import/', StationImportView.as_view(), name='station-import'),
+    path('tree/', LocationTreeView.as_view(), name='location-tree'),
 ]
@@ -1,12 +1,24 @@
-from rest_framework import generics
+from django.http import HttpResponse
+from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from accounts.permissions import IsAssetAdmin, get_admin_scope, scope_lookups
+from moh_assets_backend.caching import ScopedResponseCacheMixin
+from moh_assets_backend.conditional import ConditionalGetMixin
+from moh_assets_backend.fieldsets import SparseFieldsetViewMixin
+from moh_assets_backend.spreadsheets import iter_rows
+from .importers import StationImporter
+from .search import autocomplete_stations
 from .models import Province, District, Station
 from .serializers import ProvinceSerializer, DistrictSerializer, StationSerializer
+from .tree import location_tree
 
 # ---------------------------------------------------------------------------
 # PROVINCE VIEWS
 # ---------------------------------------------------------------------------
-class ProvinceListView(generics.ListAPIView):
+class ProvinceListView(ConditionalGetMixin, generics.ListAPIView):
     """
     API endpoint that allows provinces to be viewed.
     No filtering needed usually, as the list is small (10).
@@ -14,12 +26,15 @@ class ProvinceListView(generics.ListAPIView):
     queryset = Province.objects.all().order_by('province_name')
     serializer_class = ProvinceSerializer
     permission_classes = [IsAuthenticated]
+    token_claims_auth = True
+    cache_namespace = 'locations'
+    cache_scoped = False
 
 
 # ---------------------------------------------------------------------------
 # DISTRICT VIEWS
 # ---------------------------------------------------------------------------
-class DistrictListView(generics.ListAPIView):
+class DistrictListView(ConditionalGetMixin, generics.ListAPIView):
     """
     API endpoint that allows districts to be viewed.
     
@@ -28,6 +43,9 @@ class DistrictListView(generics.ListAPIView):
     """
     serializer_class = DistrictSerializer
     permission_classes = [IsAuthenticated]
+    token_claims_auth = True
+    cache_namespace = 'locations'
+    cache_scoped = False
 
     def get_queryset(self):
         queryset = District.objects.all().order_by('district_name')
@@ -43,7 +61,7 @@ class DistrictListView(generics.ListAPIView):
 # ---------------------------------------------------------------------------
 # STATION VIEWS
 # ---------------------------------------------------------------------------
-class StationListView(generics.ListAPIView):
+class StationListView(SparseFieldsetViewMixin, ConditionalGetMixin, ScopedResponseCacheMixin, generics.ListAPIView):
     """
     API endpoint that allows stations (Facilities/Offices) to be viewed.
     
@@ -51,12 +69,18 @@ class StationListView(generics.ListAPIView):
     - province_id: Filter by province
     - district_id: Filter by district
     - type: Filter by station type (HQ, PO, DO, FC)
+    - fields / expand: Sparse fieldset, e.g. ?fields=id,station_name&expand=district
+
+    Every user sees the same stations, so cached responses are shared by all.
     """
     serializer_class = StationSerializer
     permission_classes = [IsAuthenticated]
+    token_claims_auth = True
+    cache_namespace = 'locations'
+    cache_scoped = False
 
     def get_queryset(self):
-        queryset = Station.objects.all().order_by('station_name')
+        queryset = Station.objects.select_related('province', 'district').order_by('station_name')
         
         # --- Filtering Logic ---
         province_id = self.request.query_params.get('province_id')
@@ -73,3 +97,99 @@ class StationListView(generics.ListAPIView):
             queryset = queryset.filter(station_type=station_type)
 
         return queryset
+
+
+class StationAutocompleteView(APIView):
+    """
+    GET /api/locations/stations/autocomplete/?q=harare
+    Typeahead for station pickers: up to `limit` (default 10, at most 50)
+    stations whose code or name starts with or contains `q`, then close
+    misspellings of the name (see locations.search).
+
+    Query Parameters:
+    - q: The text typed so far
+    - limit: Number of suggestions
+    - province_id / district_id / type: Same filters as the station list
+    - in_scope=true: Only stations within the caller's admin scope
+    """
+    permission_classes = [IsAuthenticated]
+    token_claims_auth = True
+
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+    FIELDS = ('id', 'station_name', 'station_code', 'station_type', 'province', 'district')
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            limit = max(1, min(int(params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT))
+        except ValueError:
+            return Response({"error": "limit must be a whole number."}, status=status.HTTP_400_BAD_REQUEST)
+        for param in ('province_id', 'district_id'):
+            if params.get(param) and not params[param].isdigit():
+                return Response({"error": f"{param} must be a whole number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Station.objects.all()
+        if params.get('province_id'):
+            queryset = queryset.filter(province_id=params['province_id'])
+        if params.get('district_id'):
+            queryset = queryset.filter(district_id=params['district_id'])
+        if params.get('type'):
+            queryset = queryset.filter(station_type=params['type'])
+        if params.get('in_scope', '').lower() in ('1', 'true', 'yes'):
+            scope = get_admin_scope(request.user)
+            if scope is None:
+                return Response([])
+            queryset = queryset.filter(**scope_lookups(scope, None))
+
+        return Response(autocomplete_stations(queryset, params.get('q', ''), limit, self.FIELDS))
+
+
+class StationImportView(APIView):
+    """
+    POST /api/locations/stations/import/
+    Bulk import stations (a facility registry) from a CSV or XLSX file uploaded
+    in the `file` field; columns are described in locations.importers. Rows are
+    matched to existing stations on station_address. With ?dry_run=true nothing
+    is written and the report lists the stations that would be created or changed.
+    Only HQ admins may import.
+    """
+    permission_classes = [IsAuthenticated, IsAssetAdmin]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({"error": "Upload a CSV or XLSX file in the 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        try:
+            report = StationImporter(dry_run=dry_run).run(iter_rows(upload, upload.name))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+
+# ---------------------------------------------------------------------------
+# LOCATION TREE
+# ---------------------------------------------------------------------------
+class LocationTreeView(ConditionalGetMixin, APIView):
+    """
+    GET /api/locations/tree/
+    Every province with its districts and stations in one response, in the
+    compact format described in locations.tree. Replaces the provinces ->
+    districts -> stations round trips. Send the ETag back in If-None-Match:
+    while no location changes the answer is 304.
+    """
+    permission_classes = [IsAuthenticated]
+    token_claims_auth = True
+    cache_namespace = 'locations'
+    cache_scoped = False
+
+    def get(self, request):
+        return self.conditional(self.tree, request)
+
+    def tree(self, request):
+        _, (version, _) = self.get_versions(request)
+        return HttpResponse(location_tree.get(version), content_type='application/json')
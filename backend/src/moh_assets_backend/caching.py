@@ -0,0 +1,194 @@
+"""
+Shared response cache for list endpoints.
+
+Admins with the same jurisdiction see the same list for the same query
+parameters, so responses are cached per (admin scope, query parameters)
+rather than per user: every admin of a province shares that province's
+warm entries.
+
+Invalidation uses generation counters instead of deleting entries. Each
+namespace ('assets', 'locations', 'catalogue') has a global generation plus one per
+scope ('national', 'province:<id>', 'district:<id>', 'station:<id>'), and
+both are part of every entry's key. A write bumps the generations it
+affects; entries keyed on the old values are never read again and age out
+through the cache's TTL and LRU culling.
+
+Entries live in the RESPONSE_CACHE_ALIAS cache and the counters in the
+RESPONSE_GENERATION_CACHE alias (the same one by default; see CACHES in
+settings). A bump only reaches the workers that share the counters' cache.
+In a shared backend the counters never expire. In a per-process one
+(LocMemCache) another worker's bump is never seen, so the counters there
+expire with the response TTL: a worker keeps using an outdated generation,
+for cached responses and for 304s alike, for at most that long.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from accounts.blacklist import caches_negative_answers
+from accounts.permissions import get_admin_scope
+from locations.models import Station
+
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+NATIONAL = 'national'
+
+# Scope filters from get_admin_scope() -> scope key prefix
+_SCOPE_PREFIXES = {
+    'station__province': 'province',
+    'station__district': 'district',
+    'station': 'station',
+}
+
+
+def response_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def generation_cache():
+    return caches[getattr(settings, 'RESPONSE_GENERATION_CACHE', RESPONSE_CACHE_ALIAS)]
+
+
+def generation_timeout(cache):
+    """Counters are kept until evicted in a shared cache, and expire with the responses in a per-process one."""
+    # caches_negative_answers() is the blacklist's test for a cache every worker shares.
+    return None if caches_negative_answers(cache) else response_cache().default_timeout
+
+
+def scope_key(admin_scope):
+    """'national', 'province:<id>', 'district:<id>' or 'station:<id>'; None without a scope."""
+    if admin_scope is None:
+        return None
+    if not admin_scope:
+        return NATIONAL
+    (lookup, value), = admin_scope.items()
+    return f'{_SCOPE_PREFIXES[lookup]}:{value.pk}'
+
+
+def station_scope_keys(station_ids):
+    """Every scope that can see assets at these stations."""
+    keys = {NATIONAL}
+    for station_id, province_id, district_id in (
+        Station.objects.filter(pk__in=set(station_ids) - {None}).values_list('id', 'province_id', 'district_id')
+    ):
+        keys.add(f'station:{station_id}')
+        if province_id:
+            keys.add(f'province:{province_id}')
+        if district_id:
+            keys.add(f'district:{district_id}')
+    return keys
+
+
+def _generation_key(namespace, scope):
+    return f'gen:{namespace}' if scope is None else f'gen:{namespace}:{scope}'
+
+
+def generations(namespace, scope=None):
+    """
+    (global generation, scope generation) of a namespace. A missing counter is
+    started at the current time in nanoseconds, so a counter that was evicted
+    never comes back with a value an old entry was stored under.
+    """
+    cache = generation_cache()
+    keys = [_generation_key(namespace, None), _generation_key(namespace, scope)]
+    found = cache.get_many(keys)
+    values = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=generation_timeout(cache))
+            found[key] = cache.get(key)
+        values.append(found[key])
+    return tuple(values)
+
+
+def bump_generations(namespace, scopes=None):
+    """
+    Invalidates the entries of `scopes` (all scopes when None) in a namespace.
+    Bumps now, so this transaction's own later reads miss, and again on commit,
+    so a response computed by another request from pre-commit data while the
+    write was in flight is not kept either.
+    """
+    keys = [_generation_key(namespace, None)] if scopes is None else [
+        _generation_key(namespace, scope) for scope in scopes
+    ]
+
+    def bump():
+        cache = generation_cache()
+        cache.set_many({key: time.time_ns() for key in keys}, timeout=generation_timeout(cache))
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_stations(namespace, station_ids):
+    """Invalidates the scopes that can see the given stations' assets."""
+    bump_generations(namespace, station_scope_keys(station_ids))
+
+
+def query_digest(request):
+    # Blank parameters are ignored by the filters, so they are left out of the key too.
+    params = sorted(
+        (name, sorted(value for value in values if value != ''))
+        for name, values in request.query_params.lists()
+        if any(value != '' for value in values)
+    )
+    # Pagination links are absolute, so the host is part of the response.
+    raw = repr((request.scheme, request.get_host(), request.path, params))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class VersionedViewMixin:
+    """
+    Base of the view mixins that depend on generation counters.
+
+    cache_namespace   generations the view's output depends on ('assets', 'locations', 'catalogue')
+    cache_scoped      the output depends on the requester's admin scope; turn off
+                      for views that return the same data to every user
+    """
+    cache_namespace = None
+    cache_scoped = True
+
+    def get_versions(self, request):
+        """(scope key, generations) for this request, or None when it has no admin scope."""
+        scope = None
+        if self.cache_scoped:
+            scope = scope_key(get_admin_scope(request.user))
+            if scope is None:
+                return None
+        return scope, generations(self.cache_namespace, scope)
+
+
+class ScopedResponseCacheMixin(VersionedViewMixin):
+    """List view mixin: serves list() from the response cache."""
+
+    def get_response_cache_key(self, request):
+        versions = self.get_versions(request)
+        if versions is None:
+            return None
+        scope, (global_generation, scope_generation) = versions
+        return (
+            f'resp:{self.cache_namespace}:{scope or "-"}:{global_generation}:{scope_generation}:'
+            f'{query_digest(request)}'
+        )
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        data = response_cache().get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache().set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
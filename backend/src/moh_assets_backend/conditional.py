@@ -0,0 +1,56 @@
+"""
+Conditional GET (ETag / Last-Modified) for list and detail endpoints.
+
+Validators come from the generation counters of moh_assets_backend.caching
+rather than from the response body: the ETag hashes the namespace, the
+admin scope, its generations and the normalized request, and Last-Modified
+is the time of the newest generation bump. Both are known before the view
+runs, so a matching If-None-Match / If-Modified-Since is answered with 304
+without running the main query or the serializer.
+"""
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .caching import VersionedViewMixin, query_digest
+
+
+class ConditionalGetMixin(VersionedViewMixin):
+    """View mixin adding ETag / Last-Modified validation to list() and retrieve()."""
+
+    def get_validators(self, request):
+        """(etag, last_modified) for this request, or (None, None) when it has no admin scope."""
+        found = self.get_versions(request)
+        if found is None:
+            return None, None
+        scope, versions = found
+        raw = repr((self.cache_namespace, scope, versions, query_digest(request), request.META.get('HTTP_ACCEPT')))
+        etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+        return etag, max(versions) // 1_000_000_000
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if not 200 <= response.status_code < 300:
+                return response
+        response['ETag'] = etag
+        # HTTP dates have one-second resolution: a change later in the current
+        # second would keep the same date, so it is only sent once that second is over.
+        if last_modified < int(time.time()):
+            response['Last-Modified'] = http_date(last_modified)
+        # Responses depend on the requester's scope: shared caches must not reuse them.
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
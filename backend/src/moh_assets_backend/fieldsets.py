@@ -0,0 +1,159 @@
+"""
+Sparse fieldsets for read endpoints.
+
+- ?fields=id,status,category  keeps only the listed top-level fields
+- ?expand=current_station     replaces a field (or adds one) with the nested
+                              serializer declared in Meta.expandable_fields
+
+SparseFieldsetMixin goes on the serializer, SparseFieldsetViewMixin on the
+view; the view derives select_related()/only() from the fields that are left,
+so a slimmer response also reads fewer columns and joins fewer tables.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+_DISPLAY_METHOD = re.compile(r'get_(\w+)_display')
+
+
+def requested_names(request, param):
+    """The comma-separated names in a query parameter, or None if it was not given."""
+    raw = request.query_params.get(param) if request is not None else None
+    if raw is None:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+def is_sparse_request(request):
+    return request.method in ('GET', 'HEAD') and (
+        FIELDS_PARAM in request.query_params or EXPAND_PARAM in request.query_params
+    )
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying ?fields= and ?expand= on GET requests.
+
+    Meta.expandable_fields maps a field name to (serializer class, kwargs).
+    Only the outermost serializer reacts to the query parameters; nested and
+    expanded serializers always render in full.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or not is_sparse_request(request) or not self._is_outermost():
+            return fields
+
+        expand = requested_names(request, EXPAND_PARAM) or set()
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand & set(expandable):
+            serializer_class, kwargs = expandable[name]
+            fields[name] = serializer_class(read_only=True, **kwargs)
+
+        requested = requested_names(request, FIELDS_PARAM)
+        if requested is not None:
+            for name in list(fields):
+                if name not in requested and name not in expand:
+                    del fields[name]
+        return fields
+
+    def _is_outermost(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+
+def _resolve(model, attr):
+    """Model field behind a source attribute; get_FOO_display resolves to FOO."""
+    display = _DISPLAY_METHOD.fullmatch(attr)
+    try:
+        return model._meta.get_field(display.group(1) if display else attr)
+    except FieldDoesNotExist:
+        return None
+
+
+def loading_plan(serializer, model, prefix=''):
+    """
+    Returns (only, related) for rendering `serializer` over `model` instances:
+    the only() paths it reads and the select_related() paths it traverses.
+    `only` is None when some field reads something other than a model field
+    (a property, a method, source='*'), in which case every column is loaded.
+    """
+    only, related = set(), set()
+    for field in serializer.fields.values():
+        if field.source == '*' or isinstance(field, serializers.ListSerializer):
+            only = None
+            continue
+
+        current, path = model, prefix
+        nested = isinstance(field, serializers.BaseSerializer)
+        for index, attr in enumerate(field.source_attrs):
+            model_field = _resolve(current, attr)
+            if model_field is None:
+                only = None
+                break
+            name = path + model_field.name
+            traverses = nested or index < len(field.source_attrs) - 1
+            if not (model_field.is_relation and traverses):
+                if only is not None:
+                    only.add(name)
+                break
+            if model_field.many_to_many or model_field.one_to_many:
+                only = None
+                break
+            # Traversing a forward FK needs its column; a reverse one-to-one has none.
+            if model_field.concrete and only is not None:
+                only.add(name)
+            related.add(name)
+            current, path = model_field.related_model, name + '__'
+        else:
+            if nested:
+                nested_only, nested_related = loading_plan(field, current, path)
+                related |= nested_related
+                if only is not None and nested_only is not None:
+                    only |= nested_only
+                else:
+                    only = None
+    return only, related
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin: on GET list/retrieve requests with ?fields= or ?expand=, loads
+    only the relations and columns the remaining serializer fields read.
+    The primary key and the ordering fields are always loaded.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not is_sparse_request(self.request) or getattr(self, 'action', None) not in (None, *self.sparse_actions):
+            return queryset
+
+        only, related = loading_plan(self.get_serializer(), queryset.model)
+        # select_related() without arguments would follow every foreign key.
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if only is not None:
+            queryset = queryset.only(*only, *self._always_loaded(queryset.model))
+        return queryset
+
+    def _always_loaded(self, model):
+        names = [model._meta.pk.name]
+        ordering = getattr(self, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        ordering_fields = getattr(self, 'ordering_fields', None)
+        if isinstance(ordering_fields, (list, tuple)):
+            ordering = [*ordering, *ordering_fields]
+        for name in ordering:
+            model_field = _resolve(model, name.lstrip('-'))
+            if model_field is not None and model_field.concrete:
+                names.append(model_field.name)
+        return names
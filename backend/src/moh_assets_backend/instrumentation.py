@@ -0,0 +1,256 @@
+"""
+Per-request SQL instrumentation.
+
+QueryInstrumentationMiddleware wraps every database connection for the
+duration of a request and records, per view:
+
+- the number of queries and the time spent in the database
+- repeated statements (same SQL, different parameters): the N+1 signature
+- the time spent in serializers (Serializer.data, including the queries it
+  triggers) and the time spent rendering the response body
+
+With QUERY_DEBUG_HEADERS (DEBUG by default) the numbers are returned as
+X-DB-* response headers. They are always added to in-process counters, read
+through QueryMetricsView. A view exceeding its budget in QUERY_BUDGETS logs
+a warning.
+
+Views are keyed '<ViewClass>.<action>' for viewsets and '<ViewClass>.<method>'
+otherwise, e.g. 'AssetViewSet.list' or 'StationListView.get'.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+
+logger = logging.getLogger(__name__)
+
+# A statement repeated this often within one request is reported as an N+1 pattern.
+REPEATED_QUERY_THRESHOLD = 5
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r'\s+')
+
+# RequestMetrics of the request being handled, for the serializer timing below.
+_current_metrics = ContextVar('query_metrics', default=None)
+
+
+def fingerprint(sql):
+    """The statement with parameter lists and literals collapsed, for grouping repeats."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def view_key(view_func, method):
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{view_class.__name__}.{actions.get(method.lower(), method.lower())}'
+
+
+def query_budget(key):
+    """The query budget of a view: its own entry, else its class's, else the default."""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    for name in (key, key.split('.')[0]):
+        if name in budgets:
+            return budgets[name]
+    return getattr(settings, 'DEFAULT_QUERY_BUDGET', None)
+
+
+class RequestMetrics:
+    """Execute wrapper collecting the statements of one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.serializing = False
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.statements[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def repeated(self):
+        """(statement, count) pairs run at least REPEATED_QUERY_THRESHOLD times, most frequent first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= REPEATED_QUERY_THRESHOLD]
+
+
+def _timed_data(data):
+    """
+    Wraps BaseSerializer.data so the time spent building serializer output is
+    added to the current request's metrics. Nested .data calls (a serializer
+    read from another one) are counted once, as part of the outer call.
+    """
+    def timed(serializer):
+        metrics = _current_metrics.get()
+        if metrics is None or metrics.serializing:
+            return data.fget(serializer)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            metrics.serialize_seconds += time.perf_counter() - started
+            metrics.serializing = False
+
+    timed.is_timed = True
+    return property(timed, doc=data.__doc__)
+
+
+if not getattr(BaseSerializer.data.fget, 'is_timed', False):
+    BaseSerializer.data = _timed_data(BaseSerializer.data)
+
+
+class QueryStats:
+    """Thread-safe per-view counters aggregated over the life of the process."""
+
+    FIELDS = ('requests', 'queries', 'max_queries', 'duplicates', 'db_ms', 'serialize_ms',
+              'render_ms', 'total_ms', 'over_budget', 'n_plus_one')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, key, queries, duplicates, db_ms, serialize_ms, render_ms, total_ms, over_budget, n_plus_one):
+        with self._lock:
+            row = self._views.setdefault(key, dict.fromkeys(self.FIELDS, 0))
+            row['requests'] += 1
+            row['queries'] += queries
+            row['max_queries'] = max(row['max_queries'], queries)
+            row['duplicates'] += duplicates
+            row['db_ms'] += db_ms
+            row['serialize_ms'] += serialize_ms
+            row['render_ms'] += render_ms
+            row['total_ms'] += total_ms
+            row['over_budget'] += int(over_budget)
+            row['n_plus_one'] += int(n_plus_one)
+
+    def snapshot(self):
+        with self._lock:
+            views = {key: dict(row) for key, row in self._views.items()}
+        for key, row in views.items():
+            requests = row['requests']
+            row['avg_queries'] = round(row['queries'] / requests, 2)
+            for name in ('db_ms', 'serialize_ms', 'render_ms', 'total_ms'):
+                row[name] = round(row[name], 3)
+                row[f'avg_{name}'] = round(row[name] / requests, 3)
+            row['budget'] = query_budget(key)
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+query_stats = QueryStats()
+
+
+class QueryInstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request._query_view = None
+        request._query_rendering_started = None
+
+        started = time.perf_counter()
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        finished = time.perf_counter()
+
+        if request._query_view is None:
+            return response
+
+        rendering_started = request._query_rendering_started
+        render_ms = (finished - rendering_started) * 1000 if rendering_started else 0.0
+        self.record(request, response, metrics, render_ms, (finished - started) * 1000)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_view = view_key(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (to JSON etc.) after this hook; serializers have already run.
+        request._query_rendering_started = time.perf_counter()
+        return response
+
+    def record(self, request, response, metrics, render_ms, total_ms):
+        key = request._query_view
+        db_ms = metrics.db_seconds * 1000
+        serialize_ms = metrics.serialize_seconds * 1000
+        budget = query_budget(key)
+        over_budget = budget is not None and metrics.queries > budget
+        repeated = metrics.repeated()
+
+        if over_budget:
+            logger.warning(
+                "%s issued %d queries (budget %d) for %s %s%s",
+                key, metrics.queries, budget, request.method, request.path,
+                f"; most repeated ({repeated[0][1]}x): {repeated[0][0][:300]}" if repeated else '',
+            )
+        elif repeated:
+            logger.info("%s repeated a query %d times: %s", key, repeated[0][1], repeated[0][0][:300])
+
+        query_stats.add(key, metrics.queries, metrics.duplicates, db_ms, serialize_ms, render_ms, total_ms,
+                        over_budget, bool(repeated))
+
+        if getattr(settings, 'QUERY_DEBUG_HEADERS', settings.DEBUG):
+            response['X-DB-View'] = key
+            response['X-DB-Queries'] = str(metrics.queries)
+            response['X-DB-Duplicate-Queries'] = str(metrics.duplicates)
+            response['X-DB-Time-Ms'] = f'{db_ms:.2f}'
+            response['X-Serialize-Time-Ms'] = f'{serialize_ms:.2f}'
+            response['X-Render-Time-Ms'] = f'{render_ms:.2f}'
+            response['X-Request-Time-Ms'] = f'{total_ms:.2f}'
+            if budget is not None:
+                response['X-DB-Query-Budget'] = str(budget)
+
+
+class QueryMetricsView(APIView):
+    """
+    GET: per-view query counters of this process since start (or the last reset).
+    DELETE: reset the counters.
+    Staff only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'repeated_query_threshold': REPEATED_QUERY_THRESHOLD,
+            'views': query_stats.snapshot(),
+        })
+
+    def delete(self, request):
+        query_stats.reset()
+        return Response(status=204)
@@ -0,0 +1,141 @@
+"""
+Text search indexes shared by the assets, locations and accounts apps.
+
+- SQLite: an FTS5 trigram table keyed by the searched row's id, kept in sync
+  by triggers on the source tables so that bulk_create/bulk_update paths are
+  covered as well. Migrations that rebuild a source table drop its triggers,
+  so each app re-creates them from post_migrate (`ensure_triggers`).
+- PostgreSQL: trigram GIN indexes on every searched column, matching the
+  UPPER(col::text) LIKE expression Django emits for icontains/istartswith.
+
+A SearchIndex only generates the statements; migrations run them through
+`migration_operation()` and the search modules query `matching_ids()`.
+"""
+from django.db import connections, migrations
+from django.db.models.expressions import RawSQL
+
+
+def fts5_phrase(text):
+    """Quotes `text` as an FTS5 phrase, so user input can't inject query syntax."""
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+class SearchSource:
+    """
+    A table feeding a search index: `key` is the column holding the indexed
+    row's id, `columns` maps index columns to this table's columns. Index
+    columns it doesn't map are indexed as ''.
+    """
+
+    def __init__(self, table, columns, key='id'):
+        self.table = table
+        self.columns = columns
+        self.key = key
+
+    def row(self, index_columns, prefix=''):
+        """The values of one index row: `prefix` is 'new.' inside a trigger."""
+        values = [f"{prefix}{self.key}"]
+        for column in index_columns:
+            source = self.columns.get(column)
+            values.append(f"COALESCE({prefix}{source}, '')" if source else "''")
+        return ", ".join(values)
+
+
+class SearchIndex:
+    """The FTS5 table `table` over `columns`, fed by `sources` (SearchSource)."""
+
+    TRIGGER_SUFFIXES = ('ai', 'au', 'ad')
+
+    def __init__(self, table, columns, sources):
+        self.table = table
+        self.columns = list(columns)
+        self.sources = list(sources)
+
+    # --- SQLite ---------------------------------------------------------------
+
+    @property
+    def _insert(self):
+        return f"INSERT INTO {self.table}(rowid, {', '.join(self.columns)})"
+
+    def sqlite_triggers(self):
+        """CREATE TRIGGER statements; updates fire on the mapped columns only."""
+        statements = []
+        for source in self.sources:
+            row = source.row(self.columns, prefix='new.')
+            watched = ', '.join(dict.fromkeys(source.columns.values()))
+            statements += [
+                f"CREATE TRIGGER IF NOT EXISTS {source.table}_search_ai AFTER INSERT ON {source.table} BEGIN "
+                f"{self._insert} VALUES ({row}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {source.table}_search_au "
+                f"AFTER UPDATE OF {watched} ON {source.table} BEGIN "
+                f"DELETE FROM {self.table} WHERE rowid = old.{source.key}; "
+                f"{self._insert} VALUES ({row}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {source.table}_search_ad AFTER DELETE ON {source.table} BEGIN "
+                f"DELETE FROM {self.table} WHERE rowid = old.{source.key}; END",
+            ]
+        return statements
+
+    def sqlite_forward(self):
+        """Creates the FTS5 table and its triggers, and indexes the existing rows."""
+        return (
+            [f"CREATE VIRTUAL TABLE {self.table} USING fts5({', '.join(self.columns)}, tokenize='trigram')"]
+            + self.sqlite_triggers()
+            + [f"{self._insert} SELECT {source.row(self.columns)} FROM {source.table}" for source in self.sources]
+        )
+
+    def sqlite_reverse(self):
+        return [
+            f"DROP TRIGGER IF EXISTS {source.table}_search_{suffix}"
+            for source in self.sources
+            for suffix in self.TRIGGER_SUFFIXES
+        ] + [f"DROP TABLE IF EXISTS {self.table}"]
+
+    def ensure_triggers(self, using='default', **kwargs):
+        """post_migrate handler: re-creates the triggers SQLite dropped with a rebuilt source table."""
+        db = connections[using]
+        if db.vendor != 'sqlite' or self.table not in db.introspection.table_names():
+            return
+        with db.cursor() as cursor:
+            for statement in self.sqlite_triggers():
+                cursor.execute(statement)
+
+    def matching_ids(self, query, limit=None):
+        """Subquery of the ids whose index row matches the FTS5 `query`; with `limit`, the best-ranked ones."""
+        sql = f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s"
+        if limit is None:
+            return RawSQL(sql, (query,))
+        return RawSQL(f"{sql} ORDER BY rank LIMIT %s", (query, limit))
+
+    # --- PostgreSQL -----------------------------------------------------------
+
+    def _postgres_columns(self):
+        return [
+            (source.table, column)
+            for source in self.sources
+            for column in dict.fromkeys(source.columns.values())
+        ]
+
+    def postgres_forward(self):
+        return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm "
+            f"ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)"
+            for table, column in self._postgres_columns()
+        ]
+
+    def postgres_reverse(self):
+        return [f"DROP INDEX IF EXISTS {table}_{column}_trgm" for table, column in self._postgres_columns()]
+
+    # --- Migrations -----------------------------------------------------------
+
+    def migration_operation(self):
+        """A RunPython operation creating (and on reverse dropping) the index on SQLite and PostgreSQL."""
+        def run(statements_by_vendor):
+            def apply(apps, schema_editor):
+                for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+                    schema_editor.execute(statement, params=None)
+            return apply
+
+        return migrations.RunPython(
+            run({'sqlite': self.sqlite_forward(), 'postgresql': self.postgres_forward()}),
+            run({'sqlite': self.sqlite_reverse(), 'postgresql': self.postgres_reverse()}),
+        )
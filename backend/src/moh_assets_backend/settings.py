@@ -47,6 +47,8 @@ INSTALLED_APPS = [
     'accounts',
     "profiles",
     "assets",
+    "sync",
+    "benchmarks",
     # jwt-apps
     'rest_framework.authtoken',
     'rest_framework_simplejwt',
@@ -61,7 +63,7 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema', # for Swagger
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ScopedJWTAuthentication',
     ),
 }
 
@@ -77,6 +79,7 @@ SPECTACULAR_SETTINGS = {
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "moh_assets_backend.instrumentation.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -87,6 +90,23 @@ MIDDLEWARE = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Query instrumentation (moh_assets_backend.instrumentation): X-DB-* headers on
+# every response when QUERY_DEBUG_HEADERS is on; a warning is logged when a view
+# issues more queries than its budget. Keys are '<View>.<action>' or '<View>'.
+QUERY_DEBUG_HEADERS = DEBUG
+DEFAULT_QUERY_BUDGET = 30
+QUERY_BUDGETS = {
+    'AssetViewSet.list': 8,
+    'AssetViewSet.retrieve': 8,
+    'StationListView': 6,
+    'StationAutocompleteView': 4,
+    'ProvinceListView': 4,
+    'DistrictListView': 4,
+    'LocationTreeView': 5,
+    'AdminUserListView': 6,
+    'UserProfileView': 6,
+}
+
 ROOT_URLCONF = "moh_assets_backend.urls"
 
 TEMPLATES = [
@@ -119,6 +139,46 @@ DATABASES = {
 }
 
 
+# Caches
+# "responses" holds the shared list responses (moh_assets_backend.caching).
+# LocMemCache evicts least-recently-used entries past MAX_ENTRIES; it is per
+# process, so with several workers use FileBasedCache with a shared LOCATION.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api-responses",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 2000, "CULL_FREQUENCY": 4},
+    },
+}
+
+# Generation counters of the response cache and of conditional GETs
+# (moh_assets_backend/caching.py). With several worker processes this alias must
+# be a shared backend for a write to invalidate every worker at once; in a
+# per-process cache the counters expire after the "responses" TIMEOUT.
+RESPONSE_GENERATION_CACHE = "responses"
+
+# Scope claims in JWTs (accounts/tokens.py). When on, tokens issued at login
+# carry the user's type, admin flag and station, and read-only requests to
+# views with token_claims_auth are authorized without loading the user.
+# Whether a token's claims are still current is tracked in this cache alias.
+# Claims are only trusted when it is a backend the workers share (not
+# LocMemCache); with the default per-process cache every request loads the user.
+JWT_SCOPE_CLAIMS = False
+JWT_SCOPE_CLAIMS_CACHE = "default"
+
+# Refresh token blacklist checks are answered from this cache alias before the
+# database; see accounts/blacklist.py. "Not blacklisted" answers are only cached
+# when it is a backend the workers share (not LocMemCache); with the default
+# per-process cache those are read from the database on every refresh. Expired
+# tokens are removed by `manage.py compact_tokens`, to be run periodically (e.g. cron).
+TOKEN_BLACKLIST_CACHE = "default"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,63 @@
+"""
+Row readers for spreadsheet uploads, shared by the bulk importers.
+
+Each reader yields one dict per data row, keyed by the normalized header
+(lower case, spaces as underscores), with every cell as stripped text.
+"""
+import csv
+import io
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _normalize_cell(value):
+    """Spreadsheets hand back ints/floats for numeric cells; import everything as text."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_csv_rows(fileobj):
+    """Yields one dict per CSV data row without reading the whole file into memory."""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        headers = [_normalize_header(h) for h in next(reader, [])]
+        for values in reader:
+            yield dict(zip(headers, (_normalize_cell(v) for v in values)))
+    finally:
+        text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    """Yields one dict per row of the first worksheet, using openpyxl's read-only mode."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the 'openpyxl' package.")
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception:
+        raise ValueError("The uploaded file is not a readable XLSX workbook.")
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(rows, ())]
+        for values in rows:
+            yield dict(zip(headers, (_normalize_cell(v) for v in values)))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    """Picks the reader from the file extension (.csv or .xlsx)."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return iter_csv_rows(fileobj)
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(fileobj)
+    raise ValueError("Unsupported file type. Upload a .csv or .xlsx file.")
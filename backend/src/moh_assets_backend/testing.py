@@ -0,0 +1,128 @@
+"""
+Shared fixtures for the API tests in each app's tests.py.
+
+ScopedAPITestCase creates one station of each level (HQ, PO, DO, FC) with an
+MOH admin at each, so a test can act at every admin scope, and grow_*()
+methods that add data until a station holds a given number of rows.
+
+QueryCountTestCase adds the query-count regression checks: every list
+endpoint must issue the same number of queries whatever the number of rows
+it returns, so assertQueriesAtEverySize() grows the data through SIZES and
+asserts the exact query count of a request at each size.
+"""
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from moh_assets_backend.caching import response_cache
+from assets.models import Asset, AssetCategory, Device, DeviceType, NonDeviceAsset
+from locations.models import District, Province, Station
+from profiles.models import MOHProfile
+
+User = get_user_model()
+
+PASSWORD = 'Scoped-api-1'
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ScopedAPITestCase(APITestCase):
+    _sequence = count(1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.province = Province.objects.create(province_name='Harare', province_suffix='01')
+        cls.district = District.objects.create(district_name='Harare Central', province=cls.province,
+                                               district_suffix='01')
+        cls.stations = {
+            'HQ': Station.objects.create(station_name='National Office', station_address='National Office',
+                                         station_type='HQ'),
+            'PO': Station.objects.create(station_name='Harare Provincial Office', station_address='Harare PO',
+                                         station_type='PO', province=cls.province),
+            'DO': Station.objects.create(station_name='Harare Central District Office', station_address='Harare DO',
+                                         station_type='DO', province=cls.province, district=cls.district),
+            'FC': Station.objects.create(station_name='Harare Central Clinic', station_address='Harare FC',
+                                         station_type='FC', province=cls.province, district=cls.district,
+                                         station_suffix='0A'),
+        }
+        cls.admins = {
+            role: cls.create_user(f'admin_{role.lower()}', station, is_admin=True)
+            for role, station in cls.stations.items()
+        }
+        cls.category = AssetCategory.objects.create(name='Computers')
+        cls.device_type = DeviceType.objects.create(name='Laptop', category=cls.category)
+
+    @classmethod
+    def create_user(cls, username, station, is_admin=False):
+        user = User(username=username, email=f'{username}@mohcc.example', user_type='MOH',
+                    is_admin=is_admin)
+        user.set_password(PASSWORD)
+        user.save()
+        MOHProfile.objects.create(user=user, station=station, department='IT', position='Officer')
+        user.profile_complete = True
+        user.save()
+        return user
+
+    def setUp(self):
+        # Cached responses would outlive the rolled-back rows of earlier tests.
+        response_cache().clear()
+
+    def authenticate(self, role_or_user):
+        """Sends a real access token, so every request loads the user as in production."""
+        user = self.admins[role_or_user] if isinstance(role_or_user, str) else role_or_user
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    # --- Growing the data -------------------------------------------------
+
+    def grow_assets(self, total, station=None):
+        """Adds assets (alternately devices and non-devices) until `station` holds `total`."""
+        station = station or self.stations['FC']
+        for _ in range(total - Asset.objects.filter(current_station=station).count()):
+            number = next(self._sequence)
+            # Asset.clean() requires the subtype row, so it is attached before saving.
+            if number % 2:
+                asset = Asset(asset_type='DEVICE', category=self.category, current_station=station)
+                asset.device = subtype = Device(device_type=self.device_type, serial_number=f'QC-{number:06d}')
+            else:
+                asset = Asset(asset_type='NON_DEVICE', category=self.category, current_station=station)
+                asset.non_device = subtype = NonDeviceAsset(name=f'Chair {number}', quantity=1)
+            asset.save()
+            subtype.asset = asset
+            subtype.save()
+
+    def grow_facilities(self, total):
+        """Adds facilities to the district until it has `total`."""
+        existing = Station.objects.filter(district=self.district, station_type='FC').count()
+        for _ in range(total - existing):
+            number = next(self._sequence)
+            Station.objects.create(station_name=f'Clinic {number}', station_address=f'Clinic {number}',
+                                   station_type='FC', province=self.province, district=self.district,
+                                   station_suffix=f'{number % 1000:03d}')
+
+    def grow_users(self, total, station=None):
+        """Adds regular MOH users at `station` until it has `total` (admins included)."""
+        station = station or self.stations['FC']
+        for _ in range(total - MOHProfile.objects.filter(station=station).count()):
+            self.create_user(f'user_{next(self._sequence)}', station)
+
+
+class QueryCountTestCase(ScopedAPITestCase):
+    SIZES = (1, 5, 20)
+
+    def assertQueriesAtEverySize(self, expected, grow, request, status_code=200):
+        """
+        For each size in SIZES: grow(size), then assert that request() issues
+        exactly `expected` queries (streamed bodies included) and answers `status_code`.
+        The response cache is emptied first, so the uncached path is measured.
+        """
+        for size in self.SIZES:
+            grow(size)
+            response_cache().clear()
+            with self.subTest(size=size):
+                with self.assertNumQueries(expected):
+                    response = request()
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, status_code)
@@ -0,0 +1,124 @@
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from assets.serializers import AssetSerializer
+
+from .caching import generation_cache, generations, response_cache
+from .instrumentation import fingerprint, query_stats
+from .testing import ScopedAPITestCase
+
+
+class FingerprintTests(SimpleTestCase):
+    """Statements differing only in their parameters are grouped as repeats."""
+
+    def test_parameters_and_in_lists_are_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT *  FROM "assets_asset"\nWHERE id IN (%s, %s, %s) AND code = \'01010A\' LIMIT 21'),
+            'SELECT * FROM "assets_asset" WHERE id IN (...) AND code = ? LIMIT ?',
+        )
+
+
+class GenerationCounterTests(SimpleTestCase):
+    """Generation counters outlive cached responses only in a cache every worker shares."""
+
+    def setUp(self):
+        generation_cache().clear()
+
+    def test_per_process_counters_expire_with_the_responses(self):
+        first = generations('assets', 'station:1')
+        self.assertEqual(generations('assets', 'station:1'), first)
+
+        # A bump in another worker never reaches this process's counters: they
+        # are dropped after the response TTL and restarted.
+        later = time.time() + response_cache().default_timeout + 1
+        with mock.patch('time.time', return_value=later):
+            self.assertNotEqual(generations('assets', 'station:1'), first)
+
+    def test_shared_counters_do_not_expire(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'TIMEOUT': 300},
+                'generations': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                'LOCATION': location},
+            }
+            with self.settings(CACHES=caches, RESPONSE_GENERATION_CACHE='generations'):
+                first = generations('assets', 'station:1')
+                with mock.patch('time.time', return_value=time.time() + 301):
+                    self.assertEqual(generations('assets', 'station:1'), first)
+
+
+@override_settings(QUERY_DEBUG_HEADERS=True, QUERY_BUDGETS={'AssetViewSet.list': 8}, DEFAULT_QUERY_BUDGET=30)
+class QueryInstrumentationTests(ScopedAPITestCase):
+    """The middleware reports each request's queries in headers, per-view counters and budget warnings."""
+
+    def setUp(self):
+        super().setUp()
+        query_stats.reset()
+        self.grow_assets(3)
+        self.authenticate('FC')
+
+    def test_debug_headers(self):
+        response = self.client.get('/api/assets/assets/')
+        self.assertEqual(response['X-DB-View'], 'AssetViewSet.list')
+        self.assertEqual(response['X-DB-Queries'], '2')
+        self.assertEqual(response['X-DB-Duplicate-Queries'], '0')
+        self.assertEqual(response['X-DB-Query-Budget'], '8')
+        for header in ('X-DB-Time-Ms', 'X-Serialize-Time-Ms', 'X-Render-Time-Ms', 'X-Request-Time-Ms'):
+            self.assertGreaterEqual(float(response[header]), 0)
+
+        # Views without their own budget fall back to the default.
+        response = self.client.get(f'/api/assets/assets/{response.data["results"][0]["id"]}/')
+        self.assertEqual(response['X-DB-View'], 'AssetViewSet.retrieve')
+        self.assertEqual(response['X-DB-Query-Budget'], '30')
+
+    def test_serialize_time_covers_the_serializer(self):
+        # Serializers run inside the view, before the response is rendered.
+        to_representation = AssetSerializer.to_representation
+
+        def slow(serializer, instance):
+            time.sleep(0.01)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(AssetSerializer, 'to_representation', slow):
+            response = self.client.get('/api/assets/assets/')
+        self.assertGreaterEqual(float(response['X-Serialize-Time-Ms']), 30)
+        self.assertLess(float(response['X-Render-Time-Ms']), 30)
+        self.assertGreaterEqual(query_stats.snapshot()['AssetViewSet.list']['serialize_ms'], 30)
+
+    def test_headers_can_be_turned_off(self):
+        with self.settings(QUERY_DEBUG_HEADERS=False):
+            response = self.client.get('/api/assets/assets/')
+        self.assertNotIn('X-DB-Queries', response)
+        self.assertEqual(query_stats.snapshot()['AssetViewSet.list']['requests'], 1)
+
+    def test_views_over_budget_log_a_warning(self):
+        with self.assertNoLogs('moh_assets_backend.instrumentation', 'WARNING'):
+            self.client.get('/api/assets/assets/')
+
+        response_cache().clear()
+        with self.settings(QUERY_BUDGETS={'AssetViewSet.list': 1}):
+            with self.assertLogs('moh_assets_backend.instrumentation', 'WARNING') as logs:
+                self.client.get('/api/assets/assets/')
+        self.assertIn('AssetViewSet.list issued 2 queries (budget 1) for GET /api/assets/assets/', logs.output[0])
+
+        stats = query_stats.snapshot()['AssetViewSet.list']
+        self.assertEqual((stats['requests'], stats['over_budget'], stats['max_queries']), (2, 1, 2))
+
+    def test_metrics_view(self):
+        self.client.get('/api/assets/assets/')
+        self.assertEqual(self.client.get('/api/metrics/queries/').status_code, 403)
+
+        staff = self.create_user('staff_1', self.stations['HQ'])
+        staff.is_staff = True
+        staff.save()
+        self.authenticate(staff)
+        response = self.client.get('/api/metrics/queries/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['views']['AssetViewSet.list']['requests'], 1)
+
+        self.assertEqual(self.client.delete('/api/metrics/queries/').status_code, 204)
+        self.assertEqual(list(query_stats.snapshot()), ['QueryMetricsView.delete'])
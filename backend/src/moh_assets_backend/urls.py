@@ -22,6 +22,8 @@ from django.conf import settings
 # swagger
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from .instrumentation import QueryMetricsView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -29,6 +31,8 @@ urlpatterns = [
     path('api/profiles/', include('profiles.urls')),  # finish profile
     path('api/locations/', include('locations.urls')), # locations (provinces, districts, stations)
     path('api/assets/', include('assets.urls')), # assets management
+    path('api/sync/', include('sync.urls')), # delta sync for mobile clients
+    path('api/metrics/queries/', QueryMetricsView.as_view(), name='query-metrics'), # per-view query counters
 
 
     
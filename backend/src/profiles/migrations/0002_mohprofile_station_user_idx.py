@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0007_station_search_index'),
+        ('profiles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mohprofile',
+            index=models.Index(fields=['station', 'user'], name='profiles_moh_station_user_idx'),
+        ),
+    ]
@@ -24,6 +24,13 @@ class MOHProfile(models.Model):
         help_text="The station where this MOH user is assigned"
     )
 
+    class Meta:
+        indexes = [
+            # Scope and station filters on the user directory go station -> profile -> user;
+            # with user_id in the index that step reads no profile rows.
+            models.Index(fields=['station', 'user'], name='profiles_moh_station_user_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.department}"
 
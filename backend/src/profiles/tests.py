@@ -1,3 +1,16 @@
-from django.test import TestCase
+from moh_assets_backend.testing import QueryCountTestCase
 
-# Create your tests here.
+
+class ProfileQueryCountTests(QueryCountTestCase):
+    """Profile endpoints issue a fixed number of queries however many users share the station."""
+
+    def test_own_profile(self):
+        self.authenticate('FC')
+        self.assertQueriesAtEverySize(1, self.grow_users, lambda: self.client.get('/api/profiles/me/'))
+
+    def test_update_profile(self):
+        self.authenticate('FC')
+        self.assertQueriesAtEverySize(
+            3, self.grow_users,
+            lambda: self.client.put('/api/profiles/update/', {'position': 'Data Clerk'}, format='json'),
+        )
@@ -6,12 +6,16 @@ from rest_framework.response import Response
 from .models import MOHProfile, NGOProfile
 from .serializers import MOHProfileSerializer, NGOProfileSerializer
 from accounts.models import User
+from accounts.tokens import issue_tokens, scope_claims_enabled
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
 from .models import MOHProfile, NGOProfile
 from .serializers import MOHProfileSerializer, NGOProfileSerializer
 
+# MOHProfileSerializer reads the station, province and district names.
+PROFILE_STATION_PATHS = ('station__province', 'station__district')
+
 class FinishProfileView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
@@ -35,6 +39,9 @@ class FinishProfileView(generics.GenericAPIView):
                 user=user,
                 defaults=serializer.validated_data
             )
+            # update_or_create loads its own instance; the user's cached profile (and
+            # station) would otherwise be the one authentication loaded.
+            user.moh_profile = profile
         elif user_type == 'NGO':
             profile, created = NGOProfile.objects.update_or_create(
                 user=user,
@@ -45,11 +52,15 @@ class FinishProfileView(generics.GenericAPIView):
         user.profile_complete = True
         user.save()
 
-        return Response({
+        data = {
             "message": "Profile completed successfully.",
             "profile": serializer.data,
             "profile_complete": user.profile_complete
-        }, status=status.HTTP_200_OK)
+        }
+        # Tokens issued before carry the old scope claims, which are no longer trusted.
+        if scope_claims_enabled():
+            data["tokens"] = issue_tokens(user)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 
@@ -68,7 +79,7 @@ class UpdateProfileView(APIView):
 
         # Determine profile model and serializer
         if user.user_type == 'MOH':
-            profile = get_object_or_404(MOHProfile, user=user)
+            profile = get_object_or_404(MOHProfile.objects.select_related(*PROFILE_STATION_PATHS), user=user)
             serializer_class = MOHProfileSerializer
         elif user.user_type == 'NGO':
             profile = get_object_or_404(NGOProfile, user=user)
@@ -79,14 +90,20 @@ class UpdateProfileView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        previous_station_id = getattr(profile, 'station_id', None)
         serializer = serializer_class(profile, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
-        return Response({
+        data = {
             "message": "Profile updated successfully",
             "profile": serializer.data
-        }, status=status.HTTP_200_OK)
+        }
+        # A station move changes the admin scope: tokens issued before carry the old one.
+        if scope_claims_enabled() and getattr(profile, 'station_id', None) != previous_station_id:
+            user.moh_profile = profile
+            data["tokens"] = issue_tokens(user)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 # profile-view
@@ -105,7 +122,8 @@ class UserProfileView(generics.RetrieveAPIView):
 
         if user_type == 'MOH':
             try:
-                profile = MOHProfile.objects.get(user=user)
+                # Loaded with its station, province and district by ScopedJWTAuthentication.
+                profile = user.moh_profile
                 serializer = MOHProfileSerializer(profile)
             except MOHProfile.DoesNotExist:
                 return Response({"error": "MOH profile not found"}, status=status.HTTP_404_NOT_FOUND)
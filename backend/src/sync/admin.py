@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import AssetPathChange, Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('model', 'object_id', 'station', 'deleted_at')
+    list_filter = ('model',)
+
+
+@admin.register(AssetPathChange)
+class AssetPathChangeAdmin(admin.ModelAdmin):
+    list_display = ('asset_id', 'old_path', 'changed_at')
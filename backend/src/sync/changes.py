@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+from django.core import signing
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.permissions import scope_lookups, scope_path_lookups
+from assets.ledger import movements_as_of
+from assets.models import Asset, AssetCategory, AssetMovement, DeviceType
+from assets.serializers import AssetCategorySerializer, AssetSerializer, DeviceTypeSerializer
+from locations.models import Station
+from locations.serializers import StationSerializer
+from .models import AssetPathChange, Tombstone
+
+
+TOKEN_SALT = 'sync.changes'
+
+# Rows are stamped with updated_at before their transaction commits, so a row
+# can become visible with a timestamp slightly older than the previous sync.
+# Each new token starts this far back; clients upsert by id, so the overlap is harmless.
+SAFETY_WINDOW = timedelta(seconds=60)
+
+# Tombstones older than this are pruned (see prune_tombstones); older tokens get a full resync.
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+ASSET_PAGE_SIZE = 2000
+
+
+def _scope_key(admin_scope):
+    return ','.join(f'{key}={value.pk}' for key, value in sorted(admin_scope.items()))
+
+
+def _timestamp(value):
+    return value.isoformat() if value is not None else None
+
+
+def make_token(user, admin_scope, since, after=None, began=None):
+    """
+    Signed position. Between rounds it holds only `since`: changes at or after
+    it (None for a full snapshot). While a round is paged it also holds `after`,
+    the (updated_at, id) of the last asset sent, and `began`, when the round's
+    first page was read; the round's final token starts from `began`.
+    """
+    return signing.dumps(
+        {
+            'u': user.pk, 's': _scope_key(admin_scope), 't': _timestamp(since),
+            'c': [_timestamp(after[0]), after[1]] if after else None, 'b': _timestamp(began),
+        },
+        salt=TOKEN_SALT,
+    )
+
+
+def read_token(token, user, admin_scope):
+    """
+    Returns (since, after, began) as passed to make_token(), or None when the
+    client must resync from scratch: the token belongs to another user or scope,
+    or its `since` is older than the tombstone log. Paging through a snapshot
+    (since=None) never expires, however old the assets are.
+    Raises signing.BadSignature for tampered tokens.
+    """
+    data = signing.loads(token, salt=TOKEN_SALT)
+    if data.get('u') != user.pk or data.get('s') != _scope_key(admin_scope):
+        return None
+
+    since = parse_datetime(data['t']) if data.get('t') else None
+    cursor = data.get('c')
+    after = (parse_datetime(cursor[0]), cursor[1]) if cursor else None
+    began = parse_datetime(data['b']) if data.get('b') else None
+    if since is None and after is None:
+        return None  # nothing to resume: a fresh snapshot
+    if since is not None and since < timezone.now() - TOMBSTONE_RETENTION:
+        return None
+    return since, after, began
+
+
+def _deleted(model, since, **filters):
+    return list(
+        Tombstone.objects
+        .filter(model=model, deleted_at__gte=since, **filters)
+        .values_list('object_id', flat=True)
+    )
+
+
+def _assets_left_scope(admin_scope, since):
+    """
+    Assets that were inside the scope at `since` or later but have since moved out:
+    to another station (a ledger row after `since`), or along with their station
+    or district (an AssetPathChange after `since` from a path inside the scope).
+    """
+    in_scope = scope_lookups(admin_scope, 'station')
+    touched_scope = (
+        Exists(AssetMovement.objects.filter(asset=OuterRef('pk'), moved_at__gte=since, **in_scope))
+        | Exists(movements_as_of(since).filter(asset=OuterRef('pk'), **in_scope))
+    )
+    left = Q(touched_scope, id__in=AssetMovement.objects.filter(moved_at__gte=since).values('asset_id'))
+    if 'station' not in admin_scope:
+        # A station scope is the station itself, which a path change does not leave.
+        path_changes = AssetPathChange.objects.filter(
+            changed_at__gte=since, **scope_path_lookups(admin_scope, path_field='old_path')
+        )
+        left |= Q(id__in=path_changes.values('asset_id'))
+    return list(
+        Asset.objects
+        .exclude(**scope_path_lookups(admin_scope))
+        .filter(left)
+        .values_list('id', flat=True)
+    )
+
+
+def _changed(queryset, since):
+    return queryset if since is None else queryset.filter(updated_at__gte=since)
+
+
+def collect_changes(user, admin_scope, since=None, after=None, began=None):
+    """
+    Everything a client holding a token at `since` needs to catch up: rows
+    updated since then and the ids of rows deleted since then. `since=None` is
+    a full snapshot.
+
+    Assets are limited to the admin's scope and paged by (updated_at, id);
+    while `has_more` is set, the returned token resumes after the last asset
+    sent (`after`). Deletions, stations, categories and device types are only
+    sent on the first page of a round; whatever changes while the client pages
+    is picked up by the round's final token, which starts when the round began.
+    """
+    first_page = after is None
+    began = began or timezone.now()
+
+    assets = (
+        Asset.objects
+        .filter(**scope_path_lookups(admin_scope))
+        .select_related('device', 'non_device')
+        .order_by('updated_at', 'id')
+    )
+    if after is not None:
+        after_time, after_id = after
+        assets = assets.filter(Q(updated_at__gt=after_time) | Q(updated_at=after_time, id__gt=after_id))
+    elif since is not None:
+        assets = assets.filter(updated_at__gte=since)
+    assets = list(assets[:ASSET_PAGE_SIZE + 1])
+    has_more = len(assets) > ASSET_PAGE_SIZE
+    assets = assets[:ASSET_PAGE_SIZE]
+
+    if has_more:
+        token = make_token(user, admin_scope, since, (assets[-1].updated_at, assets[-1].id), began)
+    else:
+        token = make_token(user, admin_scope, began - SAFETY_WINDOW)
+
+    deleted = {'asset': [], 'station': [], 'category': [], 'device_type': []}
+    if since is not None and first_page:
+        deleted = {
+            'asset': _deleted('asset', since, **scope_lookups(admin_scope, 'station')),
+            'station': _deleted('station', since),
+            'category': _deleted('category', since),
+            'device_type': _deleted('device_type', since),
+        }
+        if admin_scope:
+            deleted['asset'] += _assets_left_scope(admin_scope, since)
+
+    stations, categories, device_types = [], [], []
+    if first_page:
+        stations = _changed(Station.objects.select_related('province', 'district'), since).order_by('id')
+        categories = _changed(AssetCategory.objects.all(), since).order_by('id')
+        device_types = _changed(DeviceType.objects.select_related('category'), since).order_by('id')
+
+    return {
+        'token': token,
+        'reset': since is None and first_page,
+        'has_more': has_more,
+        'assets': {
+            'updated': AssetSerializer(assets, many=True).data,
+            'deleted': deleted['asset'],
+        },
+        'stations': {
+            'updated': StationSerializer(stations, many=True).data,
+            'deleted': deleted['station'],
+        },
+        'categories': {
+            'updated': AssetCategorySerializer(categories, many=True).data,
+            'deleted': deleted['category'],
+        },
+        'device_types': {
+            'updated': DeviceTypeSerializer(device_types, many=True).data,
+            'deleted': deleted['device_type'],
+        },
+    }
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.changes import TOMBSTONE_RETENTION
+from sync.models import AssetPathChange, Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones and asset path changes older than the retention period."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - TOMBSTONE_RETENTION
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        path_changes, _ = AssetPathChange.objects.filter(changed_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstones and {path_changes} asset path changes."))
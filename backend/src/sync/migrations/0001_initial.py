@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('locations', '0005_station_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('asset', 'Asset'), ('station', 'Station'), ('category', 'Asset Category'), ('device_type', 'Device Type')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('station', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.station')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='sync_tombstone_time_idx')],
+            },
+        ),
+    ]
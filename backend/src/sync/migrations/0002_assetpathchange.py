@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetPathChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_id', models.PositiveBigIntegerField()),
+                ('old_path', models.CharField(max_length=32)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['changed_at'], name='sync_path_change_time_idx')],
+            },
+        ),
+    ]
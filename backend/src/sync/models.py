@@ -0,0 +1,59 @@
+from django.db import models
+from django.utils import timezone
+from locations.models import Station
+
+
+# ------------------------
+# Deletion log
+# ------------------------
+class Tombstone(models.Model):
+    """
+    One row per deleted synced object, so delta sync can tell clients what to drop.
+    Rows older than sync.changes.TOMBSTONE_RETENTION are pruned; tokens that old
+    get a full resync instead.
+    """
+    MODEL_CHOICES = [
+        ('asset', 'Asset'),
+        ('station', 'Station'),
+        ('category', 'Asset Category'),
+        ('device_type', 'Device Type'),
+    ]
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    # Station of a deleted asset, so the tombstone is only sent within that scope.
+    station = models.ForeignKey(
+        Station, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='sync_tombstone_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted at {self.deleted_at}"
+
+
+# ------------------------
+# Scope exits
+# ------------------------
+class AssetPathChange(models.Model):
+    """
+    One row per asset whose location_path changed while its station did not
+    (see assets.signals.move_asset_paths), with the path it had before, so
+    delta sync can tell the clients of the old scope that it left. Pruned
+    with the tombstones.
+    """
+    asset_id = models.PositiveBigIntegerField()
+    old_path = models.CharField(max_length=32)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['changed_at'], name='sync_path_change_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"asset #{self.asset_id} left {self.old_path} at {self.changed_at}"
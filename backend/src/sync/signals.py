@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from assets.models import Asset, AssetCategory, DeviceType
+from assets.signals import asset_paths_changed
+from locations.models import Station
+from .models import AssetPathChange, Tombstone
+
+
+SYNCED_MODELS = {
+    Asset: 'asset',
+    Station: 'station',
+    AssetCategory: 'category',
+    DeviceType: 'device_type',
+}
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        model=SYNCED_MODELS[sender],
+        object_id=instance.pk,
+        station_id=instance.current_station_id if sender is Asset else None,
+    )
+
+
+for _model in SYNCED_MODELS:
+    post_delete.connect(record_tombstone, sender=_model, dispatch_uid=f'sync_tombstone_{_model.__name__}')
+
+
+@receiver(pre_delete, sender=Station)
+def touch_station_assets(sender, instance, **kwargs):
+    # The SET_NULL cascade is a bulk UPDATE that leaves updated_at alone.
+    Asset.objects.filter(current_station=instance).update(updated_at=timezone.now())
+
+
+@receiver(asset_paths_changed)
+def record_path_changes(sender, previous, **kwargs):
+    AssetPathChange.objects.bulk_create(
+        [AssetPathChange(asset_id=asset_id, old_path=old_path) for asset_id, old_path in previous],
+        batch_size=2000,
+    )
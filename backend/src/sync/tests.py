@@ -0,0 +1,141 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from assets.models import Asset
+from locations.models import District, Province, Station
+from moh_assets_backend.testing import ScopedAPITestCase
+
+
+class SyncChangesTests(ScopedAPITestCase):
+    """Delta sync pages full snapshots and sends only what changed since the token."""
+
+    def setUp(self):
+        super().setUp()
+        self.grow_assets(5)
+        # Rows untouched for longer than the tombstone retention.
+        long_ago = timezone.now() - timedelta(days=200)
+        Asset.objects.update(updated_at=long_ago)
+        Station.objects.update(updated_at=long_ago)
+
+    def sync(self, token=None):
+        response = self.client.get('/api/sync/changes/', {'since': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def snapshot(self):
+        """Pages through a full snapshot; returns the pages."""
+        pages = [self.sync()]
+        while pages[-1]['has_more']:
+            pages.append(self.sync(pages[-1]['token']))
+        return pages
+
+    def asset_ids(self, page):
+        return [asset['id'] for asset in page['assets']['updated']]
+
+    @mock.patch('sync.changes.ASSET_PAGE_SIZE', 2)
+    def test_snapshot_pages_through_old_assets(self):
+        self.authenticate('HQ')
+        pages = self.snapshot()
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([page['reset'] for page in pages], [True, False, False])
+        self.assertEqual(sum((self.asset_ids(page) for page in pages), []),
+                         list(Asset.objects.order_by('updated_at', 'id').values_list('id', flat=True)))
+        # Stations and the catalogue come with the first page only.
+        self.assertEqual(len(pages[0]['stations']['updated']), 4)
+        self.assertEqual([len(page['stations']['updated']) for page in pages[1:]], [0, 0])
+
+    def test_deltas_send_only_changes(self):
+        self.authenticate('HQ')
+        token = self.snapshot()[-1]['token']
+
+        changed = Asset.objects.order_by('id').first()
+        changed.status = 'MAINTENANCE'
+        changed.save()
+
+        delta = self.sync(token)
+        self.assertFalse(delta['reset'])
+        self.assertEqual(self.asset_ids(delta), [changed.pk])
+        self.assertEqual(delta['stations']['updated'], [])
+
+    def test_deletions_are_sent_as_tombstones(self):
+        self.authenticate('FC')
+        token = self.snapshot()[-1]['token']
+
+        deleted = Asset.objects.order_by('id').first()
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        self.assertEqual(self.sync(token)['assets']['deleted'], [deleted_id])
+
+    def test_assets_leaving_the_scope_are_deleted_for_it(self):
+        self.authenticate('FC')
+        token = self.snapshot()[-1]['token']
+
+        moved = Asset.objects.order_by('id').first()
+        moved.current_station = self.stations['DO']
+        moved.save()
+
+        delta = self.sync(token)
+        self.assertEqual(delta['assets']['deleted'], [moved.pk])
+        self.assertNotIn(moved.pk, self.asset_ids(delta))
+
+        # The district office sees it arrive.
+        self.authenticate('DO')
+        self.assertIn(moved.pk, self.asset_ids(self.sync()))
+
+    def office_admin(self, username, **location):
+        station = Station.objects.create(station_name=f'{username} office', station_address=f'{username} office',
+                                         **location)
+        return self.create_user(username, station, is_admin=True)
+
+    def tokens(self, *users):
+        tokens = []
+        for user in users:
+            self.authenticate(user)
+            tokens.append(self.snapshot()[-1]['token'])
+        return tokens
+
+    def delta(self, user, token):
+        self.authenticate(user)
+        delta = self.sync(token)
+        return set(self.asset_ids(delta)), set(delta['assets']['deleted'])
+
+    def test_station_moving_to_another_district_takes_its_assets_along(self):
+        north = District.objects.create(district_name='Harare North', province=self.province, district_suffix='02')
+        north_admin = self.office_admin('admin_north', station_type='DO', province=self.province, district=north)
+        old_district, new_district, province = self.admins['DO'], north_admin, self.admins['PO']
+        tokens = self.tokens(old_district, new_district, province)
+        moved = set(Asset.objects.filter(current_station=self.stations['FC']).values_list('id', flat=True))
+
+        clinic = self.stations['FC']
+        clinic.district = north
+        clinic.save()
+
+        self.assertEqual(self.delta(old_district, tokens[0]), (set(), moved))
+        self.assertEqual(self.delta(new_district, tokens[1]), (moved, set()))
+        self.assertEqual(self.delta(province, tokens[2]), (moved, set()))
+
+    def test_district_moving_to_another_province_takes_its_assets_along(self):
+        bulawayo = Province.objects.create(province_name='Bulawayo', province_suffix='02')
+        bulawayo_admin = self.office_admin('admin_bulawayo', station_type='PO', province=bulawayo)
+        old_province, new_province, district = self.admins['PO'], bulawayo_admin, self.admins['DO']
+        tokens = self.tokens(old_province, new_province, district)
+        moved = set(Asset.objects.values_list('id', flat=True))
+
+        self.district.province = bulawayo
+        self.district.save()
+
+        self.assertEqual(self.delta(old_province, tokens[0]), (set(), moved))
+        self.assertEqual(self.delta(new_province, tokens[1]), (moved, set()))
+        self.assertEqual(self.delta(district, tokens[2]), (moved, set()))
+
+    def test_deleting_a_station_takes_its_assets_out_of_scope(self):
+        token, = self.tokens('PO')
+        orphaned = set(Asset.objects.filter(current_station=self.stations['FC']).values_list('id', flat=True))
+
+        self.stations['FC'].delete()
+
+        self.assertEqual(self.delta('PO', token), (set(), orphaned))
@@ -0,0 +1,37 @@
+from django.core import signing
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from accounts.permissions import HasAdminScope, get_admin_scope
+from .changes import collect_changes, read_token
+
+
+class SyncChangesView(APIView):
+    """
+    GET /api/sync/changes/?since=<token>
+
+    Assets (within your jurisdiction), stations, categories and device types
+    created, updated or deleted since the token. Omit `since` for a full snapshot.
+    Store the returned `token` and send it on the next call; while `has_more`
+    is true, call again straight away. `reset: true` means the token could not
+    be used (expired, or your jurisdiction changed) and the client should
+    replace its local data with this snapshot.
+    """
+    permission_classes = [IsAuthenticated, HasAdminScope]
+    token_claims_auth = True
+
+    def get(self, request):
+        admin_scope = get_admin_scope(request.user)
+        since = after = began = None
+
+        token = request.query_params.get('since')
+        if token:
+            try:
+                position = read_token(token, request.user, admin_scope)
+            except signing.BadSignature:
+                return Response({"error": "Invalid sync token."}, status=status.HTTP_400_BAD_REQUEST)
+            if position is not None:
+                since, after, began = position
+
+        return Response(collect_changes(request.user, admin_scope, since, after, began))
@@ -7,11 +7,20 @@ class AdminRepository {
 
   AdminRepository(this._dioClient);
 
-  Future<List<AdminUser>> fetchUsers() async {
+  /// Fetches one page of users, filtered on the server by [search] (names,
+  /// username, email or national ID). Pass the previous page's `next` URL
+  /// to continue; it already carries the search.
+  Future<AdminUserPage> fetchUsersPage({String? next, String? search}) async {
     try {
-      final response = await _dioClient.dio.get(ApiConstants.adminUserList);
-      final List<dynamic> data = response.data;
-      return data.map((json) => AdminUser.fromJson(json)).toList();
+      final response = next != null
+          ? await _dioClient.dio.get(next)
+          : await _dioClient.dio.get(
+              ApiConstants.adminUserList,
+              queryParameters: search != null && search.isNotEmpty
+                  ? {'search': search}
+                  : null,
+            );
+      return AdminUserPage.fromJson(response.data as Map<String, dynamic>);
     } catch (e) {
       rethrow;
     }
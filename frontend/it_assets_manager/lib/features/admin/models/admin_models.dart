@@ -44,3 +44,23 @@ class AdminUser extends Equatable {
 
   String get fullName => "$firstName $lastName";
 }
+
+/// One page of `accounts/admin/users/`, which is cursor-paginated.
+class AdminUserPage {
+  final List<AdminUser> users;
+
+  /// Absolute URL of the next page, or null on the last one.
+  final String? next;
+
+  const AdminUserPage({required this.users, this.next});
+
+  factory AdminUserPage.fromJson(Map<String, dynamic> json) {
+    final List<dynamic> results = json['results'];
+    return AdminUserPage(
+      users: results
+          .map((user) => AdminUser.fromJson(user as Map<String, dynamic>))
+          .toList(),
+      next: json['next'] as String?,
+    );
+  }
+}
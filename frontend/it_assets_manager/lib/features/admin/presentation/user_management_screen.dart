@@ -1,3 +1,5 @@
+import 'dart:async';
+
 import 'package:flutter/material.dart';
 import 'package:provider/provider.dart';
 import '../../../../utils/responsive_sizes.dart';
@@ -12,7 +14,7 @@ class UserManagementScreen extends StatefulWidget {
 }
 
 class _UserManagementScreenState extends State<UserManagementScreen> {
-  String _searchQuery = "";
+  Timer? _searchDebounce;
 
   @override
   void initState() {
@@ -22,16 +24,25 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
     });
   }
 
+  @override
+  void dispose() {
+    _searchDebounce?.cancel();
+    super.dispose();
+  }
+
+  void _onSearchChanged(String value) {
+    // Searched on the server, once typing pauses.
+    _searchDebounce?.cancel();
+    _searchDebounce = Timer(const Duration(milliseconds: 400), () {
+      context.read<AdminProvider>().fetchUsers(search: value.trim());
+    });
+  }
+
   @override
   Widget build(BuildContext context) {
     final responsive = ResponsiveSize(context);
     final adminProvider = context.watch<AdminProvider>();
-    final users = adminProvider.users.where((user) {
-      final name = user.fullName.toLowerCase();
-      final username = user.username.toLowerCase();
-      final query = _searchQuery.toLowerCase();
-      return name.contains(query) || username.contains(query);
-    }).toList();
+    final users = adminProvider.users;
 
     return Scaffold(
       appBar: AppBar(
@@ -61,23 +72,23 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
                   borderRadius: BorderRadius.circular(responsive.borderRadius),
                 ),
               ),
-              onChanged: (value) {
-                setState(() {
-                  _searchQuery = value;
-                });
-              },
+              onChanged: _onSearchChanged,
             ),
           ),
           Expanded(
             child: adminProvider.isLoading && users.isEmpty
                 ? const Center(child: CircularProgressIndicator())
                 : RefreshIndicator(
-                    onRefresh: () => adminProvider.fetchUsers(),
+                    onRefresh: () => adminProvider.refreshUsers(),
                     child: ListView.separated(
+                      physics: const AlwaysScrollableScrollPhysics(),
                       padding: responsive.edgeInsets,
-                      itemCount: users.length,
+                      itemCount: users.length + (adminProvider.hasMore ? 1 : 0),
                       separatorBuilder: (context, index) => const Divider(),
                       itemBuilder: (context, index) {
+                        if (index == users.length) {
+                          return _buildNextPageRow(adminProvider, responsive);
+                        }
                         final user = users[index];
                         return ListTile(
                           title: Text(
@@ -112,6 +123,30 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
     );
   }
 
+  /// Last row while more users exist: the list builds it as it scrolls
+  /// near the end, which loads the next page.
+  Widget _buildNextPageRow(
+    AdminProvider adminProvider,
+    ResponsiveSize responsive,
+  ) {
+    if (adminProvider.loadMoreFailed) {
+      return Center(
+        child: TextButton.icon(
+          onPressed: () => adminProvider.loadMoreUsers(retry: true),
+          icon: const Icon(Icons.refresh),
+          label: const Text("Load more"),
+        ),
+      );
+    }
+    WidgetsBinding.instance.addPostFrameCallback((_) {
+      if (mounted) adminProvider.loadMoreUsers();
+    });
+    return Padding(
+      padding: EdgeInsets.all(responsive.padding),
+      child: const Center(child: CircularProgressIndicator()),
+    );
+  }
+
   void _showResetPasswordDialog(BuildContext context, AdminUser user) {
     final passwordController = TextEditingController();
     final formKey = GlobalKey<FormState>();
@@ -8,28 +8,82 @@ class AdminProvider extends ChangeNotifier {
   AdminProvider(this._repository);
 
   List<AdminUser> _users = [];
+  String? _next;
+  String _search = '';
+  // Bumped by every fetchUsers(), so pages of an older search are dropped.
+  int _generation = 0;
   bool _isLoading = false;
+  bool _isLoadingMore = false;
+  bool _loadMoreFailed = false;
   String? _errorMessage;
 
   List<AdminUser> get users => _users;
+  bool get hasMore => _next != null;
   bool get isLoading => _isLoading;
+  bool get isLoadingMore => _isLoadingMore;
+
+  /// The last [loadMoreUsers] failed; it is not retried until asked to.
+  bool get loadMoreFailed => _loadMoreFailed;
   String? get errorMessage => _errorMessage;
 
-  Future<void> fetchUsers() async {
+  /// Loads the first page of users matching [search] (searched on the server).
+  Future<void> fetchUsers({String search = ''}) async {
+    final generation = ++_generation;
+    _search = search;
     _isLoading = true;
+    _isLoadingMore = false;
+    _loadMoreFailed = false;
     _errorMessage = null;
     notifyListeners();
 
     try {
-      _users = await _repository.fetchUsers();
+      final page = await _repository.fetchUsersPage(search: search);
+      if (generation != _generation) return;
+      _users = page.users;
+      _next = page.next;
     } catch (e) {
+      if (generation != _generation) return;
       _errorMessage = e.toString();
     } finally {
-      _isLoading = false;
-      notifyListeners();
+      if (generation == _generation) {
+        _isLoading = false;
+        notifyListeners();
+      }
+    }
+  }
+
+  /// Appends the next page of the current search, if there is one. After a
+  /// failure it does nothing until called with [retry].
+  Future<void> loadMoreUsers({bool retry = false}) async {
+    final next = _next;
+    if (next == null || _isLoading || _isLoadingMore) return;
+    if (_loadMoreFailed && !retry) return;
+
+    final generation = _generation;
+    _isLoadingMore = true;
+    _loadMoreFailed = false;
+    notifyListeners();
+
+    try {
+      final page = await _repository.fetchUsersPage(next: next);
+      if (generation != _generation) return;
+      _users = [..._users, ...page.users];
+      _next = page.next;
+    } catch (e) {
+      if (generation != _generation) return;
+      _loadMoreFailed = true;
+      _errorMessage = e.toString();
+    } finally {
+      if (generation == _generation) {
+        _isLoadingMore = false;
+        notifyListeners();
+      }
     }
   }
 
+  /// Reloads the first page of the current search.
+  Future<void> refreshUsers() => fetchUsers(search: _search);
+
   Future<bool> resetPassword(int userId, String newPassword) async {
     _isLoading = true;
     _errorMessage = null;